@@ -0,0 +1 @@
+"""Benchmarks for nlp-negative-sampling."""
@@ -0,0 +1,61 @@
+"""Benchmark training on distinct pairs weighted by counts against raw pairs.
+
+Usage:
+    python -m benchmarks.bench_aggregate_pairs
+"""
+import logging
+import time
+from typing import List
+
+from benchmarks.common import synthetic_sentences
+from nlp_negative_sampling.models import skip_gram
+from nlp_negative_sampling.models.skip_gram import SkipGram
+from nlp_negative_sampling.utils.process_text_data import tokenize_file
+
+COUNT_SENTENCES = 5000
+SENTENCE_LENGTH = 20
+TEXT_PATH = "data/test_worker/text.txt"
+VOCABULARY_SIZE = 20000
+
+logger = logging.getLogger(__name__)
+
+
+def _report(name: str, sentences: List[List[str]]) -> None:
+    """Print the pairs per epoch and the epoch time with and without aggregation."""
+    epochs, skip_gram.EPOCHS = skip_gram.EPOCHS, 1
+    results = []
+    for aggregate in [False, True]:
+        sg_model = SkipGram(
+            logger=logger, sentences=sentences, seed=0, aggregate_pairs=aggregate
+        )
+        start = time.perf_counter()
+        sg_model.train()
+        duration = time.perf_counter() - start
+        if sg_model.positive_pairs is None:
+            raise RuntimeError("Positive pairs are not materialized.")
+        results.append((len(sg_model.positive_pairs), duration))
+    skip_gram.EPOCHS = epochs
+
+    (raw_pairs, raw_duration), (distinct_pairs, distinct_duration) = results
+    print(
+        f"{name:10s} {raw_pairs:9d} pairs -> {distinct_pairs:9d} distinct pairs "
+        f"({raw_pairs / distinct_pairs:4.1f}x fewer)  "
+        f"{raw_duration:6.2f} s -> {distinct_duration:6.2f} s/epoch"
+    )
+
+
+def main() -> None:
+    """Report the reduction on the bundled corpus and on a synthetic one."""
+    _report(name="bundled", sentences=tokenize_file(file=TEXT_PATH))
+    _report(
+        name="synthetic",
+        sentences=synthetic_sentences(
+            count_sentences=COUNT_SENTENCES,
+            sentence_length=SENTENCE_LENGTH,
+            vocabulary_size=VOCABULARY_SIZE,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark the recall and throughput of the approximate nearest neighbours index.
+
+Usage:
+    python -m benchmarks.bench_ann_index [count_words]
+"""
+import sys
+import time
+
+import numpy as np
+
+from nlp_negative_sampling.libs.ann_index import IVFIndex
+from nlp_negative_sampling.libs.similarity import SimilarityIndex, normalize_vectors
+
+COUNT_DIRECTIONS = 2000
+COUNT_QUERIES = 500
+COUNT_WORDS = 200000
+EMBEDDING_DIMENSION = 100
+K = 10
+N_PROBES = [1, 4, 16, 64]
+NOISE = 1.0
+
+
+def main() -> None:
+    """Report recall@k against the exact top k, and queries/s, for a few probes."""
+    count_words = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT_WORDS
+    # Embeddings of words gathered around topics, like trained ones
+    rng = np.random.default_rng(0)
+    directions = rng.normal(size=(COUNT_DIRECTIONS, EMBEDDING_DIMENSION))
+    embed_matrix = directions[rng.integers(COUNT_DIRECTIONS, size=count_words)]
+    embed_matrix += NOISE * rng.normal(size=embed_matrix.shape)
+    exact_index = SimilarityIndex(
+        words_voc={f"w{i}": i for i in range(count_words)}, embed_matrix=embed_matrix
+    )
+    vectors = normalize_vectors(
+        embed_matrix[rng.choice(count_words, size=COUNT_QUERIES, replace=False)]
+    )
+
+    start = time.perf_counter()
+    exact_indexes = np.stack(
+        [exact_index.top_k(vector=vector, k=K)[0] for vector in vectors]
+    )
+    exact_qps = COUNT_QUERIES / (time.perf_counter() - start)
+    start = time.perf_counter()
+    ann_index = IVFIndex.build(
+        normalized_matrix=normalize_vectors(embed_matrix), seed=0
+    )
+    build_duration = time.perf_counter() - start
+
+    print(
+        f"words={count_words} clusters={len(ann_index.centroids)} k={K} "
+        f"build={build_duration:.1f} s"
+    )
+    print(f"exact              recall@{K}=1.000  {exact_qps:8.0f} queries/s")
+    for n_probe in N_PROBES:
+        start = time.perf_counter()
+        indexes, _ = ann_index.search(vectors=vectors, k=K, n_probe=n_probe)
+        qps = COUNT_QUERIES / (time.perf_counter() - start)
+        recall = np.mean(
+            [len(set(a) & set(b)) / K for a, b in zip(indexes, exact_indexes)]
+        )
+        print(
+            f"ivf n_probe={n_probe:4d}  recall@{K}={recall:.3f}  {qps:8.0f} queries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
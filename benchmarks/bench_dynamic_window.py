@@ -0,0 +1,46 @@
+"""Benchmark the effect of the dynamic window on pair volume and epoch time.
+
+Usage:
+    python -m benchmarks.bench_dynamic_window
+"""
+import logging
+
+from benchmarks.common import measure_streaming_epoch, synthetic_sentences
+from nlp_negative_sampling.models.skip_gram import WINDOW_SIZE, SkipGram
+
+COUNT_SENTENCES = 5000
+SENTENCE_LENGTH = 20
+VOCABULARY_SIZE = 20000
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Report positive pairs and wall time of one streaming epoch per window mode."""
+    sentences = synthetic_sentences(
+        count_sentences=COUNT_SENTENCES,
+        sentence_length=SENTENCE_LENGTH,
+        vocabulary_size=VOCABULARY_SIZE,
+    )
+
+    base = None
+    for dynamic_window in [False, True]:
+        sg_model = SkipGram(
+            logger=logger,
+            sentences=sentences,
+            seed=0,
+            streaming=True,
+            dynamic_window=dynamic_window,
+        )
+        count_pairs, duration = measure_streaming_epoch(sg_model=sg_model)
+        base = base or (count_pairs, duration)
+
+        print(
+            f"window={WINDOW_SIZE} dynamic={str(dynamic_window):5s}  "
+            f"{count_pairs:8d} pairs/epoch ({base[0] / count_pairs:4.2f}x fewer)  "
+            f"{duration:6.2f} s/epoch ({base[1] / duration:4.2f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
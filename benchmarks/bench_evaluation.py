@@ -0,0 +1,95 @@
+"""Benchmark the evaluation of a pairs file, loaded whole or streamed by chunks.
+
+Usage:
+    python -m benchmarks.bench_evaluation [count_pairs]
+"""
+from argparse import Namespace
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from nlp_negative_sampling.libs.similarity import pairs_similarity
+from nlp_negative_sampling.models.skip_gram import SkipGram
+from nlp_negative_sampling.processes.workers.compute_embedding_and_similarity import (
+    skip_gram_similarity_worker,
+)
+from nlp_negative_sampling.utils.input_handler import PAIRS_CHUNK_SIZE, load_pairs
+
+COUNT_PAIRS = 1000000
+MODEL_PATH = "data/test_worker/trained_model/"
+
+logger = logging.getLogger(__name__)
+
+
+def _evaluate_whole(pairs_path: str, results_path: str) -> None:
+    """Evaluate the pairs loaded in memory at once."""
+    embed_matrix, words_voc = SkipGram.load_model(model_path=MODEL_PATH)
+    pairs = load_pairs(path=pairs_path)
+    results_df = pd.DataFrame(
+        columns=["word_1", "word_2"], data=[pair[:2] for pair in pairs]
+    )
+    results_df["similarity"] = pairs_similarity(
+        logger=logger,
+        words_1=results_df["word_1"],
+        words_2=results_df["word_2"],
+        words_voc=words_voc,
+        embed_matrix=embed_matrix,
+    )
+    results_df.to_csv(path_or_buf=results_path, index=False)
+
+
+def _evaluate_streaming(pairs_path: str, results_path: str) -> None:
+    """Evaluate the pairs with the worker, by chunks."""
+    skip_gram_similarity_worker(
+        args=Namespace(
+            test=True,
+            text_path=pairs_path,
+            model_path=MODEL_PATH,
+            results_path=results_path,
+            pairs_chunk_size=PAIRS_CHUNK_SIZE,
+        )
+    )
+
+
+def main() -> None:
+    """Report the duration and the peak of allocated memory of both evaluations."""
+    count_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT_PAIRS
+    _, words_voc = SkipGram.load_model(model_path=MODEL_PATH)
+    words = np.append(words_voc.words, ["unknown"])
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pairs_path = os.path.join(tmp_dir, "pairs.csv")
+        pairs_df = pd.DataFrame(
+            words[rng.integers(len(words), size=(count_pairs, 2))],
+            columns=["word_1", "word_2"],
+        )
+        pairs_df["similarity"] = 0.5
+        pairs_df.to_csv(pairs_path, index=False)
+        del pairs_df
+
+        print(f"{count_pairs} pairs")
+        for name, evaluate in [
+            ("whole", _evaluate_whole),
+            ("streaming", _evaluate_streaming),
+        ]:
+            results_path = os.path.join(tmp_dir, f"results_{name}.csv")
+            start = time.perf_counter()
+            evaluate(pairs_path=pairs_path, results_path=results_path)
+            duration = time.perf_counter() - start
+            # Traced again apart, tracing allocations slows the evaluation down
+            tracemalloc.start()
+            evaluate(pairs_path=pairs_path, results_path=results_path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:10s} {duration:7.2f} s  peak memory {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
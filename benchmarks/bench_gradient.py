@@ -0,0 +1,116 @@
+"""Benchmark the per-pair, the vectorized and the sparse gradient kernels.
+
+Usage:
+    python -m benchmarks.bench_gradient
+"""
+import logging
+import timeit
+from typing import Any, Dict
+
+import numpy as np
+
+from nlp_negative_sampling.libs.gradient import (
+    apply_sparse_gradient,
+    compute_batch_gradient,
+    compute_gradient,
+    compute_sparse_gradient,
+)
+
+BATCH_SIZE = 500
+LEARNING_RATE = 0.01
+COUNT_WORDS = 14033
+EMBEDDING_DIMENSION = 100
+NEGATIVE_RATE = 5
+REPEAT = 5
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Time one training step of each kernel on a README-shaped batch."""
+    rng = np.random.default_rng(0)
+    theta = rng.random(2 * COUNT_WORDS * EMBEDDING_DIMENSION) * 1e-2
+    positive_pairs = rng.integers(COUNT_WORDS, size=(BATCH_SIZE, 2))
+    negative_pairs = rng.integers(COUNT_WORDS, size=(NEGATIVE_RATE * BATCH_SIZE, 2))
+    kwargs: Dict[str, Any] = dict(
+        logger=logger,
+        theta=theta,
+        embedding_dim=EMBEDDING_DIMENSION,
+        count_words=COUNT_WORDS,
+        count_contexts=COUNT_WORDS,
+    )
+
+    loop_grad = compute_gradient(
+        positive_pairs=[tuple(pair) for pair in positive_pairs],
+        negative_pairs=[tuple(pair) for pair in negative_pairs],
+        **kwargs,
+    )
+    batch_grad = compute_batch_gradient(
+        positive_pairs=positive_pairs, negative_pairs=negative_pairs, **kwargs
+    )
+    assert np.allclose(loop_grad, batch_grad, rtol=1e-10, atol=1e-18)
+
+    loop_time = min(
+        timeit.repeat(
+            lambda: compute_gradient(
+                positive_pairs=[tuple(pair) for pair in positive_pairs],
+                negative_pairs=[tuple(pair) for pair in negative_pairs],
+                **kwargs,
+            ),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    batch_time = min(
+        timeit.repeat(
+            lambda: compute_batch_gradient(
+                positive_pairs=positive_pairs, negative_pairs=negative_pairs, **kwargs
+            ),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+
+    words_matrix = theta[: EMBEDDING_DIMENSION * COUNT_WORDS].reshape(
+        COUNT_WORDS, EMBEDDING_DIMENSION
+    )
+    contexts_matrix = theta[EMBEDDING_DIMENSION * COUNT_WORDS :].reshape(
+        COUNT_WORDS, EMBEDDING_DIMENSION
+    )
+
+    def sparse_step() -> None:
+        """Compute the sparse gradient and apply it in place."""
+        apply_sparse_gradient(
+            words_matrix=words_matrix,
+            contexts_matrix=contexts_matrix,
+            gradient=compute_sparse_gradient(
+                words_matrix=words_matrix,
+                contexts_matrix=contexts_matrix,
+                positive_pairs=positive_pairs,
+                negative_pairs=negative_pairs,
+            ),
+            learning_rate=LEARNING_RATE,
+        )
+
+    dense_step_time = min(
+        timeit.repeat(
+            lambda: theta
+            + LEARNING_RATE
+            * compute_batch_gradient(
+                positive_pairs=positive_pairs, negative_pairs=negative_pairs, **kwargs
+            ),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    sparse_step_time = min(timeit.repeat(sparse_step, number=1, repeat=REPEAT))
+
+    print(f"per-pair loop gradient   : {1000 * loop_time:8.2f} ms / batch")
+    print(f"vectorized gradient      : {1000 * batch_time:8.2f} ms / batch")
+    print(f"speedup                  : {loop_time / batch_time:8.1f}x")
+    print(f"dense vectorized step    : {1000 * dense_step_time:8.2f} ms / batch")
+    print(f"sparse in-place step     : {1000 * sparse_step_time:8.2f} ms / batch")
+
+
+if __name__ == "__main__":
+    main()
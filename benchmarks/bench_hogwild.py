@@ -0,0 +1,80 @@
+"""Benchmark the throughput of Hogwild-style training from 1 to N processes.
+
+Usage:
+    python -m benchmarks.bench_hogwild [max_workers]
+"""
+import logging
+import multiprocessing as mp
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import synthetic_sentences
+from nlp_negative_sampling.libs.similarity import words_similarity
+from nlp_negative_sampling.models import skip_gram
+from nlp_negative_sampling.models.skip_gram import SkipGram
+from nlp_negative_sampling.utils.input_handler import load_pairs
+from nlp_negative_sampling.utils.process_text_data import tokenize_file
+
+COUNT_SENTENCES = 3000
+SENTENCE_LENGTH = 20
+VOCABULARY_SIZE = 2000
+TEST_CORPUS = "data/test_worker/text.txt"
+TEST_PAIRS = "data/test_worker/test_results/pairs.csv"
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Report pairs/s for each number of processes and the test pairs similarity."""
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else mp.cpu_count()
+    skip_gram.EPOCHS = 1
+    sg_model = SkipGram(
+        logger=logger,
+        sentences=synthetic_sentences(
+            count_sentences=COUNT_SENTENCES,
+            sentence_length=SENTENCE_LENGTH,
+            vocabulary_size=VOCABULARY_SIZE,
+        ),
+    )
+    if sg_model.positive_pairs is None:
+        raise RuntimeError("Positive pairs are not materialized.")
+    count_pairs = len(sg_model.positive_pairs)
+
+    test_model = SkipGram(logger=logger, sentences=tokenize_file(file=TEST_CORPUS))
+    test_pairs = load_pairs(path=TEST_PAIRS)
+
+    print(f"{count_pairs} positive pairs, {mp.cpu_count()} cpus")
+    base_throughput = None
+    for workers in range(1, max_workers + 1):
+        np.random.seed(0)
+        start = time.perf_counter()
+        sg_model.train(workers=workers)
+        throughput = count_pairs / (time.perf_counter() - start)
+        base_throughput = base_throughput or throughput
+
+        skip_gram.BATCH_SIZE, batch_size = 10, skip_gram.BATCH_SIZE
+        skip_gram.EPOCHS = 5
+        test_model.train(workers=workers)
+        skip_gram.BATCH_SIZE, skip_gram.EPOCHS = batch_size, 1
+        similarities = [
+            words_similarity(
+                logger=logger,
+                word_1=word_1,
+                word_2=word_2,
+                words_voc=test_model.words_voc,
+                embed_matrix=test_model.embed_matrix,
+            )
+            for word_1, word_2, _ in test_pairs
+        ]
+
+        print(
+            f"workers={workers:2d}  {throughput:10.0f} pairs/s  "
+            f"scaling={throughput / base_throughput:5.2f}x  "
+            f"test similarity={np.round(similarities, 4).tolist()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
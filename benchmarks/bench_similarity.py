@@ -0,0 +1,159 @@
+"""Benchmark the k most similar words queries, one at a time and in batches.
+
+Usage:
+    python -m benchmarks.bench_similarity
+"""
+import logging
+import multiprocessing as mp
+import time
+from typing import Callable, List, Mapping, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.libs.similarity import (
+    SimilarityCache,
+    SimilarityIndex,
+    find_k_most_similar,
+    find_k_most_similar_batch,
+    pairs_similarity,
+    words_similarity,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+COUNT_QUERIES = 20
+COUNT_SKEWED_QUERIES = 20000
+COUNT_SCORED_PAIRS = 1000000
+EMBEDDING_DIMENSION = 100
+K = 10
+VOCABULARY_SIZE = 14000
+
+logger = logging.getLogger(__name__)
+
+
+def _time_per_query(query: Callable[[str], object], words: np.ndarray) -> float:
+    """Return the mean duration of a query, in milliseconds."""
+    start = time.perf_counter()
+    for word in words:
+        query(word)
+    return (time.perf_counter() - start) / len(words) * 1e3
+
+
+def main() -> None:
+    """Report the latency of the pairwise, vectorized and indexed queries."""
+    rng = np.random.default_rng(0)
+    embed_matrix = rng.normal(size=(VOCABULARY_SIZE, EMBEDDING_DIMENSION))
+    vocabulary = Vocabulary(
+        words=[f"w{index}" for index in range(VOCABULARY_SIZE)],
+        counts=np.ones(VOCABULARY_SIZE),
+    )
+    queries = vocabulary.words[rng.choice(VOCABULARY_SIZE, size=COUNT_QUERIES)]
+
+    def pairwise(word: str) -> List[str]:
+        """Rank the words like `find_k_most_similar` formerly did."""
+        similarity_dict = {
+            other: words_similarity(
+                logger=logger,
+                word_1=word,
+                word_2=other,
+                words_voc=vocabulary,
+                embed_matrix=embed_matrix,
+            )
+            for other in vocabulary
+        }
+        return sorted(similarity_dict, key=similarity_dict.__getitem__, reverse=True)
+
+    def vectorized(word: str) -> Tuple[List[str], Mapping[str, float]]:
+        """Rank the words with `find_k_most_similar`."""
+        return find_k_most_similar(
+            logger=logger,
+            word_target=word,
+            k=K,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+        )
+
+    index = SimilarityIndex(words_voc=vocabulary, embed_matrix=embed_matrix)
+
+    def indexed(word: str) -> object:
+        """Rank the words with an index built once."""
+        return index.top_k(vector=index.query_vector(logger=logger, word=word), k=K)
+
+    assert pairwise(queries[0])[1 : K + 1] == vectorized(queries[0])[0]
+    print(f"vocabulary={VOCABULARY_SIZE} dimension={EMBEDDING_DIMENSION} k={K}")
+    for name, query in [
+        ("pairwise", pairwise),
+        ("find_k_most_similar", vectorized),
+        ("SimilarityIndex.top_k", indexed),
+    ]:
+        words = queries[:2] if query is pairwise else queries
+        print(f"{name:22s} {_time_per_query(query=query, words=words):9.3f} ms/query")
+
+    # Skewed traffic: the same pairs and words are queried again and again
+    pairs = vocabulary.words[
+        (rng.zipf(1.5, size=(COUNT_SKEWED_QUERIES, 2)) - 1) % VOCABULARY_SIZE
+    ]
+    cache = SimilarityCache()
+    for name, similarity in [
+        ("pairs", words_similarity),
+        ("cached pairs", cache.words_similarity),
+    ]:
+        start = time.perf_counter()
+        for word_1, word_2 in pairs:
+            similarity(
+                logger=logger,
+                word_1=word_1,
+                word_2=word_2,
+                words_voc=vocabulary,
+                embed_matrix=embed_matrix,
+            )
+        duration = (time.perf_counter() - start) / COUNT_SKEWED_QUERIES * 1e6
+        print(f"{name:22s} {duration:9.3f} us/query")
+    start = time.perf_counter()
+    for word in pairs[:, 0]:
+        cache.top_k_words(
+            logger=logger,
+            word_target=word,
+            k=K,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+        )
+    duration = (time.perf_counter() - start) / COUNT_SKEWED_QUERIES * 1e3
+    print(
+        f"{'cached top k':22s} {duration:9.3f} ms/query  "
+        f"hit rate={cache.hits / (cache.hits + cache.misses):.2f}"
+    )
+
+    # Evaluation of a pairs file, with some unknown words
+    words = np.append(vocabulary.words, ["unknown"])
+    scored_pairs = words[rng.integers(len(words), size=(COUNT_SCORED_PAIRS, 2))]
+    start = time.perf_counter()
+    pairs_similarity(
+        logger=logger,
+        words_1=scored_pairs[:, 0],
+        words_2=scored_pairs[:, 1],
+        words_voc=vocabulary,
+        embed_matrix=embed_matrix,
+    )
+    duration = time.perf_counter() - start
+    print(f"pairs_similarity of {COUNT_SCORED_PAIRS} pairs {duration:9.2f} s")
+
+    # Neighbors of the whole vocabulary
+    for workers in sorted({1, mp.cpu_count()}):
+        start = time.perf_counter()
+        find_k_most_similar_batch(
+            logger=logger,
+            queries=vocabulary.words,
+            k=K,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+            workers=workers,
+        )
+        duration = time.perf_counter() - start
+        print(
+            f"batch of {VOCABULARY_SIZE} workers={workers:2d} "
+            f"{duration / VOCABULARY_SIZE * 1e3:9.3f} ms/query ({duration:.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the similarity server, with and without micro-batching.
+
+Usage:
+    python -m benchmarks.bench_similarity_server
+"""
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from nlp_negative_sampling.libs.similarity import SimilarityIndex
+from nlp_negative_sampling.processes.servers.similarity_server import SimilarityServer
+
+COUNT_CLIENTS = 32
+EMBEDDING_DIMENSION = 100
+K = 10
+QUERIES_PER_CLIENT = 100
+VOCABULARY_SIZE = 14000
+
+
+async def _client(port: int, words: np.ndarray) -> None:
+    """Send top k queries one after the other, each one once answered."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for word in words:
+        writer.write(json.dumps(dict(op="top_k", word=word, k=K)).encode() + b"\n")
+        await writer.drain()
+        await reader.readline()
+    writer.close()
+
+
+async def _measure(similarity: SimilarityServer, queries: np.ndarray) -> float:
+    """Serve concurrent clients, and return the duration."""
+    server = await similarity.start(host="127.0.0.1", port=0)
+    port = server.sockets[0].getsockname()[1]
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(port, words) for words in queries])
+    duration = time.perf_counter() - start
+    server.close()
+    similarity.stop()
+    return duration
+
+
+def main() -> None:
+    """Report queries/s and latency percentiles for a few batch sizes."""
+    rng = np.random.default_rng(0)
+    embed_matrix = rng.normal(size=(VOCABULARY_SIZE, EMBEDDING_DIMENSION))
+    index = SimilarityIndex(
+        words_voc={f"w{i}": i for i in range(VOCABULARY_SIZE)},
+        embed_matrix=embed_matrix,
+    )
+    queries = index.words[
+        rng.integers(VOCABULARY_SIZE, size=(COUNT_CLIENTS, QUERIES_PER_CLIENT))
+    ]
+
+    print(f"vocabulary={VOCABULARY_SIZE} clients={COUNT_CLIENTS} k={K}")
+    for max_batch_size in [1, 8, 64]:
+        similarity = SimilarityServer(
+            index=index, embed_matrix=embed_matrix, max_batch_size=max_batch_size
+        )
+        duration = asyncio.run(_measure(similarity=similarity, queries=queries))
+        metrics = similarity.metrics()
+        print(
+            f"max_batch_size={max_batch_size:3d} "
+            f"{metrics['requests'] / duration:8.0f} queries/s  "
+            f"mean batch={metrics['mean_batch_size']:5.1f}  "
+            f"p50={metrics['p50_ms']:6.2f} ms  p99={metrics['p99_ms']:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark the effect of frequent-word subsampling on pair volume and epoch time.
+
+Usage:
+    python -m benchmarks.bench_subsampling
+"""
+import logging
+
+from benchmarks.common import measure_streaming_epoch, synthetic_sentences
+from nlp_negative_sampling.models.skip_gram import SkipGram
+
+COUNT_SENTENCES = 5000
+SENTENCE_LENGTH = 20
+THRESHOLDS = [None, 1e-3, 1e-4, 1e-5]
+VOCABULARY_SIZE = 20000
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Report positive pairs and wall time of one streaming epoch per threshold."""
+    sentences = synthetic_sentences(
+        count_sentences=COUNT_SENTENCES,
+        sentence_length=SENTENCE_LENGTH,
+        vocabulary_size=VOCABULARY_SIZE,
+    )
+
+    base = None
+    for threshold in THRESHOLDS:
+        sg_model = SkipGram(
+            logger=logger,
+            sentences=sentences,
+            seed=0,
+            streaming=True,
+            subsample_threshold=threshold,
+        )
+        count_pairs, duration = measure_streaming_epoch(sg_model=sg_model)
+        base = base or (count_pairs, duration)
+
+        print(
+            f"threshold={str(threshold):6s}  {count_pairs:8d} pairs/epoch "
+            f"({base[0] / count_pairs:4.1f}x fewer)  "
+            f"{duration:6.2f} s/epoch ({base[1] / duration:4.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
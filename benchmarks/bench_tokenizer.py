@@ -0,0 +1,48 @@
+"""Benchmark the fused tokenizer against the composed tokenization steps.
+
+Usage:
+    python -m benchmarks.bench_tokenizer
+"""
+import time
+from typing import Callable, List
+
+from nlp_negative_sampling.utils.func_tools import compose
+from nlp_negative_sampling.utils.process_text_data import (
+    get_list_lower_words,
+    keep_alphabetical_words,
+    remove_punctuation,
+    tokenize_line,
+)
+
+REPEATS = 20
+TEXT_PATH = "data/test_worker/text.txt"
+
+
+def _measure(tokenizer: Callable[[str], List[str]], lines: List[str]) -> float:
+    """Return the throughput of a tokenizer, in lines per second."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for line in lines:
+            tokenizer(line)
+    return REPEATS * len(lines) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Report the lines/sec of both tokenizers on the test corpus."""
+    with open(TEXT_PATH, encoding="utf8") as text_file:
+        lines = text_file.read().split("\n")
+
+    composed = _measure(
+        tokenizer=compose(
+            keep_alphabetical_words, remove_punctuation, get_list_lower_words
+        ),
+        lines=lines,
+    )
+    fused = _measure(tokenizer=tokenize_line, lines=lines)
+
+    print(f"composed  {composed:10.0f} lines/s")
+    print(f"fused     {fused:10.0f} lines/s ({fused / composed:4.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
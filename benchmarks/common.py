@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmarks."""
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.models import skip_gram
+from nlp_negative_sampling.models.skip_gram import SkipGram
+
+
+def synthetic_sentences(
+    count_sentences: int, sentence_length: int, vocabulary_size: int, seed: int = 0
+) -> List[List[str]]:
+    """Sentences of Zipf-distributed words, like natural text."""
+    rng = np.random.default_rng(seed)
+    words = rng.zipf(1.3, size=(count_sentences, sentence_length)) % vocabulary_size
+    return [[f"w{word}" for word in sentence] for sentence in words]
+
+
+def measure_streaming_epoch(sg_model: SkipGram) -> Tuple[int, float]:
+    """Count the positive pairs of one epoch of a streaming model and time it."""
+    if sg_model.corpus is None:
+        raise ValueError("The model must be streaming.")
+    count_pairs = 0
+    for batch_positive, *_ in skip_gram._iter_batches(
+        data=sg_model.corpus._asdict(),
+        sampler=sg_model._sampler,
+        batch_size=skip_gram.BATCH_SIZE,
+        negative_rate=skip_gram.NEGATIVE_RATE,
+        window_size=skip_gram.WINDOW_SIZE,
+        keep_probabilities=sg_model._keep_probabilities,
+        dynamic_window=sg_model._dynamic_window,
+    ):
+        count_pairs += len(batch_positive)
+
+    epochs, skip_gram.EPOCHS = skip_gram.EPOCHS, 1
+    start = time.perf_counter()
+    sg_model.train()
+    duration = time.perf_counter() - start
+    skip_gram.EPOCHS = epochs
+
+    return count_pairs, duration
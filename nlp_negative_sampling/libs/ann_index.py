@@ -0,0 +1,188 @@
+"""Approximate nearest neighbours index of the embeddings.
+
+Inverted file (IVF) index: the words are grouped by their nearest k-means centroid,
+and a query only scores the words of the `n_probe` clusters whose centroids are the
+most similar to it. More clusters make the lists shorter (faster queries), more
+probes make the recall higher (slower queries).
+"""
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.libs.similarity import normalize_vectors
+
+ANN_INDEX_VERSION = 1
+ANN_METADATA_FILE = "ivf.json"
+ANN_CENTROIDS_FILE = "ivf_centroids.npy"
+ANN_LISTS_FILE = "ivf_lists.npy"
+ANN_OFFSETS_FILE = "ivf_offsets.npy"
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_CLUSTER = 256
+ASSIGNMENT_CHUNK_SIZE = 10000
+N_PROBE = 8
+
+
+class IVFIndex:
+    """Words grouped in clusters, to search the most similar ones approximately.
+
+    Similarity is the absolute cosine similarity, like in `libs.similarity`.
+
+    Attributes:
+        normalized_matrix: embeddings of norm 1.
+        centroids: normalized centroid of each cluster.
+        lists: indexes of the words, grouped by cluster.
+        offsets: the words of cluster `c` are `lists[offsets[c]:offsets[c + 1]]`.
+    """
+
+    def __init__(
+        self,
+        normalized_matrix: np.ndarray,
+        centroids: np.ndarray,
+        lists: np.ndarray,
+        offsets: np.ndarray,
+    ) -> None:
+        """Instantiate an index from its clusters, use `build` to compute them."""
+        self.normalized_matrix = normalized_matrix
+        self.centroids = centroids
+        self.lists = lists
+        self.offsets = offsets
+
+    @classmethod
+    def build(
+        cls,
+        normalized_matrix: np.ndarray,
+        count_clusters: Optional[int] = None,
+        iterations: int = KMEANS_ITERATIONS,
+        seed: Optional[int] = None,
+    ) -> "IVFIndex":
+        """Cluster the embeddings with spherical k-means.
+
+        Args:
+            normalized_matrix: embeddings of norm 1.
+            count_clusters: number of clusters, the square root of the number of
+                words by default.
+            iterations: number of k-means iterations.
+            seed: seed of the initial centroids and of the training sample.
+
+        Returns:
+            The index of the embeddings.
+        """
+        rng = np.random.default_rng(seed)
+        count_words = len(normalized_matrix)
+        if count_clusters is None:
+            count_clusters = int(np.sqrt(count_words))
+        count_clusters = max(1, min(count_clusters, count_words))
+
+        # Centroids are fitted on a sample, then every word is assigned
+        count_samples = min(count_words, KMEANS_SAMPLES_PER_CLUSTER * count_clusters)
+        sample = normalized_matrix[
+            np.sort(rng.choice(count_words, size=count_samples, replace=False))
+        ]
+        centroids = sample[
+            rng.choice(count_samples, size=count_clusters, replace=False)
+        ]
+        for _ in range(iterations):
+            assignments = _assign(vectors=sample, centroids=centroids)
+            counts = np.bincount(assignments, minlength=count_clusters)
+            order = np.argsort(assignments, kind="stable")
+            starts = np.cumsum(counts) - counts
+            non_empty = np.flatnonzero(counts)
+            sums = np.empty_like(centroids)
+            sums[non_empty] = np.add.reduceat(sample[order], starts[non_empty])
+            # Empty clusters restart from random samples
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = sample[rng.choice(count_samples, size=len(empty))]
+            centroids = normalize_vectors(sums)
+
+        assignments = _assign(vectors=normalized_matrix, centroids=centroids)
+        lists = np.argsort(assignments, kind="stable")
+        offsets = np.zeros(count_clusters + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=count_clusters), out=offsets[1:])
+        return cls(
+            normalized_matrix=normalized_matrix,
+            centroids=centroids,
+            lists=lists,
+            offsets=offsets,
+        )
+
+    def search(
+        self, vectors: np.ndarray, k: int, n_probe: int = N_PROBE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the indexes and scores of the k words most similar to each vector.
+
+        Args:
+            vectors: normalized query vectors, one per row.
+            k: number of similar words to look for.
+            n_probe: number of clusters searched for each query.
+
+        Returns:
+            The indexes and scores, of shape (queries, k), ranked by decreasing score.
+            When the probed clusters have fewer than k words, the results end with
+            indexes -1 and scores -inf.
+        """
+        indexes = np.full((len(vectors), k), -1, dtype=np.int64)
+        scores = np.full((len(vectors), k), -np.inf)
+        centroid_scores = np.abs(vectors @ self.centroids.T)
+        n_probe = min(n_probe, len(self.centroids))
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+
+        for row, (vector, clusters) in enumerate(zip(vectors, probes)):
+            candidates = np.concatenate(
+                [self.lists[self.offsets[c] : self.offsets[c + 1]] for c in clusters]
+            )
+            candidate_scores = np.abs(self.normalized_matrix[candidates] @ vector)
+            if k < len(candidates):
+                top = np.argpartition(-candidate_scores, k - 1)[:k]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(-candidate_scores[top], kind="stable")]
+            indexes[row, : len(top)] = candidates[top]
+            scores[row, : len(top)] = candidate_scores[top]
+        return indexes, scores
+
+    def save(self, model_path: str) -> None:
+        """Write the clusters next to the files of a model."""
+        np.save(f"{model_path}{ANN_CENTROIDS_FILE}", self.centroids)
+        np.save(f"{model_path}{ANN_LISTS_FILE}", self.lists)
+        np.save(f"{model_path}{ANN_OFFSETS_FILE}", self.offsets)
+        metadata = dict(
+            version=ANN_INDEX_VERSION,
+            count_words=len(self.lists),
+            count_clusters=len(self.centroids),
+        )
+        tmp_path = f"{model_path}{ANN_METADATA_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            json.dump(metadata, file)
+        os.replace(tmp_path, f"{model_path}{ANN_METADATA_FILE}")
+
+    @classmethod
+    def load(cls, model_path: str, normalized_matrix: np.ndarray) -> "IVFIndex":
+        """Read the clusters saved next to the files of a model.
+
+        Raises:
+            ValueError: if the index was written in another format version, or for
+                another vocabulary.
+        """
+        with open(f"{model_path}{ANN_METADATA_FILE}", encoding="utf8") as file:
+            metadata = json.load(file)
+        if metadata["version"] != ANN_INDEX_VERSION:
+            raise ValueError(f"Unsupported ANN index version {metadata['version']}.")
+        if metadata["count_words"] != len(normalized_matrix):
+            raise ValueError("The ANN index was built for another vocabulary.")
+        return cls(
+            normalized_matrix=normalized_matrix,
+            centroids=np.load(f"{model_path}{ANN_CENTROIDS_FILE}"),
+            lists=np.load(f"{model_path}{ANN_LISTS_FILE}", mmap_mode="r"),
+            offsets=np.load(f"{model_path}{ANN_OFFSETS_FILE}"),
+        )
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest centroid of each vector, by chunks."""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for begin in range(0, len(vectors), ASSIGNMENT_CHUNK_SIZE):
+        chunk = vectors[begin : begin + ASSIGNMENT_CHUNK_SIZE]
+        assignments[begin : begin + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
@@ -0,0 +1,144 @@
+"""Generators of training batches."""
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.libs.negative_sampler import NegativeSampler
+from nlp_negative_sampling.libs.pos_and_neg_pairs import get_corpus_positive_pairs
+from nlp_negative_sampling.utils.corpus import EncodedCorpus, subsample_corpus
+
+Batch = Tuple[np.ndarray, np.ndarray]
+WeightedBatch = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def iter_pairs_batches(
+    positive_pairs: np.ndarray,
+    batch_size: int,
+    sampler: NegativeSampler,
+    negative_rate: int,
+) -> Iterator[Batch]:
+    """Slice materialized positive pairs into batches and draw their negatives.
+
+    Args:
+        positive_pairs: array of shape (n, 2) of positive pairs.
+        batch_size: number of positive pairs per batch. The last incomplete batch is
+            dropped.
+        sampler: sampler of negative contexts.
+        negative_rate: number of negative pairs per positive pair.
+
+    Yields:
+        Positive pairs and negative pairs of each batch.
+    """
+    for batch_begin in range(
+        0, len(positive_pairs) // batch_size * batch_size, batch_size
+    ):
+        batch_positive = positive_pairs[batch_begin : batch_begin + batch_size]
+        yield batch_positive, sampler.sample_pairs(
+            word_indexes=batch_positive[:, 0], negative_rate=negative_rate
+        )
+
+
+def iter_weighted_pairs_batches(
+    positive_pairs: np.ndarray,
+    pair_weights: np.ndarray,
+    batch_size: int,
+    sampler: NegativeSampler,
+    negative_rate: int,
+) -> Iterator[WeightedBatch]:
+    """Slice distinct positive pairs into batches, with their weights.
+
+    Args:
+        positive_pairs: array of shape (n, 2) of distinct positive pairs.
+        pair_weights: weight of each pair, e.g. its number of occurrences.
+        batch_size: number of distinct pairs per batch. The last incomplete batch is
+            dropped.
+        sampler: sampler of negative contexts.
+        negative_rate: number of negative pairs per positive pair.
+
+    Yields:
+        Positive pairs, negative pairs and weights of the positive pairs of each
+        batch.
+    """
+    for (batch_positive, batch_negative), batch_begin in zip(
+        iter_pairs_batches(
+            positive_pairs=positive_pairs,
+            batch_size=batch_size,
+            sampler=sampler,
+            negative_rate=negative_rate,
+        ),
+        range(0, len(positive_pairs), batch_size),
+    ):
+        yield batch_positive, batch_negative, pair_weights[
+            batch_begin : batch_begin + batch_size
+        ]
+
+
+def iter_corpus_batches(
+    corpus: EncodedCorpus,
+    window_size: int,
+    batch_size: int,
+    sampler: NegativeSampler,
+    negative_rate: int,
+    keep_probabilities: Optional[np.ndarray] = None,
+    dynamic_window: bool = False,
+) -> Iterator[Batch]:
+    """Generate the batches of an encoded corpus on the fly.
+
+    The corpus is walked by chunks of sentences of about `batch_size` tokens, so only
+    a few batches of pairs are in memory at once. Frequent words are subsampled chunk
+    by chunk, so each pass over the corpus sees a new subsample.
+
+    Args:
+        corpus: integer-encoded sentences.
+        window_size: number of words to look at.
+        batch_size: number of positive pairs per batch. The last incomplete batch is
+            dropped.
+        sampler: sampler of negative contexts.
+        negative_rate: number of negative pairs per positive pair.
+        keep_probabilities: if given, probability of keeping each word of the
+            vocabulary (see `get_keep_probabilities`).
+        dynamic_window: if True, the window of each target word is shrunk to a size
+            drawn uniformly in [1, window_size // 2].
+
+    Yields:
+        Positive pairs and negative pairs of each batch.
+    """
+    pending: List[np.ndarray] = []
+    count_pending = 0
+    chunk_begin = 0
+
+    while chunk_begin < corpus.count_sentences:
+        # Sentences with about `batch_size` tokens (at least one sentence)
+        chunk_end = np.searchsorted(
+            corpus.offsets, corpus.offsets[chunk_begin] + batch_size, side="right"
+        )
+        chunk_end = min(max(chunk_end - 1, chunk_begin + 1), corpus.count_sentences)
+        chunk = corpus.select(begin=chunk_begin, end=chunk_end)
+        chunk_begin = chunk_end
+        if keep_probabilities is not None:
+            chunk = subsample_corpus(
+                corpus=chunk, keep_probabilities=keep_probabilities, rng=sampler.rng
+            )
+
+        pairs = get_corpus_positive_pairs(
+            corpus=chunk,
+            window_size=window_size,
+            dynamic_window=dynamic_window,
+            rng=sampler.rng,
+        )
+
+        pending.append(pairs)
+        count_pending += len(pairs)
+        if count_pending < batch_size:
+            continue
+
+        buffer = np.concatenate(pending)
+        count_complete = len(buffer) // batch_size * batch_size
+        for batch_positive in np.split(
+            buffer[:count_complete], count_complete // batch_size
+        ):
+            yield batch_positive, sampler.sample_pairs(
+                word_indexes=batch_positive[:, 0], negative_rate=negative_rate
+            )
+        pending = [buffer[count_complete:]]
+        count_pending = len(pending[0])
@@ -1,11 +1,27 @@
 """Function to compute gradient."""
 import logging
-from typing import List, Tuple
+from typing import List, NamedTuple, Optional, Tuple
 
 import numpy as np
 from scipy.special import expit
 
 
+class SparseGradient(NamedTuple):
+    """Gradient restricted to the rows of the embedding matrices touched by a batch.
+
+    Attributes:
+        word_rows: unique indexes of the target words of the batch.
+        word_deltas: gradient of each row in `word_rows`, shape (len(word_rows), dim).
+        context_rows: unique indexes of the contexts of the batch.
+        context_deltas: gradient of each row in `context_rows`.
+    """
+
+    word_rows: np.ndarray
+    word_deltas: np.ndarray
+    context_rows: np.ndarray
+    context_deltas: np.ndarray
+
+
 def _update_pos_grad(
     grad: np.ndarray,
     words_matrix: np.ndarray,
@@ -79,7 +95,7 @@ def compute_gradient(
     negative_pairs: List[Tuple[int, int]],
     count_words: int,
     count_contexts: int,
-):
+) -> np.ndarray:
     """Compute gradient at init_theta for positive and negative pairs."""
     # Initialize gradient
     grad = np.zeros(len(theta))
@@ -119,3 +135,186 @@ def compute_gradient(
     logger.info("Gradient updated using negative pairs.")
 
     return grad
+
+
+def _batch_pairs_derivatives(
+    words_matrix: np.ndarray,
+    contexts_matrix: np.ndarray,
+    pairs: np.ndarray,
+    positive: bool,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the derivatives of every (word, context) pair of a batch at once.
+
+    Args:
+        words_matrix: embedding matrix of target words.
+        contexts_matrix: embedding matrix of contexts.
+        pairs: array of shape (n, 2) containing (word index, context index).
+        positive: whether the pairs are positive or negative examples.
+        weights: if given, weight of each pair (e.g. its number of occurrences).
+
+    Returns:
+        Derivatives with respect to the words and to the contexts, both of shape (n, dim).
+    """
+    words = words_matrix[pairs[:, 0]]
+    contexts = contexts_matrix[pairs[:, 1]]
+    dots = np.einsum("ij,ij->i", words, contexts)
+
+    # Same derivatives as `_update_pos_grad` and `_update_neg_gradient`, row by row
+    if positive:
+        coefficients = expit(-dots)
+    else:
+        coefficients = -expit(dots)
+    if weights is not None:
+        coefficients *= weights
+
+    return contexts * coefficients[:, None], words * coefficients[:, None]
+
+
+def compute_batch_gradient(
+    logger: logging.Logger,
+    theta: np.ndarray,
+    embedding_dim: int,
+    positive_pairs: np.ndarray,
+    negative_pairs: np.ndarray,
+    count_words: int,
+    count_contexts: int,
+) -> np.ndarray:
+    """Compute gradient at theta for a batch of positive and negative pairs.
+
+    Vectorized equivalent of `compute_gradient`: all dot products and sigmoids of the
+    batch are computed in one NumPy pass and rows that appear several times are
+    accumulated with a scatter-add.
+
+    Args:
+        logger: logger.
+        theta: vector of parameters (words embeddings followed by contexts embeddings).
+        embedding_dim: dimension of the embeddings.
+        positive_pairs: array of shape (n, 2) of (word index, context index).
+        negative_pairs: array of shape (m, 2) of (word index, negative context index).
+        count_words: number of target words.
+        count_contexts: number of contexts.
+
+    Returns:
+        The gradient, a vector of the same size as theta.
+    """
+    grad = np.zeros(len(theta))
+
+    # 2-D views on theta and on the gradient
+    words_matrix = theta[: embedding_dim * count_words].reshape(
+        count_words, embedding_dim
+    )
+    contexts_matrix = theta[embedding_dim * count_words :].reshape(
+        count_contexts, embedding_dim
+    )
+    words_grad = grad[: embedding_dim * count_words].reshape(count_words, embedding_dim)
+    contexts_grad = grad[embedding_dim * count_words :].reshape(
+        count_contexts, embedding_dim
+    )
+
+    logger.info("Start computing gradient...")
+    for pairs, positive in (
+        (np.asarray(positive_pairs, dtype=np.int64).reshape(-1, 2), True),
+        (np.asarray(negative_pairs, dtype=np.int64).reshape(-1, 2), False),
+    ):
+        df_words, df_contexts = _batch_pairs_derivatives(
+            words_matrix=words_matrix,
+            contexts_matrix=contexts_matrix,
+            pairs=pairs,
+            positive=positive,
+        )
+        np.add.at(words_grad, pairs[:, 0], df_words)
+        np.add.at(contexts_grad, pairs[:, 1], df_contexts)
+    logger.info("Gradient updated using positive and negative pairs.")
+
+    return grad
+
+
+def _accumulate_rows(
+    indexes: np.ndarray, derivatives: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum the derivatives that target the same row.
+
+    Args:
+        indexes: row index of each derivative.
+        derivatives: array of shape (len(indexes), dim).
+
+    Returns:
+        Unique row indexes and their summed derivatives.
+    """
+    rows, inverse = np.unique(indexes, return_inverse=True)
+    deltas = np.zeros((len(rows), derivatives.shape[1]))
+    np.add.at(deltas, inverse.ravel(), derivatives)
+    return rows, deltas
+
+
+def compute_sparse_gradient(
+    words_matrix: np.ndarray,
+    contexts_matrix: np.ndarray,
+    positive_pairs: np.ndarray,
+    negative_pairs: np.ndarray,
+    positive_weights: Optional[np.ndarray] = None,
+    negative_weights: Optional[np.ndarray] = None,
+) -> SparseGradient:
+    """Compute the gradient of a batch only for the rows it touches.
+
+    The cost only depends on the size of the batch, not on the size of the vocabulary.
+
+    Args:
+        words_matrix: embedding matrix of target words, shape (count_words, dim).
+        contexts_matrix: embedding matrix of contexts, shape (count_contexts, dim).
+        positive_pairs: array of shape (n, 2) of (word index, context index).
+        negative_pairs: array of shape (m, 2) of (word index, negative context index).
+        positive_weights: if given, weight of each positive pair, shape (n,).
+        negative_weights: if given, weight of each negative pair, shape (m,).
+
+    Returns:
+        The sparse gradient of the batch.
+    """
+    positive_pairs = np.asarray(positive_pairs, dtype=np.int64).reshape(-1, 2)
+    negative_pairs = np.asarray(negative_pairs, dtype=np.int64).reshape(-1, 2)
+
+    df_words_pos, df_contexts_pos = _batch_pairs_derivatives(
+        words_matrix=words_matrix,
+        contexts_matrix=contexts_matrix,
+        pairs=positive_pairs,
+        positive=True,
+        weights=positive_weights,
+    )
+    df_words_neg, df_contexts_neg = _batch_pairs_derivatives(
+        words_matrix=words_matrix,
+        contexts_matrix=contexts_matrix,
+        pairs=negative_pairs,
+        positive=False,
+        weights=negative_weights,
+    )
+
+    word_rows, word_deltas = _accumulate_rows(
+        indexes=np.concatenate([positive_pairs[:, 0], negative_pairs[:, 0]]),
+        derivatives=np.concatenate([df_words_pos, df_words_neg]),
+    )
+    context_rows, context_deltas = _accumulate_rows(
+        indexes=np.concatenate([positive_pairs[:, 1], negative_pairs[:, 1]]),
+        derivatives=np.concatenate([df_contexts_pos, df_contexts_neg]),
+    )
+
+    return SparseGradient(
+        word_rows=word_rows,
+        word_deltas=word_deltas,
+        context_rows=context_rows,
+        context_deltas=context_deltas,
+    )
+
+
+def apply_sparse_gradient(
+    words_matrix: np.ndarray,
+    contexts_matrix: np.ndarray,
+    gradient: SparseGradient,
+    learning_rate: float,
+) -> None:
+    """Update in place the rows of the embedding matrices touched by the gradient.
+
+    Since we want to maximize the 'loss', the gradient is added.
+    """
+    words_matrix[gradient.word_rows] += learning_rate * gradient.word_deltas
+    contexts_matrix[gradient.context_rows] += learning_rate * gradient.context_deltas
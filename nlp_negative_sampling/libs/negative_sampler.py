@@ -0,0 +1,91 @@
+"""Sampler of negative contexts."""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.libs.pos_and_neg_pairs import PAIRS_DTYPE
+
+UNIGRAM_POWER = 0.75
+
+
+def _build_alias_table(probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the tables of Vose's alias method for a discrete distribution.
+
+    Args:
+        probabilities: probability of each index, summing to 1.
+
+    Returns:
+        Probability of keeping each index and the alias to use otherwise.
+    """
+    count_indexes = len(probabilities)
+    scaled = probabilities * count_indexes
+    keep_probabilities = np.ones(count_indexes)
+    aliases = np.arange(count_indexes)
+
+    small = list(np.flatnonzero(scaled < 1))
+    large = list(np.flatnonzero(scaled >= 1))
+    while small and large:
+        small_index = small.pop()
+        large_index = large.pop()
+        keep_probabilities[small_index] = scaled[small_index]
+        aliases[small_index] = large_index
+        scaled[large_index] += scaled[small_index] - 1
+        if scaled[large_index] < 1:
+            small.append(large_index)
+        else:
+            large.append(large_index)
+
+    return keep_probabilities, aliases
+
+
+class NegativeSampler:
+    """Draw negative contexts from the unigram distribution raised to the power 3/4.
+
+    The alias table is built once from the counts of the contexts, then each draw is
+    two vectorized random calls, whatever the number of negatives.
+    """
+
+    def __init__(
+        self,
+        counts: np.ndarray,
+        power: float = UNIGRAM_POWER,
+        random_state: Optional[int] = None,
+    ):
+        """Instantiate the sampler.
+
+        Args:
+            counts: number of occurrences of each context, indexed by context index.
+            power: exponent applied to the counts.
+            random_state: seed of the random generator.
+        """
+        weights = np.asarray(counts, dtype=np.float64) ** power
+        self.probabilities = weights / weights.sum()
+        self._keep_probabilities, self._aliases = _build_alias_table(
+            probabilities=self.probabilities
+        )
+        self.rng = np.random.default_rng(random_state)
+
+    def reseed(self, random_state: Optional[int]) -> None:
+        """Restart the random generator, e.g. in a training process."""
+        self.rng = np.random.default_rng(random_state)
+
+    def sample(self, size: int) -> np.ndarray:
+        """Draw `size` context indexes."""
+        indexes = self.rng.integers(len(self._aliases), size=size)
+        keep = self.rng.random(size) < self._keep_probabilities[indexes]
+        return np.where(keep, indexes, self._aliases[indexes]).astype(PAIRS_DTYPE)
+
+    def sample_pairs(self, word_indexes: np.ndarray, negative_rate: int) -> np.ndarray:
+        """Draw `negative_rate` negative pairs for each target word.
+
+        Args:
+            word_indexes: indexes of the target words.
+            negative_rate: number of negative contexts per target word.
+
+        Returns:
+            Array of shape (negative_rate * len(word_indexes), 2) of negative pairs.
+        """
+        negative_pairs = np.empty((negative_rate * len(word_indexes), 2), PAIRS_DTYPE)
+        negative_pairs[:, 0] = np.repeat(word_indexes, negative_rate)
+        negative_pairs[:, 1] = self.sample(size=len(negative_pairs))
+        return negative_pairs
@@ -1,70 +1,221 @@
 """Function to get positive and negative pairs."""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+from scipy.sparse import coo_matrix
+
+from nlp_negative_sampling.utils.corpus import EncodedCorpus
+
+PAIRS_DTYPE = np.int32
+
+
+def _window_positions(
+    sentence_begins: np.ndarray,
+    sentence_ends: np.ndarray,
+    window_size: int,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the positions of the (target, context) pairs of consecutive tokens.
+
+    Pairs are ordered by target, then by context.
+
+    Args:
+        sentence_begins: position of the first token of the sentence of each token.
+        sentence_ends: position after the last token of the sentence of each token.
+        window_size: number of words to look at.
+        rng: if given, the window of each target is shrunk to a size drawn uniformly
+            in [1, window_size // 2] on both sides (dynamic window, as in word2vec).
+
+    Returns:
+        Positions of the targets and of their contexts.
+    """
+    half_window = window_size // 2
+    shifts = np.concatenate([np.arange(-half_window, 0), np.arange(1, half_window + 1)])
+    positions = np.arange(len(sentence_begins))
+
+    contexts = positions[:, None] + shifts[None, :]
+    valid = (contexts >= sentence_begins[:, None]) & (contexts < sentence_ends[:, None])
+    if rng is not None and half_window > 0:
+        reduced_windows = rng.integers(1, half_window + 1, size=len(positions))
+        valid &= np.abs(shifts)[None, :] <= reduced_windows[:, None]
+
+    targets = np.broadcast_to(positions[:, None], contexts.shape)[valid]
+    return targets, contexts[valid]
 
 
 def get_positive_pairs(
-    processed_sentences: List[List[str]], window_size: int
-) -> Tuple[List[Tuple[int, int]], Dict[str, int], Dict[str, int]]:
+    processed_sentences: List[List[str]],
+    window_size: int,
+    dynamic_window: bool = False,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, Dict[str, int], Dict[str, int]]:
     """Get Pairs of words that co-occur (in the window delimited by winSize): Positive examples.
 
+    Pairs are generated sentence by sentence with vectorized window arithmetic.
+
     Args:
         processed_sentences: text data that have been processed.
         window_size: number of words to look at.
+        dynamic_window: if True, the window of each target word is shrunk to a size
+            drawn uniformly in [1, window_size // 2], which weights nearby contexts more.
+        rng: random generator of the dynamic window.
 
     Returns:
-        List of positive pairs, dictionary attributing an index to each word, vocabulary.
+        Array of shape (n, 2) of positive pairs, dictionary attributing an index to each word, vocabulary.
     """
-    positive_pairs = []
-    words_voc = {}
-    context_voc = {}
-    indexer_words = 0
-    indexer_context = 0
+    rng = (rng or np.random.default_rng()) if dynamic_window else None
+    words_voc: Dict[str, int] = {}
+    context_voc: Dict[str, int] = {}
+    words: List[str] = []  # index -> word
+    context_of_word = np.full(0, -1, dtype=np.int64)  # word index -> context index
+    sentences_pairs = []
 
     for sentence in processed_sentences:
-        for i, word in enumerate(sentence):
+        for word in sentence:
             if word not in words_voc:
-                words_voc[word] = indexer_words
-                indexer_words += 1
-
-            for j in range(
-                max(0, i - window_size // 2),
-                min(i + window_size // 2 + 1, len(sentence)),
-            ):
-                if i != j:  # word != context
-                    if sentence[j] not in context_voc:
-                        context_voc[sentence[j]] = indexer_context
-                        indexer_context += 1
-                    positive_pairs.append((words_voc[word], context_voc[sentence[j]]))
+                words_voc[word] = len(words)
+                words.append(word)
+        word_indexes = np.array([words_voc[word] for word in sentence], np.int64)
+        if len(words) > len(context_of_word):  # grow geometrically
+            context_of_word = np.concatenate(
+                [context_of_word, np.full(max(len(words), 1024), -1)]
+            )
+
+        targets, contexts = _window_positions(
+            sentence_begins=np.zeros(len(sentence), dtype=np.int64),
+            sentence_ends=np.full(len(sentence), len(sentence)),
+            window_size=window_size,
+            rng=rng,
+        )
+        context_words = word_indexes[contexts]
+
+        # Index new contexts in order of first appearance
+        new_contexts = context_words[context_of_word[context_words] < 0]
+        unique_contexts, first_positions = np.unique(new_contexts, return_index=True)
+        for word_index in unique_contexts[np.argsort(first_positions)]:
+            context_of_word[word_index] = len(context_voc)
+            context_voc[words[word_index]] = len(context_voc)
 
+        sentence_pairs = np.empty((len(targets), 2), PAIRS_DTYPE)
+        sentence_pairs[:, 0] = word_indexes[targets]
+        sentence_pairs[:, 1] = context_of_word[context_words]
+        sentences_pairs.append(sentence_pairs)
+
+    positive_pairs = (
+        np.concatenate(sentences_pairs)
+        if sentences_pairs
+        else np.empty((0, 2), PAIRS_DTYPE)
+    )
     return positive_pairs, words_voc, context_voc
 
 
-def get_negative_pairs(
-    positive_pairs: List[Tuple[int, int]], negative_rate: int
-) -> List[Tuple[int, int]]:
+def get_corpus_positive_pairs(
+    corpus: EncodedCorpus,
+    window_size: int,
+    dynamic_window: bool = False,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Get the positive pairs of an encoded corpus, vectorized over all its tokens.
+
+    Pairs are in the same order as in `get_positive_pairs`, with the indexes of the
+    corpus vocabulary for both words and contexts.
+
+    Args:
+        corpus: integer-encoded sentences.
+        window_size: number of words to look at.
+        dynamic_window: if True, the window of each target word is shrunk to a size
+            drawn uniformly in [1, window_size // 2].
+        rng: random generator of the dynamic window.
+
+    Returns:
+        Array of shape (n, 2) of (word index, context index).
+    """
+    sentence_lengths = np.diff(corpus.offsets)
+    targets, contexts = _window_positions(
+        sentence_begins=np.repeat(corpus.offsets[:-1], sentence_lengths),
+        sentence_ends=np.repeat(corpus.offsets[1:], sentence_lengths),
+        window_size=window_size,
+        rng=(rng or np.random.default_rng()) if dynamic_window else None,
+    )
+
+    positive_pairs = np.empty((len(targets), 2), PAIRS_DTYPE)
+    positive_pairs[:, 0] = corpus.tokens[targets]
+    positive_pairs[:, 1] = corpus.tokens[contexts]
+    return positive_pairs
+
+
+def count_corpus_positive_pairs(corpus: EncodedCorpus, window_size: int) -> int:
+    """Count the positive pairs of an encoded corpus without generating them."""
+    half_window = window_size // 2
+    lengths = np.diff(corpus.offsets)
+    # Each token sees min(i, half) words on its left: sum twice for both sides
+    one_side = np.where(
+        lengths > half_window,
+        half_window * (half_window + 1) // 2
+        + half_window * (lengths - half_window - 1),
+        lengths * (lengths - 1) // 2,
+    )
+    return int(2 * one_side.sum())
+
+
+def aggregate_pairs(
+    positive_pairs: np.ndarray, count_words: int, count_contexts: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Collapse duplicate pairs into a sparse (word, context, count) table.
+
+    Args:
+        positive_pairs: array of shape (n, 2) of (word index, context index).
+        count_words: number of target words.
+        count_contexts: number of contexts.
+
+    Returns:
+        Distinct pairs, sorted by word then context, and their number of occurrences.
+    """
+    positive_pairs = np.asarray(positive_pairs).reshape(-1, 2)
+    cooccurrences = coo_matrix(
+        (
+            np.ones(len(positive_pairs), dtype=np.int64),
+            (positive_pairs[:, 0], positive_pairs[:, 1]),
+        ),
+        shape=(count_words, count_contexts),
+    )
+    cooccurrences.sum_duplicates()
+
+    distinct_pairs = np.empty((cooccurrences.nnz, 2), PAIRS_DTYPE)
+    distinct_pairs[:, 0] = cooccurrences.row
+    distinct_pairs[:, 1] = cooccurrences.col
+    return distinct_pairs, cooccurrences.data
+
+
+def get_negative_pairs(positive_pairs: np.ndarray, negative_rate: int) -> np.ndarray:
     """Get Pairs of words that don't co-occur: Negative examples. Size: negative_rate * size(positive_pairs).
 
     Args:
-        positive_pairs: pairs of indexes that represent co-occurring words.
+        positive_pairs: array of shape (n, 2) of indexes that represent co-occurring words.
         negative_rate: multiplier to get number of negative pairs to generate using number of positive pairs.
 
     Returns:
-        List of indexes of negative pairs.
+        Array of shape (negative_rate * n, 2) of indexes of negative pairs.
     """
-    negative_pairs = []
+    positive_pairs = np.asarray(positive_pairs, dtype=PAIRS_DTYPE).reshape(-1, 2)
     count_positive_pairs = len(positive_pairs)
 
-    for p_pair in positive_pairs:
-        word_index = p_pair[0]  # target word
-        for _ in range(negative_rate):
-            pair_index = np.random.randint(
-                count_positive_pairs
-            )  # Random index for a pair (can be improved)
-            negative_context = positive_pairs[pair_index][
-                1
-            ]  # Get the random pair context index
-            negative_pairs.append((word_index, negative_context))
+    negative_pairs = np.empty((negative_rate * count_positive_pairs, 2), PAIRS_DTYPE)
+    negative_pairs[:, 0] = np.repeat(positive_pairs[:, 0], negative_rate)  # targets
+    # Contexts of random pairs (can be improved)
+    negative_pairs[:, 1] = positive_pairs[
+        np.random.randint(count_positive_pairs, size=len(negative_pairs)), 1
+    ]
 
     return negative_pairs
+
+
+def save_pairs(pairs: np.ndarray, path: str) -> None:
+    """Write an array of pairs of indexes to a `.npy` file."""
+    np.save(path, np.asarray(pairs, dtype=PAIRS_DTYPE))
+
+
+def load_pairs_memmap(path: str) -> np.ndarray:
+    """Open a `.npy` file of pairs of indexes with memory mapping (read-only)."""
+    pairs: np.ndarray = np.load(path, mmap_mode="r")
+    return pairs
@@ -1,16 +1,35 @@
 """Functions to compute similarity between words."""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from typing import Dict, List, Tuple
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
+import pandas as pd
+
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
 
 OOV_EMBEDDING_VALUE = 0.01
+SIMILARITY_MEMORY_BUDGET = 1 << 26
+SIMILARITY_CACHE_SIZE = 100000
+PAIRS_CHUNK_SIZE = 1 << 16
 
 
 def _get_word_embedding(
     logger: logging.Logger,
     word: str,
-    words_voc: Dict[str, int],
+    words_voc: Mapping[str, int],
     embed_matrix: np.ndarray,
     default_embed: np.ndarray,
 ) -> np.ndarray:
@@ -19,7 +38,7 @@ def _get_word_embedding(
         word_idx = words_voc[word]
         word_embedding = embed_matrix[word_idx]
     except KeyError:
-        logger.info("Out of Vocabulary:", word=word)
+        logger.info("Out of Vocabulary: %s", word)
         word_embedding = default_embed
 
     return word_embedding
@@ -34,7 +53,7 @@ def words_similarity(
     logger: logging.Logger,
     word_1,
     word_2,
-    words_voc: Dict[str, int],
+    words_voc: Mapping[str, int],
     embed_matrix: np.ndarray,
 ) -> float:
     """Compute cosine similarity between two words.
@@ -75,38 +94,448 @@ def words_similarity(
     return _cosine_similarity(vect_1=word_1_embedding, vect_2=word_2_embedding)
 
 
+class SimilarityIndex:
+    """Words ranked by cosine similarity with a query.
+
+    The norms of the embeddings are computed once, so scoring a query against the
+    whole vocabulary is one matrix-vector product. The embedding matrix is used as
+    is, never copied: a memory-mapped one stays shared with other processes.
+
+    Attributes:
+        words_voc: words and their indexes.
+        words: word of each index.
+        embed_matrix: embeddings of the words.
+        norms: L2 norm of each embedding, 1 for rows of zeros (which stay zeros).
+        oov_vector: normalized embedding of the words out of the vocabulary.
+    """
+
+    def __init__(self, words_voc: Mapping[str, int], embed_matrix: np.ndarray) -> None:
+        """Compute the norms of the embeddings of a vocabulary.
+
+        Args:
+            words_voc: dictionary of words and their indexes.
+            embed_matrix: matrix containing words embeddings.
+        """
+        self.words_voc = words_voc
+        if isinstance(words_voc, Vocabulary):
+            self.words = words_voc.words
+        else:
+            self.words = np.empty(len(words_voc), dtype=object)
+            self.words[list(words_voc.values())] = list(words_voc.keys())
+        self.embed_matrix = embed_matrix
+        # Row by row products, without a temporary of the size of the matrix
+        norms = np.sqrt(np.einsum("ij,ij->i", embed_matrix, embed_matrix, dtype=float))
+        self.norms = np.where(norms == 0, 1, norms)
+        self.oov_vector = normalize_vectors(
+            np.ones(embed_matrix.shape[1]) * OOV_EMBEDDING_VALUE
+        )
+        self._words_index: Optional[pd.Index] = None
+
+    def query_vector(self, logger: logging.Logger, word: str) -> np.ndarray:
+        """Return the normalized embedding of a word, or of OOV words if unknown."""
+        try:
+            word_index = self.words_voc[word]
+        except KeyError:
+            logger.info("Out of Vocabulary: %s", word)
+            return self.oov_vector
+        vector: np.ndarray = self.embed_matrix[word_index] / self.norms[word_index]
+        return vector
+
+    def _normalized_rows(self, indexes: np.ndarray) -> np.ndarray:
+        """Return the normalized embeddings of word indexes, OOV ones for -1."""
+        known = np.maximum(indexes, 0)
+        vectors: np.ndarray = self.embed_matrix[known] / self.norms[known, np.newaxis]
+        vectors[indexes < 0] = self.oov_vector
+        return vectors
+
+    def lookup(self, words: Union[Sequence[str], np.ndarray]) -> np.ndarray:
+        """Return the indexes of words, -1 for unknown words, in one hashing pass."""
+        if self._words_index is None:
+            self._words_index = pd.Index(self.words)
+        indexes: np.ndarray = self._words_index.get_indexer(list(words))
+        return indexes
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        """Similarity in [0, 1] of every word with a normalized vector."""
+        scores: np.ndarray = np.abs(self.embed_matrix @ vector) / self.norms
+        return scores
+
+    def pairs_similarity(
+        self,
+        logger: logging.Logger,
+        words_1: Union[Sequence[str], np.ndarray],
+        words_2: Union[Sequence[str], np.ndarray],
+    ) -> np.ndarray:
+        """Similarity in [0, 1] of the words of many pairs, see `pairs_similarity`."""
+        indexes = self.lookup(words=list(words_1) + list(words_2))
+        count_oov = int((indexes < 0).sum())
+        if count_oov:
+            logger.info("Out of Vocabulary: %d", count_oov)
+
+        indexes_1, indexes_2 = np.split(indexes, 2)
+        similarities = np.empty(len(indexes_1))
+        for begin in range(0, len(indexes_1), PAIRS_CHUNK_SIZE):
+            end = begin + PAIRS_CHUNK_SIZE
+            similarities[begin:end] = np.einsum(
+                "ij,ij->i",
+                self._normalized_rows(indexes=indexes_1[begin:end]),
+                self._normalized_rows(indexes=indexes_2[begin:end]),
+            )
+        return np.abs(similarities)
+
+    def top_k(self, vector: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the indexes and scores of the k words most similar to a vector.
+
+        They are ranked by decreasing score, ties by increasing index.
+        """
+        scores = self.scores(vector=vector)
+        if k < len(scores):
+            # Keep every word tied with the k-th one, to break ties by index
+            kth_index = np.argpartition(-scores, k - 1)[k - 1]
+            candidates = np.flatnonzero(scores >= scores[kth_index])
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+        return ranked, scores[ranked]
+
+    def query_vectors(
+        self, logger: logging.Logger, words: Union[Sequence[str], np.ndarray]
+    ) -> np.ndarray:
+        """Return the normalized embeddings of words, one row per word."""
+        vectors = np.empty((len(words), self.embed_matrix.shape[1]))
+        for row, word in enumerate(words):
+            vectors[row] = self.query_vector(logger=logger, word=word)
+        return vectors
+
+    def batch_top_k(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        exclude: Optional[np.ndarray] = None,
+        memory_budget: int = SIMILARITY_MEMORY_BUDGET,
+        workers: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the indexes and scores of the k words most similar to each vector.
+
+        The queries are scored by chunks, each one a matrix-matrix product. The
+        chunks scored at once, their scores and the indexes partitioning them fit in
+        `memory_budget`.
+
+        Args:
+            vectors: normalized query vectors, one per row.
+            k: number of similar words to look for (at most the vocabulary size).
+            exclude: if given, index of a word to leave out of the results of each
+                query (the query word itself), or -1 for none.
+            memory_budget: maximum size in bytes of the working arrays of the chunks
+                scored at once.
+            workers: number of threads scoring chunks concurrently, sharing
+                `memory_budget`.
+
+        Returns:
+            The indexes and scores, of shape (queries, k), ranked by decreasing score.
+            Ties with the k-th score are broken arbitrarily.
+        """
+        count_words = len(self.embed_matrix)
+        k = min(k, count_words - (exclude is not None))
+        indexes = np.empty((len(vectors), k), dtype=np.int64)
+        scores = np.empty((len(vectors), k))
+        # Per query: its scores and the indexes allocated by `np.argpartition`
+        query_size = count_words * (scores.itemsize + np.dtype(np.intp).itemsize)
+        chunk_size = max(1, memory_budget // (max(1, workers) * query_size))
+        negated_norms = -self.norms
+
+        def _top_k_chunk(begin: int) -> None:
+            """Select the top k of the queries of one chunk."""
+            end = min(begin + chunk_size, len(vectors))
+            chunk_scores = vectors[begin:end] @ self.embed_matrix.T
+            # Negated scores, in place: the smallest ones are the most similar words
+            np.abs(chunk_scores, out=chunk_scores)
+            chunk_scores /= negated_norms
+            if exclude is not None:
+                rows = np.flatnonzero(exclude[begin:end] >= 0)
+                chunk_scores[rows, exclude[begin:end][rows]] = np.inf
+            candidates = np.argpartition(chunk_scores, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(chunk_scores, candidates, axis=1)
+            order = np.argsort(candidate_scores, axis=1, kind="stable")
+            indexes[begin:end] = np.take_along_axis(candidates, order, axis=1)
+            scores[begin:end] = -np.take_along_axis(candidate_scores, order, axis=1)
+
+        chunks = range(0, len(vectors), chunk_size)
+        if workers > 1:
+            # Matrix products release the GIL, so the threads run in parallel
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_top_k_chunk, chunks))
+        else:
+            for begin in chunks:
+                _top_k_chunk(begin)
+        return indexes, scores
+
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """Divide vectors (along their last axis) by their L2 norms, if not zero."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class _ScoresView(Mapping[str, float]):
+    """Read-only mapping of words to their scores with a query vector.
+
+    The scores are computed on first access, without a dictionary copy.
+    """
+
+    def __init__(self, index: SimilarityIndex, vector: np.ndarray) -> None:
+        """Map each word of an index to its score with a normalized vector."""
+        self._words_voc = index.words_voc
+        self._index = index
+        self._vector = vector
+        self._scores: Optional[np.ndarray] = None
+
+    def __getitem__(self, word: str) -> float:
+        """Score of a word, KeyError if unknown."""
+        if self._scores is None:
+            self._scores = self._index.scores(vector=self._vector)
+        return float(self._scores[self._words_voc[word]])
+
+    def __iter__(self) -> Iterator[str]:
+        """Words in the order of the vocabulary."""
+        return iter(self._words_voc)
+
+    def __len__(self) -> int:
+        """Number of words."""
+        return len(self._words_voc)
+
+
 def find_k_most_similar(
     logger: logging.Logger,
     word_target: str,
     k: int,
-    words_voc: Dict[str, int],
+    words_voc: Mapping[str, int],
     embed_matrix: np.ndarray,
-) -> Tuple[List[str], Dict[str, int]]:
+    index: Optional[SimilarityIndex] = None,
+) -> Tuple[List[str], Mapping[str, float]]:
     """Return the k most similar words to `word` and the similarity score.
 
+    The norms of the embeddings are computed at each call, unless the `index` of the
+    model is given: callers querying a model many times build it once.
+
     Args:
         logger: logger.
         word_target: target word.
         k: number of similar words to look for.
         words_voc: dictionary of words and their indexes.
         embed_matrix: matrix containing words embeddings.
+        index: if given, index of `words_voc` and `embed_matrix`, used instead of
+            them.
 
     Returns:
-        A ranked list of the most similar words and a dictionary containing their similarity scores.
+        A ranked list of the most similar words and a mapping of every word to its similarity score.
     """
-    similarity_dict = {
-        word: words_similarity(
-            logger=logger,
-            word_1=word_target,
-            word_2=word,
-            words_voc=words_voc,
-            embed_matrix=embed_matrix,
-        )
-        for word in words_voc
-    }
+    if index is None:
+        index = SimilarityIndex(words_voc=words_voc, embed_matrix=embed_matrix)
+    vector = index.query_vector(logger=logger, word=word_target)
+    # The first ranked word is the target itself
+    ranked_indexes, _ = index.top_k(vector=vector, k=k + 1)
+
+    return (
+        index.words[ranked_indexes[1:]].tolist(),
+        _ScoresView(index=index, vector=vector),
+    )
+
+
+def pairs_similarity(
+    logger: logging.Logger,
+    words_1: Union[Sequence[str], np.ndarray],
+    words_2: Union[Sequence[str], np.ndarray],
+    words_voc: Mapping[str, int],
+    embed_matrix: np.ndarray,
+) -> np.ndarray:
+    """Compute cosine similarity between the words of many pairs.
 
-    ranked_similar_words = sorted(
-        similarity_dict, key=similarity_dict.get, reverse=True
+    Like `words_similarity`, unknown words are mapped to one common vector. They are
+    counted and logged once.
+
+    Args:
+        logger: logger.
+        words_1: first word of each pair.
+        words_2: second word of each pair.
+        words_voc: dictionary containing words and their indexes.
+        embed_matrix: matrix of embeddings.
+
+    Returns:
+        The similarity of each pair, in [0, 1].
+    """
+    index = SimilarityIndex(words_voc=words_voc, embed_matrix=embed_matrix)
+    return index.pairs_similarity(logger=logger, words_1=words_1, words_2=words_2)
+
+
+def find_k_most_similar_batch(
+    logger: logging.Logger,
+    queries: Union[Sequence[str], np.ndarray],
+    k: int,
+    words_voc: Mapping[str, int],
+    embed_matrix: np.ndarray,
+    memory_budget: int = SIMILARITY_MEMORY_BUDGET,
+    workers: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the k most similar words to many queries and their similarity scores.
+
+    Args:
+        logger: logger.
+        queries: query words, or query vectors (one per row).
+        k: number of similar words to look for.
+        words_voc: dictionary of words and their indexes.
+        embed_matrix: matrix containing words embeddings.
+        memory_budget: maximum size in bytes of the working arrays of the queries
+            scored at once.
+        workers: number of threads scoring chunks of queries concurrently.
+
+    Returns:
+        Arrays of shape (queries, k) of the indexes of the most similar words, ranked,
+        and of their similarity scores. Query words are not among their own results.
+    """
+    index = SimilarityIndex(words_voc=words_voc, embed_matrix=embed_matrix)
+    if isinstance(queries, np.ndarray) and queries.dtype.kind in "iuf":
+        vectors, exclude = normalize_vectors(np.asarray(queries, dtype=float)), None
+    else:
+        vectors = index.query_vectors(logger=logger, words=queries)
+        exclude = np.array([words_voc.get(word, -1) for word in queries])
+
+    return index.batch_top_k(
+        vectors=vectors,
+        k=k,
+        exclude=exclude,
+        memory_budget=memory_budget,
+        workers=workers,
     )
 
-    return ranked_similar_words[1 : k + 1], similarity_dict
+
+class SimilarityCache:
+    """Bounded cache of the similarity scores and top k words of one model.
+
+    Entries are evicted in least recently used order. Pair keys ignore the order of
+    the words, the score being symmetric. The cache is emptied when it is queried
+    with another vocabulary or embedding matrix (compared by identity).
+
+    Attributes:
+        max_size: maximum number of entries, 0 disables caching.
+        hits: number of queries answered from the cache.
+        misses: number of queries computed.
+        invalidations: number of times the cache was emptied for another model.
+    """
+
+    def __init__(self, max_size: int = SIMILARITY_CACHE_SIZE) -> None:
+        """Instantiate an empty cache."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._words_voc: Optional[Mapping[str, int]] = None
+        self._embed_matrix: Optional[np.ndarray] = None
+        self._index: Optional[SimilarityIndex] = None
+
+    def __len__(self) -> int:
+        """Number of cached entries."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove every entry, keeping the counters."""
+        self._entries.clear()
+
+    def _use_model(
+        self, words_voc: Mapping[str, int], embed_matrix: np.ndarray
+    ) -> None:
+        """Empty the cache if the model differs from the one of its entries."""
+        # References are kept, so the identities cannot be reused by new objects
+        if words_voc is not self._words_voc or embed_matrix is not self._embed_matrix:
+            if self._words_voc is not None:
+                self.invalidations += 1
+            self.clear()
+            self._words_voc, self._embed_matrix = words_voc, embed_matrix
+            self._index = None
+
+    def _get_index(self) -> SimilarityIndex:
+        """Return the index of the model of the entries, built on first use."""
+        if self._index is None:
+            if self._words_voc is None or self._embed_matrix is None:
+                raise RuntimeError("The cache has not been queried yet.")
+            self._index = SimilarityIndex(
+                words_voc=self._words_voc, embed_matrix=self._embed_matrix
+            )
+        return self._index
+
+    def _get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value of a key, computing and caching it if missing."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            if self.max_size > 0:
+                self._entries[key] = value
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def words_similarity(
+        self,
+        logger: logging.Logger,
+        word_1: str,
+        word_2: str,
+        words_voc: Mapping[str, int],
+        embed_matrix: np.ndarray,
+    ) -> float:
+        """Return `words_similarity` of two words, cached.
+
+        Missing scores are computed with the normalized embeddings of the model.
+        """
+        self._use_model(words_voc=words_voc, embed_matrix=embed_matrix)
+
+        def _similarity() -> float:
+            """Score the pair with the normalized embeddings of the model."""
+            index = self._get_index()
+            return abs(
+                float(
+                    index.query_vector(logger=logger, word=word_1)
+                    @ index.query_vector(logger=logger, word=word_2)
+                )
+            )
+
+        similarity: float = self._get_or_compute(
+            key=("pair", word_1, word_2)
+            if word_1 <= word_2
+            else ("pair", word_2, word_1),
+            compute=_similarity,
+        )
+        return similarity
+
+    def top_k_words(
+        self,
+        logger: logging.Logger,
+        word_target: str,
+        k: int,
+        words_voc: Mapping[str, int],
+        embed_matrix: np.ndarray,
+    ) -> Tuple[List[str], List[float]]:
+        """Return the k most similar words to a word and their scores, cached.
+
+        The words are ranked like by `find_k_most_similar`, whose dictionary of the
+        scores of the whole vocabulary is not cached.
+        """
+        self._use_model(words_voc=words_voc, embed_matrix=embed_matrix)
+
+        def _top_k() -> Tuple[List[str], List[float]]:
+            """Rank the words with the normalized embeddings of the model."""
+            index = self._get_index()
+            vector = index.query_vector(logger=logger, word=word_target)
+            # The first ranked word is the target itself
+            ranked_indexes, scores = index.top_k(vector=vector, k=k + 1)
+            return index.words[ranked_indexes[1:]].tolist(), scores[1:].tolist()
+
+        words, scores = self._get_or_compute(
+            key=("top_k", word_target, k), compute=_top_k
+        )
+        return list(words), list(scores)
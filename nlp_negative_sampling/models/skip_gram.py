@@ -1,123 +1,690 @@
 """Skip Gram object."""
+from ctypes import Array
+import functools
+import itertools
 import logging
-import pickle
-from typing import Dict, List, Tuple
+import multiprocessing as mp
+import os
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import tqdm
 
-from nlp_negative_sampling.libs.gradient import compute_gradient
+from nlp_negative_sampling.libs.batches import (
+    Batch,
+    WeightedBatch,
+    iter_corpus_batches,
+    iter_pairs_batches,
+    iter_weighted_pairs_batches,
+)
+from nlp_negative_sampling.libs.gradient import (
+    apply_sparse_gradient,
+    compute_sparse_gradient,
+)
+from nlp_negative_sampling.libs.negative_sampler import NegativeSampler
 from nlp_negative_sampling.libs.pos_and_neg_pairs import (
-    get_negative_pairs,
-    get_positive_pairs,
+    aggregate_pairs,
+    count_corpus_positive_pairs,
+    get_corpus_positive_pairs,
+    load_pairs_memmap,
+    save_pairs,
+)
+from nlp_negative_sampling.utils.checkpoint import (
+    Checkpoint,
+    CheckpointWriter,
+    data_fingerprint,
+    load_checkpoint,
+)
+from nlp_negative_sampling.utils.corpus import (
+    EncodedCorpus,
+    PreprocessedCorpus,
+    preprocess_corpus,
+    subsample_corpus,
 )
-from nlp_negative_sampling.utils.process_text_data import rare_word_pruning
+from nlp_negative_sampling.utils.model_files import (
+    MmapMode,
+    is_model,
+    load_model_files,
+    load_pickle_model,
+    save_model_files,
+)
+from nlp_negative_sampling.utils.process_text_data import (
+    get_keep_probabilities,
+    rare_word_pruning,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
 
 BATCH_SIZE = 500
 EMBEDDING_DIMENSION = 100
 EPOCHS = 5
 EPSILON = 1e-5
 LEARNING_RATE = 0.01
+# One step of weight w moves as much as w steps at once: larger ones diverge
+MAX_PAIR_WEIGHT = 20
 NEGATIVE_RATE = 5
 MIN_COUNT = 5
 WINDOW_SIZE = 7
 
+_RAW_ARRAY_TYPECODES = {"float64": "d", "int32": "i", "int64": "q"}
+
+
+class _SharedArray(NamedTuple):
+    """Array made available to the training processes.
+
+    Memory-mapped arrays are shared through their file, other arrays through a
+    lock-free shared memory buffer.
+    """
+
+    source: Union["Array[Any]", str]
+    dtype: str
+    shape: Tuple[int, ...]
+
+    @classmethod
+    def share(cls, values: np.ndarray) -> "_SharedArray":
+        """Share an array, copying it to shared memory unless it is memory-mapped."""
+        if isinstance(values, np.memmap):
+            return cls(source=str(values.filename), dtype=str(values.dtype), shape=())
+        buffer = mp.RawArray(_RAW_ARRAY_TYPECODES[str(values.dtype)], values.size)
+        np.frombuffer(buffer, dtype=values.dtype)[:] = values.ravel()
+        return cls(source=buffer, dtype=str(values.dtype), shape=values.shape)
+
+    def attach(self) -> np.ndarray:
+        """Get the shared array, without copy."""
+        values: np.ndarray
+        if isinstance(self.source, str):
+            values = np.load(self.source, mmap_mode="r")
+        else:
+            values = np.frombuffer(memoryview(self.source), dtype=self.dtype)
+            values = values.reshape(self.shape)
+        return values
+
+
+def _split_theta(
+    theta: np.ndarray, count_words: int, count_contexts: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return 2-D views on theta for the words and the contexts embeddings."""
+    words_matrix = theta[: EMBEDDING_DIMENSION * count_words].reshape(
+        count_words, EMBEDDING_DIMENSION
+    )
+    contexts_matrix = theta[EMBEDDING_DIMENSION * count_words :].reshape(
+        count_contexts, EMBEDDING_DIMENSION
+    )
+    return words_matrix, contexts_matrix
+
+
+def _iter_batches(
+    data: Dict[str, np.ndarray],
+    sampler: NegativeSampler,
+    batch_size: int,
+    negative_rate: int,
+    window_size: int,
+    keep_probabilities: Optional[np.ndarray] = None,
+    dynamic_window: bool = False,
+) -> Iterable[Union[Batch, WeightedBatch]]:
+    """Batches of materialized positive pairs or of an encoded corpus."""
+    if "pair_weights" in data:
+        return iter_weighted_pairs_batches(
+            positive_pairs=data["positive_pairs"],
+            pair_weights=data["pair_weights"],
+            batch_size=batch_size,
+            sampler=sampler,
+            negative_rate=negative_rate,
+        )
+    if "positive_pairs" in data:
+        return iter_pairs_batches(
+            positive_pairs=data["positive_pairs"],
+            batch_size=batch_size,
+            sampler=sampler,
+            negative_rate=negative_rate,
+        )
+    return iter_corpus_batches(
+        corpus=EncodedCorpus(tokens=data["tokens"], offsets=data["offsets"]),
+        window_size=window_size,
+        batch_size=batch_size,
+        sampler=sampler,
+        negative_rate=negative_rate,
+        keep_probabilities=keep_probabilities,
+        dynamic_window=dynamic_window,
+    )
+
+
+def _shard(data: Dict[str, np.ndarray], begin: int, end: int) -> Dict[str, np.ndarray]:
+    """Select positive pairs or sentences from `begin` to `end` (excluded)."""
+    if "positive_pairs" in data:
+        return {name: array[begin:end] for name, array in data.items()}
+    corpus = EncodedCorpus(tokens=data["tokens"], offsets=data["offsets"])
+    return corpus.select(begin=begin, end=end)._asdict()
+
+
+def _share_data(
+    data: Dict[str, np.ndarray], count_shardable: int, workers: int
+) -> Tuple[Dict[str, _SharedArray], np.ndarray]:
+    """Share the training data with the processes, and split it in shards."""
+    shared_data = {
+        name: _SharedArray.share(values=array) for name, array in data.items()
+    }
+    return shared_data, np.linspace(0, count_shardable, workers + 1).astype(int)
+
+
+def _train_batches(
+    words_matrix: np.ndarray,
+    contexts_matrix: np.ndarray,
+    batches: Iterable[Union[Batch, WeightedBatch]],
+    learning_rate: float,
+    count_batches: Optional[int] = None,
+    show_progress: bool = True,
+) -> None:
+    """Run mini-batch gradient ascent over the batches, in place.
+
+    Pairs of weighted batches count as many times as their weight, their negatives
+    too.
+    """
+    for batch_number, (batch_positive, batch_negative, *batch_weights) in enumerate(
+        tqdm.tqdm(batches, total=count_batches, disable=not show_progress)
+    ):
+        logging.info(f"batch_number {batch_number + 1} / {count_batches}")
+
+        positive_weights, negative_weights = None, None
+        if batch_weights:
+            positive_weights = batch_weights[0]
+            negative_weights = np.repeat(
+                positive_weights, len(batch_negative) // len(batch_positive)
+            )
+
+        # Compute the gradient at theta, only for the touched rows
+        grad = compute_sparse_gradient(
+            words_matrix=words_matrix,
+            contexts_matrix=contexts_matrix,
+            positive_pairs=batch_positive,
+            negative_pairs=batch_negative,
+            positive_weights=positive_weights,
+            negative_weights=negative_weights,
+        )
+
+        # Actualize theta (since we want to maximize the 'loss', we add grad)
+        apply_sparse_gradient(
+            words_matrix=words_matrix,
+            contexts_matrix=contexts_matrix,
+            gradient=grad,
+            learning_rate=learning_rate,
+        )
+
+
+def _checkpoint_batches(
+    batches: Iterable[Any],
+    first_batch: int,
+    checkpoint_every: Optional[int],
+    save: Callable[[int], None],
+) -> Iterator[Any]:
+    """Skip the batches already trained on, and checkpoint every few batches.
+
+    Args:
+        batches: batches of the epoch, generated from its start.
+        first_batch: number of batches to skip.
+        checkpoint_every: if given, number of batches between checkpoints.
+        save: function saving a checkpoint, given the number of batches trained on.
+
+    Yields:
+        The batches from `first_batch`.
+    """
+    for batch_number, batch in enumerate(
+        itertools.islice(batches, first_batch, None), start=first_batch + 1
+    ):
+        yield batch
+        # Resumed once the batch is applied, when the next one is requested
+        if checkpoint_every is not None and batch_number % checkpoint_every == 0:
+            save(batch_number)
+
+
+def _hogwild_worker(
+    theta: _SharedArray,
+    count_words: int,
+    count_contexts: int,
+    shared_data: Dict[str, _SharedArray],
+    sampler: NegativeSampler,
+    seed: int,
+    shard_begin: int,
+    shard_end: int,
+    batch_size: int,
+    negative_rate: int,
+    window_size: int,
+    keep_probabilities: Optional[np.ndarray],
+    dynamic_window: bool,
+    learning_rate: float,
+) -> None:  # pragma: no cover
+    """Train on a shard of the data, updating shared theta without locks."""
+    words_matrix, contexts_matrix = _split_theta(
+        theta=theta.attach(), count_words=count_words, count_contexts=count_contexts
+    )
+    data = {name: array.attach() for name, array in shared_data.items()}
+    sampler.reseed(random_state=seed)
+
+    _train_batches(
+        words_matrix=words_matrix,
+        contexts_matrix=contexts_matrix,
+        batches=_iter_batches(
+            data=_shard(data=data, begin=shard_begin, end=shard_end),
+            sampler=sampler,
+            batch_size=batch_size,
+            negative_rate=negative_rate,
+            window_size=window_size,
+            keep_probabilities=keep_probabilities,
+            dynamic_window=dynamic_window,
+        ),
+        learning_rate=learning_rate,
+        show_progress=False,
+    )
+
 
 class SkipGram:
     """Skip Gram Model."""
 
     def __init__(
-        self, logger: logging.Logger, sentences: List[List[str]],
+        self,
+        logger: logging.Logger,
+        sentences: Optional[List[List[str]]] = None,
+        pairs_dir: Optional[str] = None,
+        seed: Optional[int] = None,
+        streaming: bool = False,
+        subsample_threshold: Optional[float] = None,
+        dynamic_window: bool = False,
+        preprocessed: Optional[PreprocessedCorpus] = None,
+        aggregate_pairs: bool = False,
+        max_pair_weight: Optional[int] = MAX_PAIR_WEIGHT,
     ):
-        """Instantiate SkipGram model."""
+        """Instantiate SkipGram model.
+
+        Args:
+            logger: logger.
+            sentences: tokenized sentences (unless `preprocessed` is given).
+            pairs_dir: if given, positive pairs are written to a `.npy` file in this
+                directory and reopened with memory mapping.
+            seed: seed of the negative sampler.
+            streaming: if True, positive pairs are not materialized: sentences are
+                integer-encoded and pairs are generated batch by batch while training.
+            subsample_threshold: if given, threshold `t` of the subsampling of frequent
+                words. A new subsample is drawn at each epoch: while generating the
+                batches when streaming, otherwise before materializing the pairs of
+                the epoch.
+            dynamic_window: if True, the window of each target word is shrunk to a
+                size drawn uniformly in [1, WINDOW_SIZE // 2], as in word2vec.
+            preprocessed: already pruned and integer-encoded corpus (e.g. loaded from
+                the preprocessing cache), used instead of `sentences`.
+            aggregate_pairs: if True, duplicate positive pairs are collapsed into
+                distinct pairs weighted by their number of occurrences, so an epoch
+                scales with the distinct pairs. Not available when streaming.
+            max_pair_weight: cap of the weights of aggregated pairs, None for raw
+                counts. One step of weight w moves as far as w steps at once, so
+                without a cap the most frequent pairs make the training diverge.
+
+        Raises:
+            ValueError: if neither `sentences` nor `preprocessed` is given, or if both
+                `streaming` and `aggregate_pairs` are set.
+        """
+        if streaming and aggregate_pairs:
+            raise ValueError("Pairs can only be aggregated when materialized.")
+
         self._logger = logger
         self._logger.info("Start Initialization.")
+        self._dynamic_window = dynamic_window
+        self._max_pair_weight = max_pair_weight
+
+        if preprocessed is None:
+            if sentences is None:
+                raise ValueError("Sentences or a preprocessed corpus are required.")
+            self.processed_sentences: Optional[List[List[str]]] = rare_word_pruning(
+                list_tokens=sentences, min_count=MIN_COUNT
+            )
+            self._logger.info(
+                "Data processing ended: %d sentences.", len(self.processed_sentences)
+            )
+            preprocessed = preprocess_corpus(
+                processed_sentences=self.processed_sentences
+            )
+            self._logger.info(
+                "Corpus encoded: %d tokens.", len(preprocessed.corpus.tokens)
+            )
+        else:
+            self.processed_sentences = None
 
-        self.processed_sentences = rare_word_pruning(
-            list_tokens=sentences, min_count=MIN_COUNT
+        # One vocabulary for words and contexts, sorted by descending frequency
+        self.words_voc = preprocessed.vocabulary
+        self.context_voc = self.words_voc
+        contexts_count = self.words_voc.counts
+
+        # Per-epoch subsampling of frequent words (words and contexts share indexes)
+        self._keep_probabilities: Optional[np.ndarray] = None
+        if subsample_threshold is not None:
+            self._keep_probabilities = get_keep_probabilities(
+                counts=contexts_count, threshold=subsample_threshold
+            )
+
+        self.corpus: Optional[EncodedCorpus] = None
+        self.positive_pairs: Optional[np.ndarray] = None
+        self.pair_counts: Optional[np.ndarray] = None
+        self._aggregate = aggregate_pairs
+        self._pairs_dir = pairs_dir
+        # Corpus whose subsampled pairs are generated again at each epoch
+        self._pairs_corpus: Optional[EncodedCorpus] = None
+        # Pairs materialized once are drawn from `seed` (None: not reproducible),
+        # unlike those drawn from the negative sampler state at each epoch
+        self._seed = seed
+        self._random_pairs_order = (
+            not streaming
+            and subsample_threshold is None
+            and (dynamic_window or aggregate_pairs)
         )
-        self._logger.info(
-            "Data processing ended.", count_sentences=len(self.processed_sentences)
+        self._data_fingerprint = data_fingerprint(
+            arrays=[
+                preprocessed.corpus.tokens,
+                preprocessed.corpus.offsets,
+                contexts_count,
+            ],
+            options=dict(
+                streaming=streaming,
+                subsample_threshold=subsample_threshold,
+                dynamic_window=dynamic_window,
+                aggregate_pairs=aggregate_pairs,
+                max_pair_weight=max_pair_weight,
+            ),
         )
+        if streaming:  # pairs are generated in `train`
+            self.corpus = preprocessed.corpus
+        else:
+            if self._keep_probabilities is not None:
+                self._pairs_corpus = preprocessed.corpus
+            self._generate_pairs(
+                corpus=preprocessed.corpus, rng=np.random.default_rng(seed)
+            )
 
-        self.positive_pairs, self.words_voc, self.context_voc = get_positive_pairs(
-            processed_sentences=self.processed_sentences, window_size=WINDOW_SIZE
+        # Negative contexts are drawn from the unigram^0.75 distribution of contexts
+        self._sampler = NegativeSampler(counts=contexts_count, random_state=seed)
+        self._logger.info("Negative sampler built.")
+
+        self._logger.info("End of Initialization.")
+
+    def _generate_pairs(self, corpus: EncodedCorpus, rng: np.random.Generator) -> None:
+        """Materialize the positive pairs of a corpus, subsampled if required."""
+        if self._keep_probabilities is not None:
+            corpus = subsample_corpus(
+                corpus=corpus, keep_probabilities=self._keep_probabilities, rng=rng
+            )
+        self.positive_pairs = get_corpus_positive_pairs(
+            corpus=corpus,
+            window_size=WINDOW_SIZE,
+            dynamic_window=self._dynamic_window,
+            rng=rng,
         )
         self._logger.info("Positive pairs generated.")
+        if self._aggregate:
+            self._aggregate_pairs(rng=rng)
+        if self._pairs_dir is not None:
+            self._memory_map_pairs(pairs_dir=self._pairs_dir)
 
-        self.negative_pairs = get_negative_pairs(
-            positive_pairs=self.positive_pairs, negative_rate=NEGATIVE_RATE
+    def _aggregate_pairs(self, rng: np.random.Generator) -> None:
+        """Replace positive pairs by distinct pairs and their counts, shuffled."""
+        if self.positive_pairs is None:
+            raise RuntimeError("Positive pairs are not materialized.")
+        count_pairs = len(self.positive_pairs)
+        distinct_pairs, pair_counts = aggregate_pairs(
+            positive_pairs=self.positive_pairs,
+            count_words=len(self.words_voc),
+            count_contexts=len(self.context_voc),
+        )
+        # Pairs come sorted by word, shuffle them so batches mix words
+        order = rng.permutation(len(distinct_pairs))
+        self.positive_pairs = distinct_pairs[order]
+        self.pair_counts = pair_counts[order]
+        self._logger.info(
+            "Positive pairs aggregated: %d pairs, %d distinct.",
+            count_pairs,
+            len(distinct_pairs),
         )
-        self._logger.info("Negative pairs generated.")
 
-        self._logger.info("End of Initialization.")
+    def _memory_map_pairs(self, pairs_dir: str) -> None:
+        """Move positive pairs to a memory-mapped `.npy` file."""
+        if self.positive_pairs is None:
+            raise RuntimeError("Positive pairs are not materialized.")
+        os.makedirs(pairs_dir, exist_ok=True)
+        positive_path = os.path.join(pairs_dir, "positive_pairs.npy")
+        # Replaced, not overwritten: the pairs of the previous epoch may be mapped
+        tmp_path = os.path.join(pairs_dir, "positive_pairs.tmp.npy")
+        save_pairs(pairs=self.positive_pairs, path=tmp_path)
+        os.replace(tmp_path, positive_path)
 
-    def train(self) -> None:
-        """Create embedding matrix."""
+        self.positive_pairs = load_pairs_memmap(path=positive_path)
+        self._logger.info("Pairs memory-mapped in %s.", pairs_dir)
+
+    def _training_data(self) -> Tuple[Dict[str, np.ndarray], int, Optional[int]]:
+        """Arrays to generate batches from, their number of shards and of pairs.
+
+        The number of pairs is unknown when they are drawn at random while streaming.
+        """
+        if self.corpus is None:
+            if self.positive_pairs is None:
+                raise RuntimeError("Positive pairs are not materialized.")
+            data: Dict[str, np.ndarray] = {"positive_pairs": self.positive_pairs}
+            if self.pair_counts is not None:
+                data["pair_weights"] = self.pair_counts
+                if self._max_pair_weight is not None:
+                    data["pair_weights"] = np.minimum(
+                        self.pair_counts, self._max_pair_weight
+                    )
+            return data, len(self.positive_pairs), len(self.positive_pairs)
+        count_pos_pairs = None
+        if not self._dynamic_window and self._keep_probabilities is None:
+            count_pos_pairs = count_corpus_positive_pairs(
+                corpus=self.corpus, window_size=WINDOW_SIZE
+            )
+        return self.corpus._asdict(), self.corpus.count_sentences, count_pos_pairs
+
+    def train(
+        self,
+        workers: int = 1,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: Optional[int] = None,
+        resume_from: Optional[str] = None,
+    ) -> None:
+        """Create embedding matrix.
+
+        Args:
+            workers: number of processes. With more than one process, training is
+                Hogwild-style: each process takes a shard of the positive pairs (or of
+                the sentences when streaming) and updates the shared embedding
+                matrices without locks.
+            checkpoint_path: if given, file where the training state is saved at the
+                end of each epoch, by a background thread.
+            checkpoint_every: if given, the state is also saved every
+                `checkpoint_every` batches (with one process only).
+            resume_from: if given, checkpoint from which to resume the training. The
+                model must be built with the same data, options and seed.
+
+        Raises:
+            ValueError: if the checkpoint does not match the model, was saved in the
+                middle of an epoch and is resumed with several processes, or in the
+                middle of an epoch over pairs shuffled without a seed.
+        """
         count_words = len(self.words_voc.keys())
         count_contexts = len(self.context_voc.keys())
-        count_pos_pairs = len(self.positive_pairs)
+        data, count_shardable, count_pos_pairs = self._training_data()
 
-        # Initialize theta: vector of parameters
+        # Initialize theta: vector of parameters, in shared memory when multi-process
         count_parameters = EMBEDDING_DIMENSION * (count_words + count_contexts)
-        theta = np.random.random(count_parameters) * EPSILON
+        theta = self._sampler.rng.random(count_parameters) * EPSILON
+        start_epoch, start_batch = 0, 0
+        if resume_from is not None:
+            checkpoint = load_checkpoint(path=resume_from)
+            if (
+                checkpoint.theta.shape != theta.shape
+                or checkpoint.data_fingerprint != self._data_fingerprint
+            ):
+                raise ValueError("The checkpoint was saved for another model.")
+            if checkpoint.seed != self._seed:
+                raise ValueError("The checkpoint was saved with another seed.")
+            if checkpoint.batch > 0 and self._seed is None and self._random_pairs_order:
+                raise ValueError(
+                    "Mid-epoch checkpoints need a seed to draw the same pairs order."
+                )
+            if checkpoint.batch > 0 and workers > 1:
+                raise ValueError("Mid-epoch checkpoints are resumed with one process.")
+            theta = checkpoint.theta
+            self._sampler.rng.bit_generator.state = checkpoint.rng_state
+            start_epoch, start_batch = checkpoint.epoch, checkpoint.batch
+            self._logger.info(
+                "Training resumed at epoch %d, batch %d.", start_epoch + 1, start_batch
+            )
+        if workers > 1:
+            shared_theta = _SharedArray.share(values=theta)
+            theta = shared_theta.attach()
+            if self._pairs_corpus is None:
+                shared_data, shards = _share_data(
+                    data=data, count_shardable=count_shardable, workers=workers
+                )
+
+        # 2-D views on theta: batches only update the rows they touch, in place
+        words_matrix, contexts_matrix = _split_theta(
+            theta=theta, count_words=count_words, count_contexts=count_contexts
+        )
+
+        writer = None if checkpoint_path is None else CheckpointWriter(checkpoint_path)
+
+        def _save(epoch: int, batch: int, rng_state: Mapping[str, Any]) -> None:
+            """Submit a copy of the training state to the checkpoint writer."""
+            if writer is not None:
+                writer.submit(
+                    Checkpoint(
+                        theta=theta.copy(),
+                        epoch=epoch,
+                        batch=batch,
+                        rng_state=rng_state,
+                        learning_rate=LEARNING_RATE,
+                        seed=self._seed,
+                        data_fingerprint=self._data_fingerprint,
+                    )
+                )
 
         # Compute Stochastic Gradient
         self._logger.info(
-            "Start Training",
-            epochs=EPOCHS,
-            learning_rate=LEARNING_RATE,
-            batch_size=BATCH_SIZE,
+            "Start Training: epochs=%d learning_rate=%g batch_size=%d workers=%d",
+            EPOCHS,
+            LEARNING_RATE,
+            BATCH_SIZE,
+            workers,
         )
-        for epoch in range(EPOCHS):  # pragma: no cover
-            self._logger.info(f"Epoch {epoch + 1} / {EPOCHS}")
+        try:
+            for epoch in range(start_epoch, EPOCHS):
+                self._logger.info(f"Epoch {epoch + 1} / {EPOCHS}")
+                # Batches of the epoch can be generated again from this state
+                epoch_rng_state = self._sampler.rng.bit_generator.state
+                first_batch = start_batch if epoch == start_epoch else 0
+                if self._pairs_corpus is not None:
+                    # Frequent words are subsampled again at each epoch
+                    self._generate_pairs(
+                        corpus=self._pairs_corpus, rng=self._sampler.rng
+                    )
+                    data, count_shardable, count_pos_pairs = self._training_data()
+                    if workers > 1:
+                        shared_data, shards = _share_data(
+                            data=data, count_shardable=count_shardable, workers=workers
+                        )
 
-            for batch_number in tqdm.tqdm(range(count_pos_pairs // BATCH_SIZE)):
-                logging.info(
-                    f"batch_number {batch_number + 1} / {count_pos_pairs // BATCH_SIZE}"
-                )
-                batch_begin = batch_number * BATCH_SIZE
-                batch_end = min((batch_number + 1) * BATCH_SIZE, count_pos_pairs)
-                batch_positive = self.positive_pairs[batch_begin:batch_end]
-                batch_negative = self.negative_pairs[
-                    NEGATIVE_RATE * batch_begin : NEGATIVE_RATE * batch_end
-                ]
+                if workers == 1:
+                    _train_batches(
+                        words_matrix=words_matrix,
+                        contexts_matrix=contexts_matrix,
+                        batches=_checkpoint_batches(
+                            batches=_iter_batches(
+                                data=data,
+                                sampler=self._sampler,
+                                batch_size=BATCH_SIZE,
+                                negative_rate=NEGATIVE_RATE,
+                                window_size=WINDOW_SIZE,
+                                keep_probabilities=self._keep_probabilities,
+                                dynamic_window=self._dynamic_window,
+                            ),
+                            first_batch=first_batch,
+                            checkpoint_every=checkpoint_every,
+                            save=functools.partial(
+                                _save, epoch, rng_state=epoch_rng_state
+                            ),
+                        ),
+                        learning_rate=LEARNING_RATE,
+                        count_batches=None
+                        if count_pos_pairs is None
+                        else count_pos_pairs // BATCH_SIZE - first_batch,
+                    )
+                    _save(epoch + 1, 0, self._sampler.rng.bit_generator.state)
+                    continue
 
-                # Compute the gradient at theta
-                grad = compute_gradient(
-                    theta=theta,
-                    embedding_dim=EMBEDDING_DIMENSION,
-                    positive_pairs=batch_positive,
-                    negative_pairs=batch_negative,
-                    count_words=count_words,
-                    count_contexts=count_contexts,
-                )
+                # Each process draws its negatives from its own random stream
+                seeds = self._sampler.rng.integers(2 ** 32, size=workers)
+                processes = [
+                    mp.Process(
+                        target=_hogwild_worker,
+                        kwargs=dict(
+                            theta=shared_theta,
+                            count_words=count_words,
+                            count_contexts=count_contexts,
+                            shared_data=shared_data,
+                            sampler=self._sampler,
+                            seed=seed,
+                            shard_begin=shard_begin,
+                            shard_end=shard_end,
+                            batch_size=BATCH_SIZE,
+                            negative_rate=NEGATIVE_RATE,
+                            window_size=WINDOW_SIZE,
+                            keep_probabilities=self._keep_probabilities,
+                            dynamic_window=self._dynamic_window,
+                            learning_rate=LEARNING_RATE,
+                        ),
+                    )
+                    for shard_begin, shard_end, seed in zip(
+                        shards[:-1], shards[1:], seeds
+                    )
+                ]
+                for process in processes:
+                    process.start()
+                for process in processes:
+                    process.join()
+                if any(process.exitcode != 0 for process in processes):
+                    raise RuntimeError("A training process failed.")
+                _save(epoch + 1, 0, self._sampler.rng.bit_generator.state)
+        finally:
+            if writer is not None:
+                writer.close()
 
-                # Actualize theta (since we want to maximize the 'loss', we add grad)
-                theta = theta + LEARNING_RATE * grad
+        # Matrix of embeddings (copied out of the shared memory)
+        self.embed_matrix = np.array(words_matrix)
 
-        # Matrix of embeddings
-        self.embed_matrix = theta[: EMBEDDING_DIMENSION * count_words].reshape(
-            count_words, EMBEDDING_DIMENSION
+    def save_model(self, model_path: str) -> None:
+        """Save words and their embeddings, in files prefixed with `model_path`."""
+        save_model_files(
+            embed_matrix=self.embed_matrix,
+            vocabulary=self.words_voc,
+            model_path=model_path,
         )
 
-    def save_model(self, pickle_path: str) -> None:
-        """Save words and their embeddings in a pickle file."""
-        with open(pickle_path + "embed_matrix", "wb") as file:
-            mon_pickler = pickle.Pickler(file)
-            mon_pickler.dump(self.embed_matrix)
-        with open(pickle_path + "words_voc", "wb") as file:
-            mon_pickler = pickle.Pickler(file)
-            mon_pickler.dump(self.words_voc)
-
     @staticmethod
-    def load_model(pickle_path: str) -> Tuple[np.ndarray, Dict[str, int]]:
-        """Load Skip Gram model."""
-        with open(pickle_path + "embed_matrix", "rb") as file:
-            my_depickler = pickle.Unpickler(file)
-            embed_matrix = my_depickler.load()
-        with open(pickle_path + "words_voc", "rb") as file:
-            my_depickler = pickle.Unpickler(file)
-            words_voc = my_depickler.load()
-
-        return embed_matrix, words_voc
+    def load_model(
+        model_path: str, mmap_mode: Optional[MmapMode] = "r"
+    ) -> Tuple[np.ndarray, Vocabulary]:
+        """Load Skip Gram model.
+
+        The embedding matrix is memory-mapped in `mmap_mode` (read in memory if None).
+        Models saved as pickle files by former versions are still read, in memory.
+        """
+        if is_model(model_path=model_path):
+            return load_model_files(model_path=model_path, mmap_mode=mmap_mode)
+        return load_pickle_model(model_path=model_path)
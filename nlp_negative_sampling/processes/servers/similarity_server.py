@@ -0,0 +1,290 @@
+"""Server answering similarity queries with a Skip Gram model loaded once.
+
+Queries and answers are JSON objects, one per line, over TCP. Each query may carry
+an `id`, copied to its answer since answers to queries sent on one connection
+without waiting can come back in another order:
+    {"id": 1, "op": "similarity", "word_1": "woman", "word_2": "man"}
+        -> {"id": 1, "similarity": 0.90}
+    {"id": 2, "op": "top_k", "word": "city", "k": 3}
+        -> {"id": 2, "words": ["london", "town", "west"], "scores": [0.8, 0.8, 0.8]}
+    {"id": 3, "op": "vector", "word": "city"}
+        -> {"id": 3, "vector": [0.01, ...]}  (null for unknown words)
+    {"id": 4, "op": "metrics"}
+        -> {"id": 4, "requests": 3, "p50_ms": 1.2, "p99_ms": 2.5, ...}
+Invalid queries are answered with an `error` message.
+
+Concurrent queries are gathered in micro-batches, each one scored with a single
+matrix product per operation.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import time
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from nlp_negative_sampling.libs.similarity import SimilarityIndex
+from nlp_negative_sampling.models.skip_gram import SkipGram
+from nlp_negative_sampling.utils.parser import get_server_parser
+
+logger = logging.getLogger()
+
+BATCHED_OPERATIONS = ("similarity", "top_k", "vector")
+DEFAULT_K = 10
+LATENCY_WINDOW = 10000
+MAX_BATCH_SIZE = 256
+MAX_DELAY_SECONDS = 0.002
+
+Query = Dict[str, Any]
+Answer = Dict[str, Any]
+_QueuedQuery = Tuple[Query, "asyncio.Future[Answer]"]
+
+
+class SimilarityServer:
+    """Micro-batching server of the similarity queries of one model.
+
+    Attributes:
+        index: similarity index of the model, sharing its embeddings.
+        embed_matrix: embeddings of the model, answered to vector queries.
+        max_batch_size: maximum number of queries answered together.
+        max_delay: maximum time in seconds a query waits for others.
+    """
+
+    def __init__(
+        self,
+        index: SimilarityIndex,
+        embed_matrix: np.ndarray,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_delay: float = MAX_DELAY_SECONDS,
+    ) -> None:
+        """Instantiate a server, started with `start`."""
+        self.index = index
+        self.embed_matrix = embed_matrix
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._count_requests = 0
+        self._count_batches = 0
+        self._count_batched = 0
+        self._queue: "Optional[asyncio.Queue[_QueuedQuery]]" = None
+        self._batch_task: "Optional[asyncio.Task[None]]" = None
+        # One thread scores a batch while the event loop gathers the next one
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """Start listening, and batching the queries received.
+
+        Args:
+            host: address to listen on.
+            port: port to listen on, 0 for any free port.
+
+        Returns:
+            The listening server, whose sockets give the address.
+        """
+        self._queue = asyncio.Queue()
+        self._batch_task = asyncio.get_running_loop().create_task(self._batch_loop())
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def stop(self) -> None:
+        """Stop batching the queries, once the listening server is closed."""
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the queries of a connection, each one as soon as it is ready."""
+        pending: "Set[asyncio.Future[None]]" = set()
+        # Writes of concurrent answers must not wait for the socket together
+        write_lock = asyncio.Lock()
+
+        async def _answer_line(line: bytes) -> None:
+            """Answer one query line."""
+            answer = await self.answer(line=line)
+            async with write_lock:
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Queries are not awaited one by one, so that they can be batched
+                task = asyncio.ensure_future(_answer_line(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, line: bytes) -> Answer:
+        """Answer a query line, recording the latency of the batched ones."""
+        start = time.perf_counter()
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError("A query must be a JSON object.")
+        except ValueError as error:
+            return dict(error=str(error))
+
+        if query.get("op") == "metrics":
+            answer = self.metrics()
+        elif query.get("op") in BATCHED_OPERATIONS:
+            if self._queue is None:
+                raise RuntimeError("The server is not started.")
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((query, future))
+            try:
+                answer = await future
+            except Exception as error:
+                answer = dict(error=f"Invalid query: {error!r}")
+            self._latencies.append(time.perf_counter() - start)
+            self._count_requests += 1
+        else:
+            answer = dict(error=f"Unknown operation {query.get('op')!r}.")
+
+        if "id" in query:
+            answer["id"] = query["id"]
+        return answer
+
+    async def _batch_loop(self) -> None:
+        """Gather the queued queries in batches and answer them."""
+        if self._queue is None:
+            raise RuntimeError("The server is not started.")
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            queries = [query for query, _ in batch]
+            self._count_batches += 1
+            self._count_batched += len(batch)
+            answers: List[Union[Answer, Exception]] = []
+            try:
+                answers.extend(
+                    await loop.run_in_executor(
+                        self._executor, self.answer_batch, queries
+                    )
+                )
+            except Exception:
+                # Answered one by one, so that only invalid queries fail
+                answers = []
+                for query in queries:
+                    try:
+                        answers.extend(self.answer_batch(queries=[query]))
+                    except Exception as error:
+                        answers.append(error)
+            for (_, future), answer in zip(batch, answers):
+                if future.done():
+                    continue
+                if isinstance(answer, Exception):
+                    future.set_exception(answer)
+                else:
+                    future.set_result(answer)
+
+    def answer_batch(self, queries: List[Query]) -> List[Answer]:
+        """Answer a batch of queries, with one matrix product per operation."""
+        answers: List[Answer] = [{} for _ in queries]
+        by_operation: Dict[str, List[int]] = {}
+        for position, query in enumerate(queries):
+            by_operation.setdefault(query["op"], []).append(position)
+
+        if "similarity" in by_operation:
+            positions = by_operation["similarity"]
+            similarities = self.index.pairs_similarity(
+                logger=logger,
+                words_1=[str(queries[p]["word_1"]) for p in positions],
+                words_2=[str(queries[p]["word_2"]) for p in positions],
+            )
+            for position, similarity in zip(positions, similarities.tolist()):
+                answers[position]["similarity"] = similarity
+
+        if "top_k" in by_operation:
+            positions = by_operation["top_k"]
+            words = [str(queries[p]["word"]) for p in positions]
+            counts = [int(queries[p].get("k", DEFAULT_K)) for p in positions]
+            if min(counts) < 1:
+                raise ValueError("k must be positive.")
+            indexes, scores = self.index.batch_top_k(
+                vectors=self.index.query_vectors(logger=logger, words=words),
+                k=max(counts),
+                exclude=self.index.lookup(words=words),
+            )
+            for row, (position, k) in enumerate(zip(positions, counts)):
+                answers[position]["words"] = self.index.words[indexes[row, :k]].tolist()
+                answers[position]["scores"] = scores[row, :k].tolist()
+
+        if "vector" in by_operation:
+            positions = by_operation["vector"]
+            indexes = self.index.lookup(
+                words=[str(queries[p]["word"]) for p in positions]
+            )
+            vectors = self.embed_matrix[np.maximum(indexes, 0)].tolist()
+            for position, word_index, vector in zip(positions, indexes, vectors):
+                answers[position]["vector"] = vector if word_index >= 0 else None
+
+        return answers
+
+    def metrics(self) -> Answer:
+        """Latency percentiles of the last batched queries, and batching counts."""
+        latencies = np.array(self._latencies) * 1e3
+        return dict(
+            requests=self._count_requests,
+            batches=self._count_batches,
+            mean_batch_size=self._count_batched / max(self._count_batches, 1),
+            p50_ms=float(np.percentile(latencies, 50)) if len(latencies) else None,
+            p99_ms=float(np.percentile(latencies, 99)) if len(latencies) else None,
+        )
+
+
+async def serve(
+    model_path: str,
+    host: str,
+    port: int,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_delay: float = MAX_DELAY_SECONDS,
+) -> None:
+    """Load a model and answer its queries until cancelled."""
+    embed_matrix, words_voc = SkipGram.load_model(model_path=model_path)
+    similarity_server = SimilarityServer(
+        index=SimilarityIndex(words_voc=words_voc, embed_matrix=embed_matrix),
+        embed_matrix=embed_matrix,
+        max_batch_size=max_batch_size,
+        max_delay=max_delay,
+    )
+    server = await similarity_server.start(host=host, port=port)
+    logger.info("Similarity server started on %s:%d.", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        similarity_server.stop()
+
+
+if __name__ == "__main__":
+    args = get_server_parser().parse_args()
+    asyncio.run(
+        serve(
+            model_path=args.model_path,
+            host=args.host,
+            port=args.port,
+            max_batch_size=args.max_batch_size,
+            max_delay=args.max_delay_ms / 1e3,
+        )
+    )
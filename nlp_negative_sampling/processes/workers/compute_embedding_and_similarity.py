@@ -4,44 +4,70 @@ import logging
 
 import pandas as pd
 
-from nlp_negative_sampling.libs.similarity import words_similarity
-from nlp_negative_sampling.models.skip_gram import SkipGram
-from nlp_negative_sampling.utils.input_handler import load_pairs
+from nlp_negative_sampling.libs.ann_index import IVFIndex
+from nlp_negative_sampling.libs.similarity import SimilarityIndex, normalize_vectors
+from nlp_negative_sampling.models.skip_gram import MIN_COUNT, SkipGram
+from nlp_negative_sampling.utils.corpus_cache import load_or_preprocess_corpus
+from nlp_negative_sampling.utils.input_handler import iter_pairs_chunks
 from nlp_negative_sampling.utils.parser import get_command_line_parser
-from nlp_negative_sampling.utils.process_text_data import tokenize_file
 
 logger = logging.getLogger()
 
+RESULTS_COLUMNS = ["word_1", "word_2", "similarity"]
+
 
 def skip_gram_similarity_worker(args: Namespace) -> None:
     """Train, save and test Skip Gram model."""
     if not args.test:
-        sentences = tokenize_file(file=args.text_path)
-        sg_model = SkipGram(logger=logger, sentences=sentences)
-        sg_model.train()
-        sg_model.save_model(pickle_path=args.model_path)
+        # Preprocessing the files as a stream keeps the sentences out of memory
+        preprocessed = load_or_preprocess_corpus(
+            text_path=args.text_path,
+            min_count=MIN_COUNT,
+            cache_dir=args.cache_dir,
+            workers=args.preprocessing_workers,
+            max_vocab_size=args.max_vocab_size,
+            max_words=args.max_words,
+        )
+        sg_model = SkipGram(
+            logger=logger,
+            preprocessed=preprocessed,
+            pairs_dir=args.pairs_dir,
+            streaming=args.streaming,
+            subsample_threshold=args.subsample_threshold,
+            dynamic_window=args.dynamic_window,
+            aggregate_pairs=args.aggregate_pairs,
+            max_pair_weight=args.max_pair_weight,
+            seed=args.seed,
+        )
+        sg_model.train(
+            workers=args.workers,
+            checkpoint_path=args.checkpoint_path,
+            checkpoint_every=args.checkpoint_every,
+            resume_from=args.resume_from,
+        )
+        sg_model.save_model(model_path=args.model_path)
+        if args.ann_clusters is not None:
+            IVFIndex.build(
+                normalized_matrix=normalize_vectors(sg_model.embed_matrix),
+                count_clusters=args.ann_clusters,
+                seed=args.seed,
+            ).save(model_path=args.model_path)
     else:
-        pairs = load_pairs(args.text_path)
         embed_matrix, words_voc = SkipGram.load_model(args.model_path)
+        index = SimilarityIndex(words_voc=words_voc, embed_matrix=embed_matrix)
 
-        results_df = pd.DataFrame(
-            columns=["word_1", "word_2", "similarity"],
-            data=[
-                [
-                    word_1,
-                    word_2,
-                    words_similarity(
-                        logger=logger,
-                        word_1=word_1,
-                        word_2=word_2,
-                        words_voc=words_voc,
-                        embed_matrix=embed_matrix,
-                    ),
-                ]
-                for word_1, word_2, _ in pairs
-            ],
-        )
-        results_df.to_csv(path_or_buf=args.results_path, index=False)
+        # Pairs are scored by chunks and appended, so memory does not grow with them
+        with open(args.results_path, "w", newline="") as results_file:
+            pd.DataFrame(columns=RESULTS_COLUMNS).to_csv(results_file, index=False)
+            for pairs_df in iter_pairs_chunks(
+                path=args.text_path, chunk_size=args.pairs_chunk_size
+            ):
+                pairs_df["similarity"] = index.pairs_similarity(
+                    logger=logger,
+                    words_1=pairs_df["word_1"],
+                    words_2=pairs_df["word_2"],
+                )
+                pairs_df.to_csv(results_file, header=False, index=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""Checkpoints of the training state."""
+import hashlib
+import json
+import os
+import queue
+import threading
+from typing import Any, Iterable, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+CHECKPOINT_VERSION = 2
+
+
+class Checkpoint(NamedTuple):
+    """State of a training, enough to resume it exactly.
+
+    Attributes:
+        theta: vector of parameters (words embeddings followed by contexts ones).
+        epoch: epoch to resume.
+        batch: number of batches of `epoch` already trained on.
+        rng_state: state of the random generator of the negative sampler at the
+            start of `epoch`, so its batches can be generated again.
+        learning_rate: learning rate of the (plain) gradient ascent, its only state.
+        seed: seed of the model, which draws the order of its materialized pairs.
+        data_fingerprint: hash of the training data and options of the model (see
+            `data_fingerprint`).
+    """
+
+    theta: np.ndarray
+    epoch: int
+    batch: int
+    rng_state: Mapping[str, Any]
+    learning_rate: float
+    seed: Optional[int]
+    data_fingerprint: str
+
+
+def data_fingerprint(arrays: Iterable[np.ndarray], options: Mapping[str, Any]) -> str:
+    """Hash numeric arrays and JSON-serializable options.
+
+    A checkpoint is only resumed by a model with the same fingerprint, whose batches
+    are the same.
+    """
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+    for array in arrays:
+        digest.update(str(array.dtype).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def save_checkpoint(checkpoint: Checkpoint, path: str) -> None:
+    """Write a checkpoint to a `.npz` file, replacing the previous one atomically."""
+    metadata = dict(
+        version=CHECKPOINT_VERSION,
+        epoch=checkpoint.epoch,
+        batch=checkpoint.batch,
+        rng_state=checkpoint.rng_state,
+        learning_rate=checkpoint.learning_rate,
+        seed=checkpoint.seed,
+        data_fingerprint=checkpoint.data_fingerprint,
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, theta=checkpoint.theta, metadata=np.array(json.dumps(metadata)))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Read a checkpoint written by `save_checkpoint`.
+
+    Raises:
+        ValueError: if the checkpoint was written in another format version.
+    """
+    with np.load(path) as checkpoint_file:
+        metadata = json.loads(str(checkpoint_file["metadata"]))
+        if metadata["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {metadata['version']}.")
+        return Checkpoint(
+            theta=checkpoint_file["theta"],
+            epoch=metadata["epoch"],
+            batch=metadata["batch"],
+            rng_state=metadata["rng_state"],
+            learning_rate=metadata["learning_rate"],
+            seed=metadata["seed"],
+            data_fingerprint=metadata["data_fingerprint"],
+        )
+
+
+class CheckpointWriter:
+    """Write checkpoints from a background thread, so training does not wait."""
+
+    def __init__(self, path: str) -> None:
+        """Start the writing thread.
+
+        Args:
+            path: file of the checkpoints, each one replacing the previous one.
+        """
+        self.path = path
+        # One pending checkpoint at most: memory stays bounded to two copies
+        self._queue: "queue.Queue[Optional[Checkpoint]]" = queue.Queue(maxsize=1)
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _write(self) -> None:
+        """Write the submitted checkpoints until the end marker."""
+        while True:
+            checkpoint = self._queue.get()
+            if checkpoint is None:
+                return
+            try:
+                save_checkpoint(checkpoint=checkpoint, path=self.path)
+            except Exception as error:
+                self._error = error
+
+    def _raise_error(self) -> None:
+        """Raise the error of a failed write, if any."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def submit(self, checkpoint: Checkpoint) -> None:
+        """Queue a checkpoint, whose arrays must not be modified afterwards.
+
+        Waits for the previous checkpoint to be written if it still is not.
+        """
+        self._raise_error()
+        self._queue.put(checkpoint)
+
+    def close(self) -> None:
+        """Wait for the pending checkpoint to be written and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> "CheckpointWriter":
+        """Use the writer in a with statement, closing it at the end."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the writer."""
+        self.close()
@@ -0,0 +1,178 @@
+"""Integer-encoded corpus."""
+from array import array
+from itertools import compress
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from nlp_negative_sampling.utils.process_text_data import (
+    count_words,
+    count_words_bounded,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+TOKENS_DTYPE = np.int32
+
+
+class EncodedCorpus(NamedTuple):
+    """Sentences encoded as one flat array of word indexes.
+
+    Attributes:
+        tokens: word index of every token of the corpus, sentence after sentence.
+        offsets: position in `tokens` of the start of each sentence, followed by the
+            number of tokens (so sentence i is `tokens[offsets[i]:offsets[i + 1]]`).
+    """
+
+    tokens: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def count_sentences(self) -> int:
+        """Number of sentences in the corpus."""
+        return len(self.offsets) - 1
+
+    def select(self, begin: int, end: int) -> "EncodedCorpus":
+        """Return the sentences from `begin` to `end` (excluded), without copy."""
+        return EncodedCorpus(
+            tokens=self.tokens[self.offsets[begin] : self.offsets[end]],
+            offsets=self.offsets[begin : end + 1] - self.offsets[begin],
+        )
+
+
+class PreprocessedCorpus(NamedTuple):
+    """Vocabulary and integer-encoded sentences of a processed corpus.
+
+    Attributes:
+        vocabulary: words sorted by descending frequency, with their counts.
+        corpus: integer-encoded sentences.
+    """
+
+    vocabulary: Vocabulary
+    corpus: EncodedCorpus
+
+
+def build_vocabulary(sentences: Iterable[List[str]]) -> Dict[str, int]:
+    """Attribute an index to each word, in order of first appearance."""
+    vocabulary: Dict[str, int] = {}
+    for sentence in sentences:
+        for word in sentence:
+            if word not in vocabulary:
+                vocabulary[word] = len(vocabulary)
+    return vocabulary
+
+
+def encode_corpus(
+    sentences: Iterable[List[str]], vocabulary: Mapping[str, int]
+) -> EncodedCorpus:
+    """Encode sentences with the indexes of the vocabulary.
+
+    Words that are not in the vocabulary are dropped.
+    """
+    # Typed buffers take 4 and 8 bytes per item, instead of a Python int each
+    tokens = array("i")
+    offsets = array("q", [0])
+    for sentence in sentences:
+        tokens.extend(vocabulary[word] for word in sentence if word in vocabulary)
+        offsets.append(len(tokens))
+
+    return EncodedCorpus(
+        tokens=np.frombuffer(tokens, dtype=TOKENS_DTYPE).copy(),
+        offsets=np.frombuffer(offsets, dtype=np.int64).copy(),
+    )
+
+
+def preprocess_corpus(processed_sentences: List[List[str]]) -> PreprocessedCorpus:
+    """Build the vocabulary and the encoded corpus of sentences."""
+    count_tokens = count_words(words=processed_sentences)
+    vocabulary = Vocabulary.from_counts(
+        words=list(count_tokens),
+        counts=np.fromiter(
+            count_tokens.values(), dtype=np.int64, count=len(count_tokens)
+        ),
+    )
+    return PreprocessedCorpus(
+        vocabulary=vocabulary,
+        corpus=encode_corpus(sentences=processed_sentences, vocabulary=vocabulary),
+    )
+
+
+def select_vocabulary(
+    counts: np.ndarray, min_count: int, max_words: Optional[int] = None
+) -> np.ndarray:
+    """Select the words kept in the vocabulary.
+
+    Args:
+        counts: number of occurrences of each word.
+        min_count: words occurring at most `min_count` times are removed.
+        max_words: if given, only the `max_words` most frequent words are kept, the
+            first ones in `counts` winning ties.
+
+    Returns:
+        boolean mask of the kept words.
+    """
+    kept = counts > min_count
+    if max_words is not None and kept.sum() > max_words:
+        most_frequent = np.argsort(-counts, kind="stable")[:max_words]
+        kept = np.zeros(len(counts), dtype=bool)
+        kept[most_frequent] = True
+    return kept
+
+
+def preprocess_sentences_stream(
+    iter_sentences: Callable[[], Iterable[List[str]]],
+    min_count: int,
+    max_vocab_size: Optional[int] = None,
+    max_words: Optional[int] = None,
+) -> PreprocessedCorpus:
+    """Prune rare words and encode sentences, in two passes over a stream.
+
+    Same result as `preprocess_corpus` on the sentences pruned by `rare_word_pruning`,
+    without ever holding the tokenized sentences in memory.
+
+    Args:
+        iter_sentences: function returning a new iterator over the tokenized
+            sentences at each call.
+        min_count: words occurring at most `min_count` times are removed.
+        max_vocab_size: if given, bound of the number of distinct words counted at
+            once (see `count_words_bounded`).
+        max_words: if given, only the `max_words` most frequent words are kept.
+
+    Returns:
+        vocabulary, word counts and integer-encoded sentences.
+    """
+    if max_vocab_size is None:
+        count_tokens = count_words(words=iter_sentences())
+    else:
+        count_tokens = count_words_bounded(
+            words=iter_sentences(), max_vocab_size=max_vocab_size
+        )
+    # Counter keeps the order of first appearance, which breaks count ties
+    words = list(count_tokens)
+    counts = np.array([count_tokens[word] for word in words], dtype=np.int64)
+    kept = select_vocabulary(counts=counts, min_count=min_count, max_words=max_words)
+    vocabulary = Vocabulary.from_counts(
+        words=list(compress(words, kept)), counts=counts[kept]
+    )
+
+    return PreprocessedCorpus(
+        vocabulary=vocabulary,
+        corpus=encode_corpus(sentences=iter_sentences(), vocabulary=vocabulary),
+    )
+
+
+def subsample_corpus(
+    corpus: EncodedCorpus, keep_probabilities: np.ndarray, rng: np.random.Generator
+) -> EncodedCorpus:
+    """Randomly drop tokens, each word being kept with its keep probability.
+
+    Args:
+        corpus: integer-encoded sentences.
+        keep_probabilities: probability of keeping each word of the vocabulary.
+        rng: random generator.
+
+    Returns:
+        The subsampled corpus, with the same number of sentences.
+    """
+    keep = rng.random(len(corpus.tokens)) < keep_probabilities[corpus.tokens]
+    count_kept = np.concatenate([[0], np.cumsum(keep)])
+    return EncodedCorpus(tokens=corpus.tokens[keep], offsets=count_kept[corpus.offsets])
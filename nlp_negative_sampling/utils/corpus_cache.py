@@ -0,0 +1,159 @@
+"""On-disk cache of preprocessed corpora."""
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from nlp_negative_sampling.utils.corpus import (
+    EncodedCorpus,
+    PreprocessedCorpus,
+    preprocess_sentences_stream,
+)
+from nlp_negative_sampling.utils.input_handler import resolve_text_paths
+from nlp_negative_sampling.utils.parallel_preprocessing import preprocess_file_parallel
+from nlp_negative_sampling.utils.process_text_data import (
+    TOKENIZER_VERSION,
+    iter_tokenized_file,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+HASH_BLOCK_SIZE = 1 << 20
+VOCABULARY_FILE = "vocabulary.txt"
+COUNTS_FILE = "counts.npy"
+TOKENS_FILE = "tokens.npy"
+OFFSETS_FILE = "offsets.npy"
+
+
+def _file_digest(path: str) -> str:
+    """Return the sha256 hex digest of the content of a file, read by blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def corpus_cache_key(
+    text_path: str,
+    min_count: int,
+    max_vocab_size: Optional[int] = None,
+    max_words: Optional[int] = None,
+    workers: int = 1,
+) -> str:
+    """Key of the preprocessed corpus of text files.
+
+    Args:
+        text_path: path of the training text (see `resolve_text_paths`).
+        min_count: threshold of the rare words pruning.
+        max_vocab_size: bound of the number of distinct words counted at once.
+        max_words: maximum size of the vocabulary.
+        workers: number of preprocessing processes, which only changes the result
+            when the counted words are bounded.
+
+    Returns:
+        hash of the content of the files, in order, and of the preprocessing
+        settings.
+    """
+    digests = [_file_digest(path) for path in resolve_text_paths(text_path=text_path)]
+    settings = f"{','.join(digests)}-min_count={min_count}"
+    settings += f"-tokenizer={TOKENIZER_VERSION}-max_words={max_words}"
+    if max_vocab_size is not None:
+        settings += f"-max_vocab_size={max_vocab_size}-workers={workers}"
+    return hashlib.sha256(settings.encode("utf8")).hexdigest()
+
+
+def save_preprocessed_corpus(preprocessed: PreprocessedCorpus, path: str) -> None:
+    """Write a preprocessed corpus in a directory.
+
+    The directory is written next to its final location then renamed, so that an
+    interrupted write never leaves a partial cache entry.
+    """
+    parent_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir)
+    try:
+        vocabulary = preprocessed.vocabulary
+        with open(os.path.join(tmp_dir, VOCABULARY_FILE), "w", encoding="utf8") as f:
+            f.write("\n".join(vocabulary.words))
+        np.save(os.path.join(tmp_dir, COUNTS_FILE), vocabulary.counts)
+        np.save(os.path.join(tmp_dir, TOKENS_FILE), preprocessed.corpus.tokens)
+        np.save(os.path.join(tmp_dir, OFFSETS_FILE), preprocessed.corpus.offsets)
+        os.replace(tmp_dir, path)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(path):  # not written by a concurrent run either
+            raise
+
+
+def load_preprocessed_corpus(path: str) -> PreprocessedCorpus:
+    """Read a preprocessed corpus, memory-mapping its token and offset arrays."""
+    with open(os.path.join(path, VOCABULARY_FILE), encoding="utf8") as f:
+        words = f.read().split("\n")
+    counts = np.load(os.path.join(path, COUNTS_FILE))
+    return PreprocessedCorpus(
+        vocabulary=Vocabulary(words=words[: len(counts)], counts=counts),
+        corpus=EncodedCorpus(
+            tokens=np.load(os.path.join(path, TOKENS_FILE), mmap_mode="r"),
+            offsets=np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r"),
+        ),
+    )
+
+
+def load_or_preprocess_corpus(
+    text_path: str,
+    min_count: int,
+    cache_dir: Optional[str] = None,
+    workers: int = 1,
+    max_vocab_size: Optional[int] = None,
+    max_words: Optional[int] = None,
+) -> PreprocessedCorpus:
+    """Preprocess a text file, or load its cached preprocessed corpus.
+
+    Args:
+        text_path: path of the training text (see `resolve_text_paths`).
+        min_count: threshold of the rare words pruning.
+        cache_dir: directory of the cache. If None, nothing is cached.
+        workers: number of preprocessing processes.
+        max_vocab_size: if given, bound of the number of distinct words counted at
+            once (by each process).
+        max_words: if given, only the `max_words` most frequent words are kept.
+
+    Returns:
+        vocabulary, word counts and integer-encoded sentences of the text.
+    """
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(
+            cache_dir,
+            corpus_cache_key(
+                text_path=text_path,
+                min_count=min_count,
+                max_vocab_size=max_vocab_size,
+                max_words=max_words,
+                workers=workers,
+            ),
+        )
+        if os.path.isdir(cache_path):
+            return load_preprocessed_corpus(path=cache_path)
+
+    if workers > 1:
+        preprocessed = preprocess_file_parallel(
+            text_path=text_path,
+            min_count=min_count,
+            workers=workers,
+            max_vocab_size=max_vocab_size,
+            max_words=max_words,
+        )
+    else:
+        preprocessed = preprocess_sentences_stream(
+            iter_sentences=lambda: iter_tokenized_file(file=text_path),
+            min_count=min_count,
+            max_vocab_size=max_vocab_size,
+            max_words=max_words,
+        )
+    if cache_path is not None:
+        save_preprocessed_corpus(preprocessed=preprocessed, path=cache_path)
+    return preprocessed
@@ -1,7 +1,8 @@
 """Tools to process functions."""
 from functools import reduce
+from typing import Any, Callable
 
 
-def compose(*functions):
+def compose(*functions: Callable[[Any], Any]) -> Callable[[Any], Any]:
     """Combine n functions such that the result of each function is passed as the argument of the new function."""
     return reduce(lambda f, g: lambda x: f(g(x)), functions, lambda x: x)
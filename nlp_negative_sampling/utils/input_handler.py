@@ -1,11 +1,160 @@
-"""Function to read tests results."""
-from typing import List, Union
+"""Functions to read input files."""
+import bz2
+import glob
+import gzip
+import lzma
+import os
+import queue
+import threading
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import pandas as pd
 
+T = TypeVar("T")
+
+COMPRESSED_OPENERS: Dict[str, Callable[..., IO[Any]]] = {
+    ".bz2": bz2.open,
+    ".gz": gzip.open,
+    ".xz": lzma.open,
+}
+GLOB_CHARACTERS = "*?["
+PAIRS_CHUNK_SIZE = 100000
+PREFETCH_SIZE = 4
+_PREFETCH_POLL_SECONDS = 0.1
+
 
 def load_pairs(path: str) -> List[List[Union[str, float]]]:
     """Read similarity results."""
     data = pd.read_csv(filepath_or_buffer=path)
     pairs = [list(a) for a in zip(data["word_1"], data["word_2"], data["similarity"])]
     return pairs
+
+
+def iter_pairs_chunks(
+    path: str, chunk_size: int = PAIRS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Read the word pairs of a CSV by chunks of rows.
+
+    The next chunk is read by a background thread while the current one is
+    processed. Words are kept as strings, "nan" or "null" included.
+
+    Args:
+        path: CSV file with `word_1` and `word_2` columns.
+        chunk_size: number of rows of a chunk.
+
+    Yields:
+        DataFrames of the `word_1` and `word_2` columns of the pairs.
+    """
+    reader = pd.read_csv(
+        filepath_or_buffer=path,
+        usecols=["word_1", "word_2"],
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunk_size,
+    )
+    yield from prefetch(items=reader, size=1)
+
+
+def resolve_text_paths(text_path: str) -> List[str]:
+    """List the files of a corpus given as one or several comma-separated paths.
+
+    Each path is a file, a directory (all its files) or a glob pattern. Files of a
+    directory or of a pattern are sorted, so that shards keep their order.
+
+    Raises:
+        FileNotFoundError: if a path matches no file.
+    """
+    paths: List[str] = []
+    for pattern in text_path.split(","):
+        if os.path.isdir(pattern):
+            matches = [
+                os.path.join(pattern, name)
+                for name in sorted(os.listdir(pattern))
+                if os.path.isfile(os.path.join(pattern, name))
+            ]
+        elif any(character in pattern for character in GLOB_CHARACTERS):
+            matches = sorted(
+                path for path in glob.glob(pattern) if os.path.isfile(path)
+            )
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+        if not matches:
+            raise FileNotFoundError(f"No training file matches {pattern}")
+        paths.extend(matches)
+    return paths
+
+
+def is_compressed(path: str) -> bool:
+    """Whether a file is compressed, according to its extension."""
+    return os.path.splitext(path)[1] in COMPRESSED_OPENERS
+
+
+def open_text_file(path: str) -> IO[str]:
+    """Open a text file for reading, decompressing gzip, xz and bz2 files."""
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1])
+    if opener is None:
+        return open(path, encoding="utf8")
+    return opener(path, "rt", encoding="utf8")
+
+
+def prefetch(items: Iterable[T], size: int = PREFETCH_SIZE) -> Iterator[T]:
+    """Iterate over items produced ahead of time by a background thread.
+
+    Decompression and file reads release the GIL, so producing the chunks of a file
+    this way overlaps them with their processing by the caller.
+
+    Args:
+        items: iterable, consumed by the background thread.
+        size: maximum number of items produced ahead.
+
+    Yields:
+        the items, in order. An exception raised by the producer is raised again.
+    """
+    # Items are wrapped in tuples, so that None can mark the end even among them
+    buffer: "queue.Queue[Union[Tuple[T], Exception, None]]" = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def _put(entry: Union[Tuple[T], Exception, None]) -> bool:
+        """Put an entry in the buffer unless the consumer stopped, return if put."""
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=_PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        """Move the items to the buffer, followed by the end marker or an error."""
+        try:
+            for item in items:
+                if not _put((item,)):
+                    return
+            _put(None)
+        except Exception as error:
+            _put(error)
+
+    producer = threading.Thread(target=_produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            entry = buffer.get()
+            if entry is None:
+                return
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry[0]
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,141 @@
+"""On-disk format of trained models.
+
+A model is saved as a set of files sharing a path prefix:
+    - `embed_matrix.npy`: the embedding matrix, loaded memory-mapped, so loading is
+      near-constant time and processes of one host share its page-cached copy.
+    - `vocabulary.txt` and `counts.npy`: the words by index, and their counts.
+    - `model.json`: the format version and shape of the model, written last.
+
+Models saved by former versions as two pickle files can be converted with:
+    python -m nlp_negative_sampling.utils.model_files <model_path>
+"""
+from argparse import ArgumentParser
+import json
+import os
+import pickle
+from typing import Literal, Optional, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+MODEL_FORMAT_VERSION = 1
+METADATA_FILE = "model.json"
+EMBEDDINGS_FILE = "embed_matrix.npy"
+VOCABULARY_FILE = "vocabulary.txt"
+COUNTS_FILE = "counts.npy"
+PICKLE_EMBEDDINGS_FILE = "embed_matrix"
+PICKLE_VOCABULARY_FILE = "words_voc"
+
+# Memory-mapping modes of `np.load`
+MmapMode = Literal["r+", "r", "w+", "c"]
+
+
+def save_model_files(
+    embed_matrix: np.ndarray, vocabulary: Vocabulary, model_path: str
+) -> None:
+    """Write a model in the memory-mappable format.
+
+    The metadata file is replaced last, so a model being overwritten is never read
+    with a partial metadata file.
+    """
+    np.save(f"{model_path}{EMBEDDINGS_FILE}", np.ascontiguousarray(embed_matrix))
+    with open(f"{model_path}{VOCABULARY_FILE}", "w", encoding="utf8") as file:
+        file.write("\n".join(vocabulary.words))
+    np.save(f"{model_path}{COUNTS_FILE}", vocabulary.counts)
+
+    metadata = dict(
+        version=MODEL_FORMAT_VERSION,
+        count_words=len(vocabulary),
+        embedding_dimension=embed_matrix.shape[1],
+        dtype=str(embed_matrix.dtype),
+    )
+    tmp_path = f"{model_path}{METADATA_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as file:
+        json.dump(metadata, file)
+    os.replace(tmp_path, f"{model_path}{METADATA_FILE}")
+
+
+def is_model(model_path: str) -> bool:
+    """Whether a model was saved in the memory-mappable format at this path."""
+    return os.path.isfile(f"{model_path}{METADATA_FILE}")
+
+
+def load_model_files(
+    model_path: str, mmap_mode: Optional[MmapMode] = "r"
+) -> Tuple[np.ndarray, Vocabulary]:
+    """Read a model written by `save_model_files`.
+
+    Args:
+        model_path: path prefix of the model files.
+        mmap_mode: mode in which the embedding matrix is memory-mapped, or None to
+            read it in memory.
+
+    Returns:
+        The embedding matrix and the vocabulary.
+
+    Raises:
+        ValueError: if the model was written in another format version, or its
+            files do not match.
+    """
+    with open(f"{model_path}{METADATA_FILE}", encoding="utf8") as file:
+        metadata = json.load(file)
+    if metadata["version"] != MODEL_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format version {metadata['version']}.")
+
+    embed_matrix = np.load(f"{model_path}{EMBEDDINGS_FILE}", mmap_mode=mmap_mode)
+    with open(f"{model_path}{VOCABULARY_FILE}", encoding="utf8") as file:
+        words = file.read().split("\n")
+    counts = np.load(f"{model_path}{COUNTS_FILE}")
+    if embed_matrix.shape != (metadata["count_words"], metadata["embedding_dimension"]):
+        raise ValueError("The embedding matrix does not match the model metadata.")
+    if len(counts) != metadata["count_words"]:
+        raise ValueError("The vocabulary does not match the model metadata.")
+
+    return embed_matrix, Vocabulary(words=words[: len(counts)], counts=counts)
+
+
+def load_pickle_model(model_path: str) -> Tuple[np.ndarray, Vocabulary]:
+    """Read a model saved as two pickle files.
+
+    Vocabularies saved as dictionaries are converted, with unknown counts.
+    """
+    with open(f"{model_path}{PICKLE_EMBEDDINGS_FILE}", "rb") as file:
+        embed_matrix = pickle.Unpickler(file).load()
+    with open(f"{model_path}{PICKLE_VOCABULARY_FILE}", "rb") as file:
+        words_voc = pickle.Unpickler(file).load()
+    if not isinstance(words_voc, Vocabulary):
+        words_voc = Vocabulary.from_mapping(words_voc=words_voc)
+
+    return embed_matrix, words_voc
+
+
+def migrate_pickle_model(model_path: str, remove_pickles: bool = False) -> None:
+    """Convert a model saved as pickle files to the memory-mappable format.
+
+    Args:
+        model_path: path prefix of the model files.
+        remove_pickles: whether to delete the pickle files once converted.
+    """
+    embed_matrix, vocabulary = load_pickle_model(model_path=model_path)
+    save_model_files(
+        embed_matrix=np.asarray(embed_matrix),
+        vocabulary=vocabulary,
+        model_path=model_path,
+    )
+    if remove_pickles:
+        os.remove(f"{model_path}{PICKLE_EMBEDDINGS_FILE}")
+        os.remove(f"{model_path}{PICKLE_VOCABULARY_FILE}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Convert pickle models to the new format.")
+    parser.add_argument("model_paths", help="Path prefixes of the models.", nargs="+")
+    parser.add_argument(
+        "--remove_pickles",
+        help="Delete the pickle files once converted.",
+        action="store_true",
+    )
+    args = parser.parse_args()
+    for path in args.model_paths:
+        migrate_pickle_model(model_path=path, remove_pickles=args.remove_pickles)
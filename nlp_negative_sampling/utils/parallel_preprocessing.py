@@ -0,0 +1,221 @@
+"""Preprocessing of text files with a pool of processes."""
+from array import array
+import multiprocessing as mp
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from nlp_negative_sampling.utils.corpus import (
+    TOKENS_DTYPE,
+    EncodedCorpus,
+    PreprocessedCorpus,
+    select_vocabulary,
+)
+from nlp_negative_sampling.utils.input_handler import is_compressed, resolve_text_paths
+from nlp_negative_sampling.utils.process_text_data import (
+    get_line_aligned_ranges,
+    iter_tokenized_file,
+    iter_tokenized_file_range,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+# Several ranges per process balance the load when lines have uneven lengths
+RANGES_PER_WORKER = 4
+
+
+class _EncodedRange(NamedTuple):
+    """Sentences of a byte range, encoded with a vocabulary local to the range.
+
+    Words removed from the local vocabulary to bound its size are None.
+    """
+
+    words: List[Optional[str]]
+    counts: np.ndarray
+    corpus: EncodedCorpus
+
+
+def _add_counts(counts: np.ndarray, tokens: np.ndarray, size: int) -> np.ndarray:
+    """Return counts increased by the counts of new tokens, over `size` indexes."""
+    total = np.bincount(tokens, minlength=size)
+    total[: len(counts)] += counts
+    return total
+
+
+def _preprocess_range(
+    task: Tuple[str, int, Optional[int], Optional[int]]
+) -> _EncodedRange:
+    """Tokenize, count and encode the lines of a byte range of a file.
+
+    Args:
+        task: path of the file, begin and end byte positions of the range, and
+            maximum size of the local vocabulary (see `count_words_bounded`). The end
+            is None for a whole compressed file, which cannot be split.
+
+    Returns:
+        local words in order of first appearance, their counts and the encoded range.
+    """
+    file, begin, end, max_vocab_size = task
+    if end is None:
+        sentences = iter_tokenized_file(file=file)
+    else:
+        sentences = iter_tokenized_file_range(file=file, begin=begin, end=end)
+
+    vocabulary: Dict[str, int] = {}
+    count_removed = 0  # removed words keep their index, a new one is given if seen
+    min_reduce = 1
+    tokens = array("i")
+    # Counts of the tokens before `count_counted`, only updated with the new ones
+    counts = np.zeros(0, dtype=np.int64)
+    count_counted = 0
+    offsets = array("q", [0])
+    for sentence in sentences:
+        tokens.extend(
+            vocabulary.setdefault(word, len(vocabulary) + count_removed)
+            for word in sentence
+        )
+        offsets.append(len(tokens))
+
+        if max_vocab_size is not None and len(vocabulary) > max_vocab_size:
+            counts = _add_counts(
+                counts=counts,
+                tokens=np.frombuffer(tokens, dtype=TOKENS_DTYPE)[count_counted:],
+                size=len(vocabulary) + count_removed,
+            )
+            count_counted = len(tokens)
+            for word, index in list(vocabulary.items()):
+                if counts[index] <= min_reduce:
+                    del vocabulary[word]
+                    count_removed += 1
+            min_reduce += 1
+
+    words: List[Optional[str]] = [None] * (len(vocabulary) + count_removed)
+    for word, index in vocabulary.items():
+        words[index] = word
+    tokens_array = np.frombuffer(tokens, dtype=TOKENS_DTYPE)
+    return _EncodedRange(
+        words=words,
+        counts=_add_counts(
+            counts=counts, tokens=tokens_array[count_counted:], size=len(words)
+        ),
+        corpus=EncodedCorpus(
+            tokens=tokens_array.copy(), offsets=np.frombuffer(offsets, dtype=np.int64)
+        ),
+    )
+
+
+def _merge_ranges(
+    ranges: List[_EncodedRange], min_count: int, max_words: Optional[int] = None
+) -> PreprocessedCorpus:
+    """Merge encoded ranges, in file order, and prune rare words.
+
+    Count ties are broken by order of first appearance in the file, so the result
+    does not depend on how the file was split (unless local vocabularies were
+    reduced).
+    """
+    global_indexes: Dict[str, int] = {}
+    for encoded_range in ranges:
+        for word in encoded_range.words:
+            if word is not None:
+                global_indexes.setdefault(word, len(global_indexes))
+    # Removed local words are mapped to an extra index, dropped with rare words
+    removed_index = len(global_indexes)
+    local_to_global = [
+        np.array(
+            [
+                removed_index if word is None else global_indexes[word]
+                for word in encoded_range.words
+            ],
+            dtype=np.int64,
+        )
+        for encoded_range in ranges
+    ]
+
+    counts = np.zeros(removed_index + 1, dtype=np.int64)
+    for encoded_range, mapping in zip(ranges, local_to_global):
+        np.add.at(counts, mapping, encoded_range.counts)
+    counts = counts[:removed_index]
+
+    kept = select_vocabulary(counts=counts, min_count=min_count, max_words=max_words)
+    vocabulary = Vocabulary.from_counts(
+        words=[word for word, index in global_indexes.items() if kept[index]],
+        counts=counts[kept],
+    )
+    pruned_indexes = np.full(removed_index + 1, -1, dtype=TOKENS_DTYPE)
+    pruned_indexes[:removed_index][kept] = [
+        vocabulary[word] for word, index in global_indexes.items() if kept[index]
+    ]
+
+    tokens, offsets = [], [np.zeros(1, dtype=np.int64)]
+    count_tokens = 0
+    for encoded_range, mapping in zip(ranges, local_to_global):
+        range_tokens = pruned_indexes[mapping[encoded_range.corpus.tokens]]
+        kept_tokens = range_tokens >= 0
+        count_kept = np.concatenate([[0], np.cumsum(kept_tokens)])
+        tokens.append(range_tokens[kept_tokens])
+        offsets.append(count_tokens + count_kept[encoded_range.corpus.offsets[1:]])
+        count_tokens += int(count_kept[-1])
+
+    return PreprocessedCorpus(
+        vocabulary=vocabulary,
+        corpus=EncodedCorpus(
+            tokens=np.concatenate(tokens).astype(TOKENS_DTYPE, copy=False),
+            offsets=np.concatenate(offsets),
+        ),
+    )
+
+
+def _split_corpus(text_path: str, count_ranges: int) -> List[Tuple[str, int, Any]]:
+    """Split the files of a corpus in about `count_ranges` line-aligned ranges.
+
+    Returns:
+        path of the file, begin and end byte positions of each range.
+    """
+    files = resolve_text_paths(text_path=text_path)
+    ranges_per_file = -(-count_ranges // len(files))
+    return [
+        (file, begin, end)
+        for file in files
+        for begin, end in (
+            [(0, None)]
+            if is_compressed(path=file)
+            else get_line_aligned_ranges(file=file, count_ranges=ranges_per_file)
+        )
+    ]
+
+
+def preprocess_file_parallel(
+    text_path: str,
+    min_count: int,
+    workers: int,
+    max_vocab_size: Optional[int] = None,
+    max_words: Optional[int] = None,
+) -> PreprocessedCorpus:
+    """Tokenize, prune and encode text files with a pool of processes.
+
+    Files are split in line-aligned byte ranges (compressed files are kept whole),
+    each tokenized, counted and encoded by a process. Same result as
+    `preprocess_sentences_stream` over the lines of the files.
+
+    Args:
+        text_path: path of the training text (see `resolve_text_paths`).
+        min_count: words occurring at most `min_count` times are removed.
+        workers: number of processes.
+        max_vocab_size: if given, bound of the number of distinct words counted at
+            once by each process (see `count_words_bounded`).
+        max_words: if given, only the `max_words` most frequent words are kept.
+
+    Returns:
+        vocabulary, word counts and integer-encoded sentences.
+    """
+    tasks = [
+        (file, begin, end, max_vocab_size)
+        for file, begin, end in _split_corpus(
+            text_path=text_path, count_ranges=workers * RANGES_PER_WORKER
+        )
+    ]
+    if workers == 1:
+        ranges = [_preprocess_range(task) for task in tasks]
+    else:
+        with mp.Pool(processes=workers) as pool:
+            ranges = pool.map(_preprocess_range, tasks)
+    return _merge_ranges(ranges=ranges, min_count=min_count, max_words=max_words)
@@ -1,15 +1,116 @@
 """Parser to get input arguments."""
 from argparse import ArgumentParser
 
+from nlp_negative_sampling.models.skip_gram import MAX_PAIR_WEIGHT
+from nlp_negative_sampling.utils.input_handler import PAIRS_CHUNK_SIZE
+
 
 def get_command_line_parser() -> ArgumentParser:
     """Standard command line parser."""
     parser = ArgumentParser()
     parser.add_argument(
-        "--text_path", help="Path to the training data set.", required=True
+        "--text_path",
+        help="Path to the training data set: a file, a directory, a glob pattern or "
+        "a comma-separated list of them. Files can be gzip, xz or bz2 compressed.",
+        required=True,
     )
     parser.add_argument("--model_path", help="path to embedding.", required=True)
     parser.add_argument("--test", help="", action="store_true")
     parser.add_argument("--results_path", help="Path where to save results.")
+    parser.add_argument(
+        "--pairs_dir", help="Directory where to memory-map the training pairs."
+    )
+    parser.add_argument(
+        "--streaming",
+        help="Generate training pairs on the fly instead of materializing them.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--subsample_threshold",
+        help="Threshold of the subsampling of frequent words (e.g. 1e-4).",
+        type=float,
+    )
+    parser.add_argument(
+        "--dynamic_window",
+        help="Shrink the context window of each word to a random size.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--aggregate_pairs",
+        help="Train on distinct pairs weighted by their number of occurrences.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max_pair_weight",
+        help="Cap of the weights of aggregated pairs.",
+        type=int,
+        default=MAX_PAIR_WEIGHT,
+    )
+    parser.add_argument(
+        "--workers", help="Number of training processes.", type=int, default=1
+    )
+    parser.add_argument(
+        "--cache_dir", help="Directory where to cache the preprocessed corpus."
+    )
+    parser.add_argument(
+        "--preprocessing_workers",
+        help="Number of processes tokenizing the training data set.",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--max_vocab_size",
+        help="Maximum number of distinct words counted at once while preprocessing.",
+        type=int,
+    )
+    parser.add_argument(
+        "--max_words", help="Keep only the most frequent words.", type=int
+    )
+    parser.add_argument(
+        "--pairs_chunk_size",
+        help="Number of pairs read and scored at once when testing.",
+        type=int,
+        default=PAIRS_CHUNK_SIZE,
+    )
+    parser.add_argument("--seed", help="Seed of the training.", type=int)
+    parser.add_argument(
+        "--ann_clusters",
+        help="Build an approximate nearest neighbours index with this many clusters.",
+        type=int,
+    )
+    parser.add_argument(
+        "--checkpoint_path", help="File where to save the training state."
+    )
+    parser.add_argument(
+        "--checkpoint_every",
+        help="Number of batches between checkpoints, in addition to each epoch.",
+        type=int,
+    )
+    parser.add_argument(
+        "--resume_from",
+        help="Checkpoint from which to resume the training, with the same seed.",
+    )
+
+    return parser
+
+
+def get_server_parser() -> ArgumentParser:
+    """Command line parser of the similarity server."""
+    parser = ArgumentParser()
+    parser.add_argument("--model_path", help="path to embedding.", required=True)
+    parser.add_argument("--host", help="Address to listen on.", default="127.0.0.1")
+    parser.add_argument("--port", help="Port to listen on.", type=int, default=8765)
+    parser.add_argument(
+        "--max_batch_size",
+        help="Maximum number of queries answered together.",
+        type=int,
+        default=256,
+    )
+    parser.add_argument(
+        "--max_delay_ms",
+        help="Maximum time a query waits for others to be batched with it.",
+        type=float,
+        default=2.0,
+    )
 
     return parser
@@ -1,11 +1,25 @@
 """Utils for preparing test data."""
 from collections import Counter
 from itertools import chain
+import os
 import string
 import typing
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from nlp_negative_sampling.utils.func_tools import compose
+import numpy as np
+
+from nlp_negative_sampling.utils.input_handler import (
+    open_text_file,
+    prefetch,
+    resolve_text_paths,
+)
+
+READ_CHUNK_SIZE = 1 << 20
+
+_PUNCTUATION_REMOVER = str.maketrans("", "", string.punctuation)
+
+# Bump whenever `tokenize_file` changes its output, to invalidate cached corpora
+TOKENIZER_VERSION = 1
 
 
 def get_list_lower_words(sent: str) -> List[str]:
@@ -15,9 +29,8 @@ def get_list_lower_words(sent: str) -> List[str]:
 
 def remove_punctuation(sent: List[str]) -> List[str]:
     """Remove punctuation from list of strings."""
-    punctuation_remover = str.maketrans("", "", string.punctuation)
     return [
-        word.translate(punctuation_remover)
+        word.translate(_PUNCTUATION_REMOVER)
         for word in sent
         if word not in string.punctuation
     ]
@@ -28,13 +41,123 @@ def keep_alphabetical_words(sent: List[str]) -> List[str]:
     return [word for word in sent if word.isalpha()]
 
 
+def _iter_file_chunks(file: str, chunk_size: int) -> Iterator[str]:
+    """Yield the text of a file, possibly compressed, by chunks."""
+    with open_text_file(path=file) as text_file:
+        yield from iter(lambda: text_file.read(chunk_size), "")
+
+
+def iter_file_lines(file: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Yield the lines of a text file without newline, reading it by chunks.
+
+    Chunks are read, and decompressed for gzip, xz and bz2 files, by a background
+    thread while the previous ones are processed.
+    """
+    remainder = ""
+    for chunk in prefetch(_iter_file_chunks(file=file, chunk_size=chunk_size)):
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop()
+        yield from lines
+    if remainder:
+        yield remainder
+
+
+def iter_corpus_lines(
+    text_path: str, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield the lines of all the files of a corpus, one file after the other.
+
+    Args:
+        text_path: file, directory or glob pattern, or comma-separated list of them
+            (see `resolve_text_paths`).
+        chunk_size: number of characters read at once.
+    """
+    for file in resolve_text_paths(text_path=text_path):
+        yield from iter_file_lines(file=file, chunk_size=chunk_size)
+
+
+def get_line_aligned_ranges(file: str, count_ranges: int) -> List[Tuple[int, int]]:
+    """Split a file in byte ranges of similar sizes, each starting at a line start.
+
+    Args:
+        file: path of the text file.
+        count_ranges: maximum number of ranges, there are fewer ones when the file
+            has fewer lines.
+
+    Returns:
+        (begin, end) byte positions of each range, covering the whole file.
+    """
+    size = os.path.getsize(file)
+    bounds = [0]
+    with open(file, "rb") as binary_file:
+        for index in range(1, count_ranges):
+            # Move to the start of the line following the target position
+            binary_file.seek(max(size * index // count_ranges - 1, bounds[-1]))
+            binary_file.readline()
+            position = binary_file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_file_range_lines(file: str, begin: int, end: int) -> Iterator[str]:
+    """Yield the lines starting in a byte range of a text file, without newline.
+
+    Lines are split on universal newlines, as `iter_file_lines` does in text mode.
+    """
+    with open(file, "rb") as binary_file:
+        binary_file.seek(begin)
+        position = begin
+        while position < end:
+            line = binary_file.readline()
+            if not line:
+                break
+            position += len(line)
+            text = line.decode("utf8")
+            if text.endswith("\n"):
+                text = text[:-1]
+            if text.endswith("\r"):
+                text = text[:-1]
+            yield from text.split("\r")
+
+
+def tokenize_line(line: str) -> List[str]:
+    """Return the lower alphabetical words of a line, without punctuation.
+
+    Single-pass equivalent of `get_list_lower_words`, `remove_punctuation` and
+    `keep_alphabetical_words` composed: deleting punctuation before splitting
+    leaves whitespace untouched, and words made only of punctuation become empty,
+    hence not alphabetical.
+    """
+    return [
+        word
+        for word in line.lower().translate(_PUNCTUATION_REMOVER).split()
+        if word.isalpha()
+    ]
+
+
+def iter_tokenized_file(
+    file: str, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[List[str]]:
+    """Yield the list of words of each line of a corpus, one line at a time.
+
+    `file` can also be a directory, a glob pattern or a list of files, possibly
+    compressed (see `iter_corpus_lines`).
+    """
+    for line in iter_corpus_lines(text_path=file, chunk_size=chunk_size):
+        yield tokenize_line(line)
+
+
+def iter_tokenized_file_range(file: str, begin: int, end: int) -> Iterator[List[str]]:
+    """Yield the list of words of each line starting in a byte range of a file."""
+    for line in iter_file_range_lines(file=file, begin=begin, end=end):
+        yield tokenize_line(line)
+
+
 def tokenize_file(file: str) -> List[List[str]]:
     """Transform text to list of lists of words."""
-    sentences = [line.rstrip("\n") for line in open(file, encoding="utf8")]
-    pipeline = compose(
-        keep_alphabetical_words, remove_punctuation, get_list_lower_words,
-    )  # type: ignore
-    return [pipeline(sent) for sent in sentences]
+    return list(iter_tokenized_file(file=file))
 
 
 def flatten_list(list_of_lists: List[List[str]]) -> List[str]:
@@ -42,11 +165,49 @@ def flatten_list(list_of_lists: List[List[str]]) -> List[str]:
     return [word for _list in list_of_lists for word in _list]
 
 
-def count_words(words: List[List[str]]) -> typing.Counter[str]:
+def count_words(words: Iterable[List[str]]) -> typing.Counter[str]:
     """Return a dictionary with words frequencies."""
     return Counter(chain.from_iterable(words))
 
 
+def reduce_vocabulary(
+    count_tokens: typing.Counter[str], min_reduce: int
+) -> typing.Counter[str]:
+    """Remove the words occurring at most `min_reduce` times, keeping word order."""
+    return Counter(
+        {word: count for word, count in count_tokens.items() if count > min_reduce}
+    )
+
+
+def count_words_bounded(
+    words: Iterable[List[str]], max_vocab_size: int
+) -> typing.Counter[str]:
+    """Count words with at most about `max_vocab_size` distinct ones in memory.
+
+    As word2vec's ReduceVocab: whenever there are more than `max_vocab_size` words,
+    those counted at most `min_reduce` times so far are removed, `min_reduce`
+    starting at 1 and increasing after each reduction. Counts of words removed then
+    seen again are underestimated, so rare words may be missed.
+
+    Args:
+        words: tokenized sentences.
+        max_vocab_size: number of distinct words triggering a reduction.
+
+    Returns:
+        counts of the words left, in order of (last) first appearance.
+    """
+    count_tokens: typing.Counter[str] = Counter()
+    min_reduce = 1
+    for sentence in words:
+        count_tokens.update(sentence)
+        if len(count_tokens) > max_vocab_size:
+            count_tokens = reduce_vocabulary(
+                count_tokens=count_tokens, min_reduce=min_reduce
+            )
+            min_reduce += 1
+    return count_tokens
+
+
 def rare_word_pruning(list_tokens: List[List[str]], min_count: int) -> List[List[str]]:
     """Remove words that occur less than min_count time in file."""
     count_tokens = count_words(words=list_tokens)
@@ -54,3 +215,52 @@ def rare_word_pruning(list_tokens: List[List[str]], min_count: int) -> List[List
         [word for word in sent if count_tokens[word] > min_count]
         for sent in list_tokens
     ]
+
+
+def get_keep_probabilities(counts: np.ndarray, threshold: float) -> np.ndarray:
+    """Probability of keeping each word when subsampling frequent words.
+
+    Mikolov's formula, as in word2vec: a word of frequency f is kept with probability
+    (sqrt(f / threshold) + 1) * threshold / f, capped at 1.
+
+    Args:
+        counts: number of occurrences of each word.
+        threshold: subsampling threshold `t`, words more frequent than it are
+            subsampled (typically between 1e-5 and 1e-3).
+
+    Returns:
+        Probability of keeping each word.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    frequencies = counts / counts.sum()
+    with np.errstate(divide="ignore"):
+        keep_probabilities: np.ndarray = (
+            (np.sqrt(frequencies / threshold) + 1) * threshold / frequencies
+        )
+    np.minimum(keep_probabilities, 1.0, out=keep_probabilities)
+    return keep_probabilities
+
+
+def subsample_frequent_words(
+    list_tokens: List[List[str]],
+    threshold: float,
+    rng: Optional[np.random.Generator] = None,
+) -> List[List[str]]:
+    """Randomly remove occurrences of frequent words (Mikolov's subsampling)."""
+    rng = rng or np.random.default_rng()
+    count_tokens = count_words(words=list_tokens)
+    words = list(count_tokens)
+    keep_probabilities = dict(
+        zip(
+            words,
+            get_keep_probabilities(
+                counts=np.array([count_tokens[word] for word in words]),
+                threshold=threshold,
+            ),
+        )
+    )
+    draws = iter(rng.random(sum(count_tokens.values())))
+    return [
+        [word for word in sent if next(draws) < keep_probabilities[word]]
+        for sent in list_tokens
+    ]
@@ -0,0 +1,60 @@
+"""Vocabulary of a corpus."""
+from typing import Iterator, Mapping, Sequence
+
+import numpy as np
+
+
+class Vocabulary(Mapping[str, int]):
+    """Words indexed by descending frequency.
+
+    Frequent words get the first indexes, so their rows are adjacent in the embedding
+    matrices. As a mapping from words to indexes, a vocabulary can be used wherever
+    a `words_voc` dictionary was.
+
+    Attributes:
+        words: word of each index, as an array of `str` objects.
+        counts: number of occurrences of each word in the corpus, by index.
+    """
+
+    def __init__(self, words: Sequence[str], counts: np.ndarray) -> None:
+        """Instantiate a vocabulary from words already sorted by descending counts.
+
+        Use `from_counts` to sort them.
+        """
+        self.words = np.empty(len(words), dtype=object)
+        self.words[:] = list(words)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._indexes = {word: index for index, word in enumerate(self.words)}
+
+    @classmethod
+    def from_counts(cls, words: Sequence[str], counts: np.ndarray) -> "Vocabulary":
+        """Sort words by descending counts, ties keeping their order in `words`."""
+        counts = np.asarray(counts, dtype=np.int64)
+        order = np.argsort(-counts, kind="stable")
+        return cls(words=[words[index] for index in order], counts=counts[order])
+
+    @classmethod
+    def from_mapping(cls, words_voc: Mapping[str, int]) -> "Vocabulary":
+        """Convert a dictionary of word indexes, whose counts are unknown (zero)."""
+        words = sorted(words_voc, key=words_voc.__getitem__)
+        return cls(words=words, counts=np.zeros(len(words), dtype=np.int64))
+
+    def __getitem__(self, word: str) -> int:
+        """Index of a word."""
+        return self._indexes[word]
+
+    def __contains__(self, word: object) -> bool:
+        """Whether a word is in the vocabulary."""
+        return word in self._indexes
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the words by index."""
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        """Number of words."""
+        return len(self.words)
+
+    def __reduce__(self):
+        """Pickle the words and counts only, the index is rebuilt when loading."""
+        return self.__class__, (list(self.words), self.counts)
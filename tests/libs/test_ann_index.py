@@ -0,0 +1,73 @@
+"""Tests for the approximate nearest neighbours index."""
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.libs.ann_index import IVFIndex
+from nlp_negative_sampling.libs.similarity import SimilarityIndex, normalize_vectors
+
+
+@pytest.fixture(name="normalized_matrix", scope="module")
+def normalized_matrix_fixture():
+    """Normalized embeddings of 300 words, around 10 directions."""
+    rng = np.random.default_rng(0)
+    directions = rng.normal(size=(10, 8))
+    return normalize_vectors(
+        directions[rng.integers(10, size=300)] + 0.3 * rng.normal(size=(300, 8))
+    )
+
+
+def test_build(normalized_matrix):
+    """Should assign every word to exactly one cluster."""
+    index = IVFIndex.build(normalized_matrix=normalized_matrix, seed=0)
+
+    assert index.centroids.shape == (17, 8)
+    assert np.allclose(np.linalg.norm(index.centroids, axis=1), 1)
+    assert sorted(index.lists) == list(range(300))
+    assert index.offsets[0] == 0 and index.offsets[-1] == 300
+    assert (np.diff(index.offsets) >= 0).all()
+
+
+def test_search(normalized_matrix):
+    """Should find the exact neighbours when probing every cluster, most otherwise."""
+    index = IVFIndex.build(normalized_matrix=normalized_matrix, count_clusters=10)
+    exact_index = SimilarityIndex(
+        words_voc={f"w{i}": i for i in range(300)}, embed_matrix=normalized_matrix
+    )
+    vectors = normalized_matrix[:20]
+    exact_indexes, exact_scores = exact_index.batch_top_k(vectors=vectors, k=5)
+
+    indexes, scores = index.search(vectors=vectors, k=5, n_probe=10)
+    assert np.allclose(scores, exact_scores)
+    assert (indexes == exact_indexes).mean() > 0.95
+
+    indexes, _ = index.search(vectors=vectors, k=5, n_probe=2)
+    recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(indexes, exact_indexes)])
+    assert recall > 0.8
+
+
+def test_search_few_candidates():
+    """Should pad the results when the probed clusters are too small."""
+    index = IVFIndex.build(
+        normalized_matrix=np.eye(3), count_clusters=3, iterations=1, seed=0
+    )
+
+    indexes, scores = index.search(vectors=np.eye(3)[:1], k=2, n_probe=1)
+
+    assert indexes.tolist() == [[0, -1]]
+    assert scores.tolist() == [[1, -np.inf]]
+
+
+def test_save_and_load(normalized_matrix, tmp_path):
+    """Should read the index saved next to a model, for the same vocabulary only."""
+    index = IVFIndex.build(normalized_matrix=normalized_matrix, seed=0)
+    index.save(model_path=f"{tmp_path}/")
+
+    loaded = IVFIndex.load(
+        model_path=f"{tmp_path}/", normalized_matrix=normalized_matrix
+    )
+
+    assert np.array_equal(loaded.centroids, index.centroids)
+    assert np.array_equal(loaded.lists, index.lists)
+    assert np.array_equal(loaded.offsets, index.offsets)
+    with pytest.raises(ValueError):
+        IVFIndex.load(model_path=f"{tmp_path}/", normalized_matrix=np.eye(3))
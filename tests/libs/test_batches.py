@@ -0,0 +1,106 @@
+"""Tests for the generators of training batches."""
+import numpy as np
+
+from nlp_negative_sampling.libs.batches import (
+    iter_corpus_batches,
+    iter_pairs_batches,
+    iter_weighted_pairs_batches,
+)
+from nlp_negative_sampling.libs.negative_sampler import NegativeSampler
+from nlp_negative_sampling.libs.pos_and_neg_pairs import get_corpus_positive_pairs
+from nlp_negative_sampling.utils.corpus import build_vocabulary, encode_corpus
+
+SENTENCES = [
+    ["the", "cat", "cat", "red"],
+    ["the", "red", "cat", "cat", "is", "a", "cat"],
+    ["a"],
+    ["the", "red"],
+    ["a", "red", "cat", "is", "the", "cat"],
+]
+
+
+def test_iter_pairs_batches():
+    """Should slice complete batches and draw negative_rate negatives per pair."""
+    positive_pairs = np.arange(22).reshape(11, 2)
+    sampler = NegativeSampler(counts=np.ones(30), random_state=0)
+
+    answer = list(
+        iter_pairs_batches(
+            positive_pairs=positive_pairs,
+            batch_size=5,
+            sampler=sampler,
+            negative_rate=2,
+        )
+    )
+
+    assert len(answer) == 2
+    assert np.array_equal(answer[1][0], positive_pairs[5:10])
+    assert answer[1][1].shape == (10, 2)
+    assert answer[1][1][:, 0].tolist() == np.repeat(positive_pairs[5:10, 0], 2).tolist()
+
+
+def test_iter_weighted_pairs_batches():
+    """Should yield the weights of the positive pairs of each batch."""
+    positive_pairs = np.arange(22).reshape(11, 2)
+    sampler = NegativeSampler(counts=np.ones(30), random_state=0)
+
+    answer = list(
+        iter_weighted_pairs_batches(
+            positive_pairs=positive_pairs,
+            pair_weights=np.arange(11) + 1,
+            batch_size=5,
+            sampler=sampler,
+            negative_rate=2,
+        )
+    )
+
+    assert len(answer) == 2
+    assert np.array_equal(answer[1][0], positive_pairs[5:10])
+    assert answer[1][1].shape == (10, 2)
+    assert answer[1][2].tolist() == [6, 7, 8, 9, 10]
+
+
+def test_iter_corpus_batches():
+    """Should stream the positive pairs of the corpus by complete batches."""
+    corpus = encode_corpus(
+        sentences=SENTENCES, vocabulary=build_vocabulary(sentences=SENTENCES)
+    )
+    sampler = NegativeSampler(counts=np.ones(5), random_state=0)
+    expected = get_corpus_positive_pairs(corpus=corpus, window_size=3)
+
+    answer = list(
+        iter_corpus_batches(
+            corpus=corpus, window_size=3, batch_size=4, sampler=sampler, negative_rate=3
+        )
+    )
+
+    assert len(answer) == len(expected) // 4
+    assert all(len(positive) == 4 for positive, _ in answer)
+    assert all(negative.shape == (12, 2) for _, negative in answer)
+    assert np.array_equal(
+        np.concatenate([positive for positive, _ in answer]),
+        expected[: len(answer) * 4],
+    )
+
+
+def test_iter_corpus_batches_subsampling():
+    """Should generate pairs of the kept words only."""
+    vocabulary = build_vocabulary(sentences=SENTENCES)
+    corpus = encode_corpus(sentences=SENTENCES, vocabulary=vocabulary)
+    keep_probabilities = np.ones(len(vocabulary))
+    keep_probabilities[vocabulary["cat"]] = 0
+
+    answer = list(
+        iter_corpus_batches(
+            corpus=corpus,
+            window_size=3,
+            batch_size=2,
+            sampler=NegativeSampler(counts=np.ones(5), random_state=0),
+            negative_rate=1,
+            keep_probabilities=keep_probabilities,
+        )
+    )
+
+    positive_pairs = np.concatenate([positive for positive, _ in answer])
+    assert len(answer) > 0
+    assert vocabulary["cat"] not in positive_pairs
@@ -5,7 +5,10 @@ import pytest
 from nlp_negative_sampling.libs.gradient import (
     _update_neg_gradient,
     _update_pos_grad,
+    apply_sparse_gradient,
+    compute_batch_gradient,
     compute_gradient,
+    compute_sparse_gradient,
 )
 from nlp_negative_sampling.libs.pos_and_neg_pairs import (
     get_negative_pairs,
@@ -287,3 +290,94 @@ def test_compute_gradient(logger):
             ]
         ),
     )
+
+
+def test_compute_batch_gradient(logger, words_matrix_mock, contexts_matrix_mock):
+    """Should return the same gradient as the per-pair implementation."""
+    positive_pairs, words_voc, context_voc = get_positive_pairs(
+        [["the", "cat", "cat", "red"], ["the", "red", "cat", "cat"], ["the", "red"]], 2
+    )
+    negative_pairs = get_negative_pairs(
+        positive_pairs=positive_pairs, negative_rate=NEGATIVE_RATE
+    )
+    theta = np.concatenate([words_matrix_mock.ravel(), contexts_matrix_mock.ravel()])
+    kwargs = dict(
+        logger=logger,
+        theta=theta,
+        embedding_dim=EMBEDDING_DIMENSION,
+        count_words=len(words_voc),
+        count_contexts=len(context_voc),
+    )
+
+    answer = compute_batch_gradient(
+        positive_pairs=np.array(positive_pairs),
+        negative_pairs=np.array(negative_pairs),
+        **kwargs,
+    )
+
+    expected = compute_gradient(
+        positive_pairs=positive_pairs, negative_pairs=negative_pairs, **kwargs
+    )
+    assert answer.shape == theta.shape
+    assert np.allclose(answer, expected, rtol=1e-12, atol=0)
+
+
+def test_sparse_gradient_matches_dense(logger, words_matrix_mock, contexts_matrix_mock):
+    """Should update the touched rows exactly as the dense gradient does."""
+    positive_pairs = np.array([[0, 1], [0, 1], [2, 0]])
+    negative_pairs = np.array([[0, 2], [0, 0], [2, 2], [2, 1], [0, 1], [2, 1]])
+    theta = np.concatenate([words_matrix_mock.ravel(), contexts_matrix_mock.ravel()])
+    expected = theta + 0.1 * compute_batch_gradient(
+        logger=logger,
+        theta=theta,
+        embedding_dim=EMBEDDING_DIMENSION,
+        positive_pairs=positive_pairs,
+        negative_pairs=negative_pairs,
+        count_words=3,
+        count_contexts=3,
+    )
+
+    words_matrix = words_matrix_mock.copy()
+    contexts_matrix = contexts_matrix_mock.copy()
+    gradient = compute_sparse_gradient(
+        words_matrix=words_matrix,
+        contexts_matrix=contexts_matrix,
+        positive_pairs=positive_pairs,
+        negative_pairs=negative_pairs,
+    )
+    apply_sparse_gradient(
+        words_matrix=words_matrix,
+        contexts_matrix=contexts_matrix,
+        gradient=gradient,
+        learning_rate=0.1,
+    )
+
+    assert gradient.word_rows.tolist() == [0, 2]
+    assert gradient.context_rows.tolist() == [0, 1, 2]
+    assert np.allclose(
+        np.concatenate([words_matrix.ravel(), contexts_matrix.ravel()]),
+        expected,
+        rtol=1e-12,
+        atol=0,
+    )
+
+
+def test_sparse_gradient_weights(words_matrix_mock, contexts_matrix_mock):
+    """Should count each weighted pair as many times as its weight."""
+    kwargs = dict(words_matrix=words_matrix_mock, contexts_matrix=contexts_matrix_mock)
+    expected = compute_sparse_gradient(
+        positive_pairs=np.array([[0, 1], [0, 1], [0, 1], [2, 0]]),
+        negative_pairs=np.array([[0, 2], [0, 2], [0, 2], [2, 1]]),
+        **kwargs,
+    )
+
+    answer = compute_sparse_gradient(
+        positive_pairs=np.array([[0, 1], [2, 0]]),
+        negative_pairs=np.array([[0, 2], [2, 1]]),
+        positive_weights=np.array([3, 1]),
+        negative_weights=np.array([3, 1]),
+        **kwargs,
+    )
+
+    for field in answer._fields:
+        assert np.allclose(getattr(answer, field), getattr(expected, field))
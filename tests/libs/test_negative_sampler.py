@@ -0,0 +1,52 @@
+"""Tests for the negative sampler."""
+import numpy as np
+
+from nlp_negative_sampling.libs.negative_sampler import (
+    NegativeSampler,
+    _build_alias_table,
+)
+
+
+def test_build_alias_table():
+    """Should give each index its probability mass."""
+    probabilities = np.array([0.5, 0.1, 0.3, 0.1])
+    keep_probabilities, aliases = _build_alias_table(probabilities=probabilities)
+
+    # Mass of index i: kept with its own column + received as alias of other columns
+    mass = keep_probabilities.copy()
+    np.add.at(mass, aliases, 1 - keep_probabilities)
+    assert np.allclose(mass / len(probabilities), probabilities)
+
+
+def test_negative_sampler_distribution():
+    """Should draw contexts following the unigram distribution to the power 3/4."""
+    counts = np.array([100, 10, 1, 0, 50])
+    sampler = NegativeSampler(counts=counts, random_state=0)
+
+    answer = sampler.sample(size=200000)
+
+    expected = counts ** 0.75 / (counts ** 0.75).sum()
+    assert answer.dtype == np.int32
+    assert np.allclose(np.bincount(answer, minlength=5) / 200000, expected, atol=5e-3)
+    assert not (answer == 3).any()
+
+
+def test_negative_sampler_sample_pairs():
+    """Should draw negative_rate contexts for each target word."""
+    sampler = NegativeSampler(counts=np.array([3, 1, 2]), random_state=0)
+
+    answer = sampler.sample_pairs(word_indexes=np.array([2, 0]), negative_rate=3)
+
+    assert answer.shape == (6, 2)
+    assert answer[:, 0].tolist() == [2, 2, 2, 0, 0, 0]
+    assert set(answer[:, 1]) <= {0, 1, 2}
+
+
+def test_negative_sampler_reseed():
+    """Should draw the same contexts with the same seed."""
+    sampler = NegativeSampler(counts=np.array([3, 1, 2]), random_state=1)
+    first = sampler.sample(size=10)
+
+    sampler.reseed(random_state=1)
+
+    assert np.array_equal(sampler.sample(size=10), first)
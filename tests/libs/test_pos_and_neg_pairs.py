@@ -1,18 +1,28 @@
 """Tests for generating negative and positive pairs."""
 from unittest import mock
 
+import numpy as np
+
 from nlp_negative_sampling.libs.pos_and_neg_pairs import (
+    aggregate_pairs,
+    count_corpus_positive_pairs,
+    get_corpus_positive_pairs,
     get_negative_pairs,
     get_positive_pairs,
+    load_pairs_memmap,
+    save_pairs,
 )
+from nlp_negative_sampling.utils.corpus import build_vocabulary, encode_corpus
 
 
 def test_get_positive_pairs():
     """Should return positive pairs to the given word."""
-    answer = get_positive_pairs(
+    positive_pairs, words_voc, context_voc = get_positive_pairs(
         [["the", "cat", "cat", "red"], ["the", "red", "cat", "cat"], ["the", "red"]], 2
     )
-    assert answer == (
+    assert positive_pairs.dtype == np.int32
+    assert np.array_equal(
+        positive_pairs,
         [
             (0, 0),
             (1, 1),
@@ -29,12 +39,92 @@ def test_get_positive_pairs():
             (0, 2),
             (2, 1),
         ],
-        {"the": 0, "cat": 1, "red": 2},
-        {"cat": 0, "the": 1, "red": 2},
     )
+    assert words_voc == {"the": 0, "cat": 1, "red": 2}
+    assert context_voc == {"cat": 0, "the": 1, "red": 2}
+
+
+def test_get_positive_pairs_dynamic_window():
+    """Should keep, for each target, the contexts of a window of random size."""
+    sentences = [[str(position) for position in range(30)], ["a", "b", "c"]]
+    all_pairs, words_voc, _ = get_positive_pairs(sentences, 7)
+
+    answer, dynamic_words_voc, context_voc = get_positive_pairs(
+        sentences, 7, dynamic_window=True, rng=np.random.default_rng(0)
+    )
+
+    assert dynamic_words_voc == words_voc
+    assert len(answer) < len(all_pairs)
+    contexts_positions = {index: word for word, index in context_voc.items()}
+    for target in range(30):
+        contexts = [
+            int(contexts_positions[context])
+            for word, context in answer.tolist()
+            if word == target
+        ]
+        window = max(abs(context - target) for context in contexts)
+        assert 1 <= window <= 3
+        assert contexts == [
+            position
+            for position in range(target - window, target + window + 1)
+            if position != target and 0 <= position < 30
+        ]
+
+
+def test_get_corpus_positive_pairs():
+    """Should return the pairs of get_positive_pairs, with the corpus vocabulary."""
+    sentences = [
+        ["the", "cat", "cat", "red"],
+        ["a"],
+        ["the", "red", "cat", "cat", "is", "a", "cat"],
+        ["the", "red"],
+    ]
+    expected_pairs, words_voc, context_voc = get_positive_pairs(sentences, 5)
+    words = {index: word for word, index in words_voc.items()}
+    contexts = {index: word for word, index in context_voc.items()}
+    vocabulary = build_vocabulary(sentences=sentences)
+
+    answer = get_corpus_positive_pairs(
+        corpus=encode_corpus(sentences=sentences, vocabulary=vocabulary), window_size=5
+    )
+
+    assert answer.dtype == np.int32
+    assert answer.tolist() == [
+        [vocabulary[words[word]], vocabulary[contexts[context]]]
+        for word, context in expected_pairs
+    ]
+
 
+def test_get_corpus_positive_pairs_dynamic_window():
+    """Should return a subset of the pairs of the full window."""
+    corpus = encode_corpus(
+        sentences=[[str(position) for position in range(50)]],
+        vocabulary={str(position): position for position in range(50)},
+    )
+    all_pairs = get_corpus_positive_pairs(corpus=corpus, window_size=7)
 
-@mock.patch("numpy.random.randint", lambda x: 5)
+    answer = get_corpus_positive_pairs(
+        corpus=corpus, window_size=7, dynamic_window=True, rng=np.random.default_rng(0),
+    )
+
+    assert 0 < len(answer) < len(all_pairs)
+    assert set(map(tuple, answer.tolist())) <= set(map(tuple, all_pairs.tolist()))
+
+
+def test_count_corpus_positive_pairs():
+    """Should count the pairs generated by get_corpus_positive_pairs."""
+    corpus = encode_corpus(
+        sentences=[["a"] * length for length in [0, 1, 2, 3, 4, 7, 12]],
+        vocabulary={"a": 0},
+    )
+
+    for window_size in [2, 3, 5, 7]:
+        assert count_corpus_positive_pairs(
+            corpus=corpus, window_size=window_size
+        ) == len(get_corpus_positive_pairs(corpus=corpus, window_size=window_size))
+
+
+@mock.patch("numpy.random.randint", lambda x, size: np.full(size, 5))
 def test_get_negative_pairs():
     """Should return negatives pairs."""
     answer = get_negative_pairs(
@@ -56,33 +146,59 @@ def test_get_negative_pairs():
         ],
         2,
     )
-    assert answer == [
-        (0, 0),
-        (0, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (2, 0),
-        (2, 0),
-        (0, 0),
-        (0, 0),
-        (2, 0),
-        (2, 0),
-        (2, 0),
-        (2, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (1, 0),
-        (0, 0),
-        (0, 0),
-        (2, 0),
-        (2, 0),
+    assert answer.dtype == np.int32
+    assert answer.tolist() == [
+        [0, 0],
+        [0, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [2, 0],
+        [2, 0],
+        [0, 0],
+        [0, 0],
+        [2, 0],
+        [2, 0],
+        [2, 0],
+        [2, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [0, 0],
+        [0, 0],
+        [2, 0],
+        [2, 0],
     ]
+
+
+def test_save_and_load_pairs_memmap(tmp_path):
+    """Should reopen saved pairs with memory mapping."""
+    pairs = np.array([[0, 1], [2, 3], [4, 5]])
+
+    save_pairs(pairs=pairs, path=str(tmp_path / "pairs.npy"))
+    answer = load_pairs_memmap(path=str(tmp_path / "pairs.npy"))
+
+    assert isinstance(answer, np.memmap)
+    assert answer.dtype == np.int32
+    assert answer.tolist() == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_aggregate_pairs():
+    """Should return the distinct pairs, sorted, and their number of occurrences."""
+    answer, counts = aggregate_pairs(
+        positive_pairs=np.array([[2, 0], [0, 1], [2, 0], [0, 1], [0, 0], [2, 0]]),
+        count_words=3,
+        count_contexts=2,
+    )
+
+    assert answer.dtype == np.int32
+    assert answer.tolist() == [[0, 0], [0, 1], [2, 0]]
+    assert counts.tolist() == [1, 2, 3]
@@ -1,13 +1,23 @@
 """Tests for similarity functions."""
+import logging
+import tracemalloc
+
 import numpy as np
 from numpy.testing import assert_approx_equal
+import pytest
 
 from nlp_negative_sampling.libs.similarity import (
+    SimilarityCache,
+    SimilarityIndex,
     _cosine_similarity,
     _get_word_embedding,
     find_k_most_similar,
+    find_k_most_similar_batch,
+    normalize_vectors,
+    pairs_similarity,
     words_similarity,
 )
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
 
 
 def test_get_word_embedding_existing(logger):
@@ -87,14 +97,291 @@ def test_find_k_most_similar(logger):
         ),
     )
 
+    # Scores of the normalized embeddings, equal up to rounding
     assert answer == (
         ["green", "white"],
-        {
-            "black": 0.33398431659742517,
-            "yellow": 0.49171597833790753,
-            "red": 1.0,
-            "white": 0.4994862678676181,
-            "blue": 0.4098091029624984,
-            "green": 0.5677188782302137,
-        },
+        pytest.approx(
+            {
+                "black": 0.33398431659742517,
+                "yellow": 0.49171597833790753,
+                "red": 1.0,
+                "white": 0.4994862678676181,
+                "blue": 0.4098091029624984,
+                "green": 0.5677188782302137,
+            }
+        ),
+    )
+
+
+def test_find_k_most_similar_vocabulary(logger):
+    """Should rank the words of a vocabulary like the pairwise similarities."""
+    embed_matrix = np.random.default_rng(0).normal(size=(50, 5))
+    vocabulary = Vocabulary(words=[f"w{i}" for i in range(50)], counts=np.ones(50))
+
+    ranked, similarity_dict = find_k_most_similar(
+        logger=logger,
+        word_target="w3",
+        k=5,
+        words_voc=vocabulary,
+        embed_matrix=embed_matrix,
+    )
+
+    expected = sorted(
+        vocabulary,
+        key=lambda word: _cosine_similarity(
+            vect_1=embed_matrix[3], vect_2=embed_matrix[vocabulary[word]]
+        ),
+        reverse=True,
+    )
+    assert ranked == expected[1:6]
+    assert list(similarity_dict) == list(vocabulary)
+
+
+def test_find_k_most_similar_index(logger):
+    """Should rank the words with the index given, as without it."""
+    embed_matrix = np.random.default_rng(0).normal(size=(10, 3))
+    vocabulary = Vocabulary(words=[f"w{i}" for i in range(10)], counts=np.ones(10))
+    index = SimilarityIndex(words_voc=vocabulary, embed_matrix=embed_matrix)
+
+    for word in ["w0", "w1"]:
+        ranked, similarity_dict = find_k_most_similar(
+            logger=logger,
+            word_target=word,
+            k=3,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+        )
+        indexed_ranked, indexed_similarity_dict = find_k_most_similar(
+            logger=logger,
+            word_target=word,
+            k=3,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+            index=index,
+        )
+        assert indexed_ranked == ranked
+        assert dict(indexed_similarity_dict) == pytest.approx(dict(similarity_dict))
+
+
+def test_similarity_index_top_k(logger):
+    """Should rank words by decreasing score, ties by index."""
+    index = SimilarityIndex(
+        words_voc={"b": 1, "a": 0, "c": 2, "d": 3},
+        embed_matrix=np.array([[1, 0], [0, 2], [-3, 0], [0, 0]]),
+    )
+
+    assert index.words.tolist() == ["a", "b", "c", "d"]
+    ranked, scores = index.top_k(
+        vector=index.query_vector(logger=logger, word="c"), k=2
+    )
+    assert ranked.tolist() == [0, 2]
+    assert scores.tolist() == [1, 1]
+    ranked, scores = index.top_k(
+        vector=index.query_vector(logger=logger, word="b"), k=10
+    )
+    assert ranked.tolist() == [1, 0, 2, 3]
+    assert scores.tolist() == [1, 0, 0, 0]
+
+
+def test_similarity_index_oov(logger):
+    """Should score unknown words with the common OOV vector."""
+    index = SimilarityIndex(
+        words_voc={"a": 0, "b": 1}, embed_matrix=np.array([[1, 1], [1, 0]])
+    )
+
+    vector = index.query_vector(logger=logger, word="z")
+
+    assert np.allclose(index.scores(vector=vector), [1, np.sqrt(0.5)])
+    logger.info.assert_called_once_with("Out of Vocabulary: %s", "z")
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_find_k_most_similar_batch(logger, workers):
+    """Should rank the words for each query like one query at a time."""
+    embed_matrix = np.random.default_rng(0).normal(size=(40, 5))
+    vocabulary = Vocabulary(words=[f"w{i}" for i in range(40)], counts=np.ones(40))
+    queries = ["w3", "w0", "unknown", "w39", "w3"]
+
+    indexes, scores = find_k_most_similar_batch(
+        logger=logger,
+        queries=queries,
+        k=4,
+        words_voc=vocabulary,
+        embed_matrix=embed_matrix,
+        memory_budget=2 * 40 * 16 * workers,
+        workers=workers,
+    )
+
+    assert indexes.shape == scores.shape == (5, 4)
+    for query, query_indexes, query_scores in zip(queries, indexes, scores):
+        ranked, similarity_dict = find_k_most_similar(
+            logger=logger,
+            word_target=query,
+            k=4 if query in vocabulary else 3,
+            words_voc=vocabulary,
+            embed_matrix=embed_matrix,
+        )
+        if query not in vocabulary:
+            ranked.insert(0, vocabulary.words[query_indexes[0]])
+        assert vocabulary.words[query_indexes].tolist() == ranked
+        assert query_scores == pytest.approx([similarity_dict[w] for w in ranked])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_similarity_index_batch_top_k_memory(workers):
+    """Should keep the working arrays of the chunks within the memory budget."""
+    rng = np.random.default_rng(0)
+    embed_matrix = rng.normal(size=(2000, 5))
+    index = SimilarityIndex(
+        words_voc={f"w{i}": i for i in range(2000)}, embed_matrix=embed_matrix
+    )
+    vectors = normalize_vectors(rng.normal(size=(100, 5)))
+    memory_budget = 10 * 2000 * 16
+
+    tracemalloc.start()
+    try:
+        index.batch_top_k(
+            vectors=vectors, k=3, memory_budget=memory_budget, workers=workers
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Small arrays (results, top k candidates) are out of the budget
+    assert peak < memory_budget * 1.5
+
+
+def test_find_k_most_similar_batch_vectors(logger):
+    """Should rank the words for query vectors, all of them at most."""
+    indexes, scores = find_k_most_similar_batch(
+        logger=logger,
+        queries=np.array([[1.0, 0.1], [0.0, 3.0]]),
+        k=5,
+        words_voc={"a": 0, "b": 1, "c": 2},
+        embed_matrix=np.array([[1, 0], [0, 1], [1, 1]]),
+    )
+
+    assert indexes.tolist() == [[0, 2, 1], [1, 2, 0]]
+    assert scores[:, 0] == pytest.approx([1 / np.sqrt(1.01), 1])
+
+
+def test_similarity_cache_pairs(logger):
+    """Should cache pair scores whatever the order of the words."""
+    words_voc = {"a": 0, "b": 1, "c": 2}
+    embed_matrix = np.array([[1, 0], [1, 1], [0, 1]])
+    cache = SimilarityCache(max_size=2)
+
+    for word_1, word_2 in [("a", "b"), ("b", "a"), ("a", "c"), ("b", "c"), ("a", "b")]:
+        answer = cache.words_similarity(
+            logger=logger,
+            word_1=word_1,
+            word_2=word_2,
+            words_voc=words_voc,
+            embed_matrix=embed_matrix,
+        )
+        assert answer == pytest.approx(
+            words_similarity(
+                logger=logger,
+                word_1=word_1,
+                word_2=word_2,
+                words_voc=words_voc,
+                embed_matrix=embed_matrix,
+            )
+        )
+
+    # ("a", "b") was the least recently used entry when ("b", "c") was cached
+    assert (cache.hits, cache.misses, len(cache)) == (1, 4, 2)
+
+
+def test_similarity_cache_oov(caplog):
+    """Should score unknown words with the OOV vector, logging them at INFO level."""
+    caplog.set_level(logging.INFO)
+    cache = SimilarityCache()
+
+    answer = cache.words_similarity(
+        logger=logging.getLogger(__name__),
+        word_1="a",
+        word_2="zzz",
+        words_voc={"a": 0},
+        embed_matrix=np.ones((1, 3)),
+    )
+
+    assert answer == pytest.approx(1)
+    assert "Out of Vocabulary: zzz" in caplog.messages
+
+
+def test_similarity_cache_top_k(logger):
+    """Should cache the top k words, and empty itself for another model."""
+    words_voc = {"a": 0, "b": 1, "c": 2}
+    embed_matrix = np.array([[1, 0], [1, 1], [0, 1]])
+    cache = SimilarityCache()
+
+    for _ in range(2):
+        words, scores = cache.top_k_words(
+            logger=logger,
+            word_target="a",
+            k=2,
+            words_voc=words_voc,
+            embed_matrix=embed_matrix,
+        )
+        assert words == ["b", "c"]
+        assert scores == pytest.approx([np.sqrt(0.5), 0])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    words, _ = cache.top_k_words(
+        logger=logger,
+        word_target="a",
+        k=2,
+        words_voc=words_voc,
+        embed_matrix=np.array([[1, 0], [0, 1], [1, 1]]),
+    )
+    assert words == ["c", "b"]
+    assert (cache.hits, cache.misses, cache.invalidations) == (1, 2, 1)
+    assert len(cache) == 1
+
+
+def test_similarity_cache_disabled(logger):
+    """Should not keep entries when its size is 0."""
+    cache = SimilarityCache(max_size=0)
+
+    for _ in range(2):
+        cache.words_similarity(
+            logger=logger,
+            word_1="a",
+            word_2="a",
+            words_voc={"a": 0},
+            embed_matrix=np.ones((1, 2)),
+        )
+
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 0)
+
+
+def test_pairs_similarity(logger):
+    """Should score every pair like `words_similarity`, logging OOV words once."""
+    words_voc = {"black": 0, "yellow": 1, "red": 2, "white": 3}
+    embed_matrix = np.array(
+        [[1, 1, 1, 1, 1], [2, 2, 2, 2, 2], [1, 0, 1, 2, 0], [4, 4, 4, 4, 4]]
+    )
+    pairs = [("red", "black"), ("white", "red"), ("blue", "red"), ("blue", "green")]
+
+    answer = pairs_similarity(
+        logger=logger,
+        words_1=[word_1 for word_1, _ in pairs],
+        words_2=[word_2 for _, word_2 in pairs],
+        words_voc=words_voc,
+        embed_matrix=embed_matrix,
+    )
+
+    assert answer == pytest.approx(
+        [
+            words_similarity(
+                logger=logger,
+                word_1=word_1,
+                word_2=word_2,
+                words_voc=words_voc,
+                embed_matrix=embed_matrix,
+            )
+            for word_1, word_2 in pairs
+        ]
     )
+    logger.info.assert_any_call("Out of Vocabulary: %d", 3)
@@ -0,0 +1,404 @@
+"""Tests for the Skip Gram model."""
+import logging
+import pickle
+
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.models import skip_gram
+from nlp_negative_sampling.models.skip_gram import SkipGram
+from nlp_negative_sampling.utils.checkpoint import CheckpointWriter
+from nlp_negative_sampling.utils.corpus_cache import load_or_preprocess_corpus
+from nlp_negative_sampling.utils.process_text_data import tokenize_file
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+
+@pytest.fixture(name="sentences", scope="module")
+def sentences_fixture():
+    """Tokenized sentences of the bundled test corpus."""
+    return tokenize_file(file="data/test_worker/text.txt")
+
+
+def test_train(logger, sentences, monkeypatch):
+    """Should train an embedding for every word of the vocabulary."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    sg_model = SkipGram(logger=logger, sentences=sentences)
+
+    sg_model.train()
+
+    assert sg_model.embed_matrix.shape == (
+        len(sg_model.words_voc),
+        skip_gram.EMBEDDING_DIMENSION,
+    )
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+def test_train_hogwild(logger, sentences, monkeypatch):
+    """Should train with several processes sharing the embedding matrices."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    sg_model = SkipGram(logger=logger, sentences=sentences)
+
+    sg_model.train(workers=2)
+
+    assert sg_model.embed_matrix.shape == (
+        len(sg_model.words_voc),
+        skip_gram.EMBEDDING_DIMENSION,
+    )
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+def test_train_memory_mapped_pairs(logger, sentences, monkeypatch, tmp_path):
+    """Should train from pairs memory-mapped from `.npy` files."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    sg_model = SkipGram(logger=logger, sentences=sentences, pairs_dir=str(tmp_path))
+
+    assert isinstance(sg_model.positive_pairs, np.memmap)
+
+    sg_model.train(workers=2)
+
+    assert np.isfinite(sg_model.embed_matrix).all()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_train_streaming(logger, sentences, monkeypatch, workers):
+    """Should train from pairs generated on the fly."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    sg_model = SkipGram(logger=logger, sentences=sentences, streaming=True)
+
+    assert sg_model.positive_pairs is None
+    assert sg_model.words_voc is sg_model.context_voc
+
+    sg_model.train(workers=workers)
+
+    assert sg_model.embed_matrix.shape == (
+        len(sg_model.words_voc),
+        skip_gram.EMBEDDING_DIMENSION,
+    )
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_train_subsampling(logger, sentences, monkeypatch, streaming):
+    """Should train with frequent words subsampled."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    sg_model = SkipGram(
+        logger=logger,
+        sentences=sentences,
+        seed=0,
+        streaming=streaming,
+        subsample_threshold=0.05,
+    )
+
+    sg_model.train()
+
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_train_subsampling_per_epoch(logger, sentences, monkeypatch, workers):
+    """Should draw a new subsample of the materialized pairs at each epoch."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    generated = []
+    get_corpus_positive_pairs = skip_gram.get_corpus_positive_pairs
+
+    def _get_pairs(**kwargs):
+        generated.append(get_corpus_positive_pairs(**kwargs))
+        return generated[-1]
+
+    monkeypatch.setattr(skip_gram, "get_corpus_positive_pairs", _get_pairs)
+    sg_model = SkipGram(
+        logger=logger, sentences=sentences, seed=0, subsample_threshold=0.05
+    )
+
+    sg_model.train(workers=workers)
+
+    # Drawn once when the model is built, then at each epoch
+    assert len(generated) == 3
+    assert not np.array_equal(generated[1], generated[2])
+    assert np.isfinite(sg_model.embed_matrix).all()
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_train_dynamic_window(logger, sentences, monkeypatch, streaming):
+    """Should train with windows of random size."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    sg_model = SkipGram(
+        logger=logger,
+        sentences=sentences,
+        seed=0,
+        streaming=streaming,
+        dynamic_window=True,
+    )
+
+    sg_model.train()
+
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_train_preprocessed(logger, monkeypatch, streaming, tmp_path):
+    """Should train from a cached preprocessed corpus instead of sentences."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    preprocessed = load_or_preprocess_corpus(
+        text_path="data/test_worker/text.txt",
+        min_count=skip_gram.MIN_COUNT,
+        cache_dir=str(tmp_path),
+    )
+    sg_model = SkipGram(logger=logger, preprocessed=preprocessed, streaming=streaming)
+
+    sg_model.train()
+
+    assert sg_model.embed_matrix.shape == (
+        len(preprocessed.vocabulary),
+        skip_gram.EMBEDDING_DIMENSION,
+    )
+    assert (np.diff(sg_model.words_voc.counts) <= 0).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_train_aggregate_pairs(logger, sentences, monkeypatch, workers):
+    """Should train on distinct pairs weighted by their number of occurrences."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 2)
+    expected = SkipGram(logger=logger, sentences=sentences)
+    sg_model = SkipGram(logger=logger, sentences=sentences, aggregate_pairs=True)
+
+    sg_model.train(workers=workers)
+
+    assert len(sg_model.positive_pairs) < len(expected.positive_pairs)
+    assert sg_model.pair_counts.sum() == len(expected.positive_pairs)
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() > skip_gram.EPSILON
+
+
+def test_train_aggregate_pairs_zipf(logger, monkeypatch):
+    """Should stay bounded on frequent pairs with the default cap of the weights."""
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    words = np.random.default_rng(0).zipf(1.3, size=(1000, 20)) % 2000
+    sentences = [[f"w{word}" for word in sentence] for sentence in words]
+    sg_model = SkipGram(
+        logger=logger, sentences=sentences, seed=0, aggregate_pairs=True
+    )
+
+    sg_model.train()
+
+    assert sg_model.pair_counts.max() > 1000
+    assert np.isfinite(sg_model.embed_matrix).all()
+    assert np.abs(sg_model.embed_matrix).max() < 10
+
+
+def test_train_max_pair_weight(logger, sentences, monkeypatch):
+    """Should cap the weights of the aggregated pairs."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    sg_model = SkipGram(
+        logger=logger, sentences=sentences, aggregate_pairs=True, max_pair_weight=2
+    )
+    batches_weights = []
+
+    def _iter_batches(pair_weights, **kwargs):
+        batches_weights.append(pair_weights)
+        return []
+
+    monkeypatch.setattr(skip_gram, "iter_weighted_pairs_batches", _iter_batches)
+
+    sg_model.train()
+
+    assert sg_model.pair_counts.max() > 2
+    assert batches_weights[0].max() == 2
+
+
+def test_aggregate_pairs_streaming(logger, sentences):
+    """Should refuse to aggregate pairs that are not materialized."""
+    with pytest.raises(ValueError):
+        SkipGram(
+            logger=logger, sentences=sentences, streaming=True, aggregate_pairs=True
+        )
+
+
+def test_train_stdlib_logger(sentences, monkeypatch, tmp_path, caplog):
+    """Should log with a standard library logger, at INFO level."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger(__name__)
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    sg_model = SkipGram(
+        logger=logger,
+        sentences=sentences,
+        pairs_dir=str(tmp_path),
+        seed=0,
+        aggregate_pairs=True,
+    )
+
+    sg_model.train(checkpoint_path=checkpoint_path)
+    sg_model.train(resume_from=checkpoint_path)
+
+    assert any(message.startswith("Start Training") for message in caplog.messages)
+    assert "Training resumed at epoch 2, batch 0." in caplog.messages
+
+
+def test_init_without_data(logger):
+    """Should refuse to build a model without sentences nor preprocessed corpus."""
+    with pytest.raises(ValueError):
+        SkipGram(logger=logger)
+
+
+def test_save_and_load_model(logger, sentences, monkeypatch, tmp_path):
+    """Should load the saved model, memory-mapping its embedding matrix."""
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    sg_model = SkipGram(logger=logger, sentences=sentences)
+    sg_model.train()
+
+    sg_model.save_model(model_path=f"{tmp_path}/")
+    embed_matrix, words_voc = SkipGram.load_model(model_path=f"{tmp_path}/")
+
+    assert isinstance(embed_matrix, np.memmap)
+    assert np.array_equal(embed_matrix, sg_model.embed_matrix)
+    assert words_voc.words.tolist() == sg_model.words_voc.words.tolist()
+
+
+def test_load_model_dictionary(tmp_path):
+    """Should convert a vocabulary saved as a dictionary."""
+    with open(tmp_path / "embed_matrix", "wb") as file:
+        pickle.dump(np.eye(2), file)
+    with open(tmp_path / "words_voc", "wb") as file:
+        pickle.dump({"the": 1, "cat": 0}, file)
+
+    embed_matrix, words_voc = SkipGram.load_model(model_path=f"{tmp_path}/")
+
+    assert np.array_equal(embed_matrix, np.eye(2))
+    assert isinstance(words_voc, Vocabulary)
+    assert words_voc.words.tolist() == ["cat", "the"]
+
+
+class _InterruptedWriter(CheckpointWriter):
+    """Checkpoint writer interrupting the training after its fourth batch."""
+
+    def submit(self, checkpoint):
+        """Write the checkpoint, and interrupt after the one of the fourth batch.
+
+        The training closes the writer, so the checkpoint is written once it stops.
+        """
+        super().submit(checkpoint)
+        if checkpoint.batch == 4:
+            raise KeyboardInterrupt
+
+
+@pytest.mark.parametrize(
+    "options", [{}, dict(aggregate_pairs=True), dict(subsample_threshold=0.05)]
+)
+@pytest.mark.parametrize("interrupted_epoch", [0, 1])
+def test_train_resume(
+    logger, sentences, monkeypatch, tmp_path, options, interrupted_epoch
+):
+    """Should resume an interrupted training exactly where it stopped."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 3)
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    sg_model = SkipGram(logger=logger, sentences=sentences, seed=0, **options)
+    sg_model.train()
+
+    # Interrupted within an epoch, after a few epochs
+    monkeypatch.setattr(skip_gram, "EPOCHS", interrupted_epoch)
+    SkipGram(logger=logger, sentences=sentences, seed=0, **options).train(
+        checkpoint_path=checkpoint_path
+    )
+    monkeypatch.setattr(skip_gram, "EPOCHS", 3)
+    monkeypatch.setattr(skip_gram, "CheckpointWriter", _InterruptedWriter)
+    interrupted_model = SkipGram(logger=logger, sentences=sentences, seed=0, **options)
+    with pytest.raises(KeyboardInterrupt):
+        interrupted_model.train(
+            checkpoint_path=checkpoint_path,
+            checkpoint_every=2,
+            resume_from=checkpoint_path if interrupted_epoch else None,
+        )
+    checkpoint = skip_gram.load_checkpoint(path=checkpoint_path)
+    assert (checkpoint.epoch, checkpoint.batch) == (interrupted_epoch, 4)
+
+    resumed_model = SkipGram(logger=logger, sentences=sentences, seed=0, **options)
+    resumed_model.train(resume_from=checkpoint_path)
+
+    np.testing.assert_array_equal(resumed_model.embed_matrix, sg_model.embed_matrix)
+
+
+def test_train_interrupted_closes_writer(logger, sentences, monkeypatch, tmp_path):
+    """Should stop the checkpoint writing thread when the training is interrupted."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    writers = []
+
+    def _writer(path):
+        writers.append(_InterruptedWriter(path))
+        return writers[-1]
+
+    monkeypatch.setattr(skip_gram, "CheckpointWriter", _writer)
+    with pytest.raises(KeyboardInterrupt):
+        SkipGram(logger=logger, sentences=sentences).train(
+            checkpoint_path=str(tmp_path / "checkpoint.npz"), checkpoint_every=4
+        )
+
+    assert not writers[0]._thread.is_alive()
+
+
+def test_train_resume_errors(logger, sentences, monkeypatch, tmp_path):
+    """Should refuse a checkpoint of another model, or mid-epoch with processes."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    monkeypatch.setattr(skip_gram, "CheckpointWriter", _InterruptedWriter)
+    with pytest.raises(KeyboardInterrupt):
+        SkipGram(logger=logger, sentences=sentences).train(
+            checkpoint_path=checkpoint_path, checkpoint_every=4
+        )
+
+    with pytest.raises(ValueError):
+        SkipGram(logger=logger, sentences=sentences).train(
+            workers=2, resume_from=checkpoint_path
+        )
+    with pytest.raises(ValueError):
+        SkipGram(logger=logger, sentences=sentences[:5]).train(
+            resume_from=checkpoint_path
+        )
+
+
+@pytest.mark.parametrize(
+    "saved_options, resumed_options",
+    [
+        (dict(seed=0), dict(seed=1)),
+        (dict(seed=0), dict(seed=0, subsample_threshold=0.05)),
+        (dict(seed=0), dict(seed=0, reversed_sentences=True)),
+        (dict(aggregate_pairs=True), dict(aggregate_pairs=True)),
+    ],
+)
+def test_train_resume_mismatch(
+    logger, sentences, monkeypatch, tmp_path, saved_options, resumed_options
+):
+    """Should refuse another seed, other data or options, or an unseeded order."""
+    monkeypatch.setattr(skip_gram, "BATCH_SIZE", 10)
+    monkeypatch.setattr(skip_gram, "EPOCHS", 1)
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    monkeypatch.setattr(skip_gram, "CheckpointWriter", _InterruptedWriter)
+    with pytest.raises(KeyboardInterrupt):
+        SkipGram(logger=logger, sentences=sentences, **saved_options).train(
+            checkpoint_path=checkpoint_path, checkpoint_every=4
+        )
+
+    if resumed_options.pop("reversed_sentences", False):
+        sentences = sentences[::-1]
+    model = SkipGram(logger=logger, sentences=sentences, **resumed_options)
+    with pytest.raises(ValueError):
+        model.train(resume_from=checkpoint_path)
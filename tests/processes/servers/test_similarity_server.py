@@ -0,0 +1,166 @@
+"""Tests for the similarity server, on localhost."""
+import asyncio
+import json
+import logging
+
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.libs.similarity import (
+    SimilarityIndex,
+    find_k_most_similar_batch,
+    pairs_similarity,
+)
+from nlp_negative_sampling.processes.servers import similarity_server
+from nlp_negative_sampling.processes.servers.similarity_server import (
+    SimilarityServer,
+    serve,
+)
+from nlp_negative_sampling.utils.model_files import save_model_files
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+EMBED_MATRIX = np.random.default_rng(0).normal(size=(30, 4))
+VOCABULARY = Vocabulary(words=[f"w{i}" for i in range(30)], counts=np.ones(30))
+
+
+def _run_queries(similarity, queries, connections=1):
+    """Start a server, send the queries from concurrent connections, return answers.
+
+    The queries of a connection are all sent before reading the answers.
+    """
+
+    async def _client(port, client_queries):
+        """Send queries on one connection and read their answers."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for query in client_queries:
+            writer.write(json.dumps(query).encode() + b"\n")
+        await writer.drain()
+        answers = [json.loads(await reader.readline()) for _ in client_queries]
+        writer.close()
+        return answers
+
+    async def _run():
+        """Serve the clients."""
+        server = await similarity.start(host="127.0.0.1", port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            results = await asyncio.gather(
+                *[_client(port, queries[i::connections]) for i in range(connections)]
+            )
+        finally:
+            server.close()
+            similarity.stop()
+        return [answer for answers in results for answer in answers]
+
+    return asyncio.run(_run())
+
+
+@pytest.fixture(name="similarity")
+def similarity_fixture():
+    """Server of a small model."""
+    return SimilarityServer(
+        index=SimilarityIndex(words_voc=VOCABULARY, embed_matrix=EMBED_MATRIX),
+        embed_matrix=EMBED_MATRIX,
+        max_delay=0.05,
+    )
+
+
+def test_similarity_server(logger, similarity):
+    """Should answer every kind of query, batching concurrent ones."""
+    queries = [
+        dict(id=i, op="similarity", word_1=f"w{i}", word_2="w7") for i in range(20)
+    ]
+    queries += [dict(id=20 + i, op="top_k", word=f"w{i}", k=3) for i in range(20)]
+    queries += [dict(id=40, op="top_k", word="unknown"), dict(id=41, op="vector")]
+    queries += [dict(id=42, op="vector", word="w2"), dict(id=43, op="vector", word="z")]
+
+    answers = {
+        answer["id"]: answer
+        for answer in _run_queries(similarity, queries=queries, connections=4)
+    }
+
+    expected_similarities = pairs_similarity(
+        logger=logger,
+        words_1=[f"w{i}" for i in range(20)],
+        words_2=["w7"] * 20,
+        words_voc=VOCABULARY,
+        embed_matrix=EMBED_MATRIX,
+    )
+    expected_indexes, expected_scores = find_k_most_similar_batch(
+        logger=logger,
+        queries=[f"w{i}" for i in range(20)],
+        k=3,
+        words_voc=VOCABULARY,
+        embed_matrix=EMBED_MATRIX,
+    )
+    for i in range(20):
+        assert answers[i]["similarity"] == pytest.approx(expected_similarities[i])
+        assert (
+            answers[20 + i]["words"] == VOCABULARY.words[expected_indexes[i]].tolist()
+        )
+        assert answers[20 + i]["scores"] == pytest.approx(expected_scores[i])
+    assert len(answers[40]["words"]) == similarity_server.DEFAULT_K
+    assert "error" in answers[41]
+    assert answers[42]["vector"] == EMBED_MATRIX[2].tolist()
+    assert answers[43]["vector"] is None
+
+    metrics = similarity.metrics()
+    assert metrics["requests"] == 44
+    assert metrics["mean_batch_size"] > 1
+    assert 0 < metrics["p50_ms"] <= metrics["p99_ms"]
+
+
+def test_similarity_server_errors(similarity):
+    """Should answer invalid queries with errors, and report its metrics."""
+    queries = [
+        dict(op="unknown"),
+        [1, 2],
+        dict(op="top_k", word="w1", k=0),
+        dict(op="similarity", word_1="w1", word_2="w2"),
+    ]
+
+    answers = _run_queries(similarity, queries=queries)
+    metrics = _run_queries(similarity, queries=[dict(id=0, op="metrics")])[0]
+
+    assert answers[0] == dict(error="Unknown operation 'unknown'.")
+    assert "error" in answers[1]
+    assert "error" in answers[2]
+    assert "similarity" in answers[3]
+    assert metrics["id"] == 0
+    assert metrics["requests"] == 2
+
+
+def test_serve(tmp_path, monkeypatch, caplog):
+    """Should load a saved model and serve it, memory-mapped, until cancelled."""
+    caplog.set_level(logging.INFO)
+    save_model_files(
+        embed_matrix=EMBED_MATRIX, vocabulary=VOCABULARY, model_path=f"{tmp_path}/"
+    )
+    started = []
+    start = SimilarityServer.start
+
+    async def _start(self, host, port):
+        """Start the server, recording it."""
+        server = await start(self, host=host, port=port)
+        started.append(self)
+        return server
+
+    monkeypatch.setattr(SimilarityServer, "start", _start)
+
+    async def _run():
+        """Serve, then cancel once started."""
+        task = asyncio.ensure_future(
+            serve(model_path=f"{tmp_path}/", host="127.0.0.1", port=0)
+        )
+        while not started:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_run())
+
+    assert len(started[0].index.words) == 30
+    assert isinstance(started[0].index.embed_matrix, np.memmap)
+    assert started[0]._batch_task.cancelled()
+    assert "Similarity server started on 127.0.0.1:0." in caplog.messages
@@ -23,8 +23,61 @@ def test_skip_gram_similarity_worker_train():
         )
     )
 
-    os.path.isfile("data/test_worker/trained_model/embed_matrix")
-    os.path.isfile("data/test_worker/trained_model/words_voc")
+    assert os.path.isfile("data/test_worker/trained_model/model.json")
+    assert os.path.isfile("data/test_worker/trained_model/embed_matrix.npy")
+    assert os.path.isfile("data/test_worker/trained_model/vocabulary.txt")
+
+
+def test_skip_gram_similarity_worker_train_ann_index(tmp_path):
+    """Should save an approximate nearest neighbours index next to the model."""
+    parser = get_command_line_parser()
+    skip_gram_similarity_worker(
+        parser.parse_args(
+            [
+                "--text_path",
+                "data/test_worker/text.txt",
+                "--model_path",
+                f"{tmp_path}/",
+                "--ann_clusters",
+                "2",
+            ]
+        )
+    )
+
+    assert os.path.isfile(f"{tmp_path}/ivf.json")
+    assert os.path.isfile(f"{tmp_path}/ivf_centroids.npy")
+
+
+def test_skip_gram_similarity_worker_predict_chunks(tmp_path):
+    """Should append the similarity of each chunk of pairs to the results."""
+    pd.DataFrame(
+        columns=["word_1", "word_2", "similarity"],
+        data=[["and", "the", 0.5], ["the", "unknown", 0.1], ["to", "of", 0.2]],
+    ).to_csv(tmp_path / "pairs.csv", index=False)
+    parser = get_command_line_parser()
+    args = [
+        "--text_path",
+        str(tmp_path / "pairs.csv"),
+        "--model_path",
+        "data/test_worker/trained_model/",
+        "--test",
+        "--results_path",
+    ]
+
+    skip_gram_similarity_worker(
+        parser.parse_args(
+            args + [str(tmp_path / "chunks.csv"), "--pairs_chunk_size", "2"]
+        )
+    )
+    skip_gram_similarity_worker(parser.parse_args(args + [str(tmp_path / "all.csv")]))
+
+    results_df = pd.read_csv(tmp_path / "chunks.csv")
+    assert results_df[["word_1", "word_2"]].values.tolist() == [
+        ["and", "the"],
+        ["the", "unknown"],
+        ["to", "of"],
+    ]
+    assert results_df.equals(pd.read_csv(tmp_path / "all.csv"))
 
 
 def test_skip_gram_similarity_worker_predict():
@@ -0,0 +1,95 @@
+"""Tests for the checkpoints of the training state."""
+import json
+
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.utils import checkpoint as checkpoint_module
+from nlp_negative_sampling.utils.checkpoint import (
+    CHECKPOINT_VERSION,
+    Checkpoint,
+    CheckpointWriter,
+    data_fingerprint,
+    load_checkpoint,
+    save_checkpoint,
+)
+
+
+def _checkpoint(epoch=1, batch=3):
+    """Return a checkpoint with a random state."""
+    return Checkpoint(
+        theta=np.arange(6, dtype=float),
+        epoch=epoch,
+        batch=batch,
+        rng_state=np.random.default_rng(0).bit_generator.state,
+        learning_rate=0.01,
+        seed=0,
+        data_fingerprint="fingerprint",
+    )
+
+
+def test_save_and_load_checkpoint(tmp_path):
+    """Should read the checkpoint written."""
+    path = str(tmp_path / "checkpoint.npz")
+    checkpoint = _checkpoint()
+
+    save_checkpoint(checkpoint=checkpoint, path=path)
+    loaded = load_checkpoint(path=path)
+
+    np.testing.assert_array_equal(loaded.theta, checkpoint.theta)
+    assert loaded[1:] == checkpoint[1:]
+    rng = np.random.default_rng()
+    rng.bit_generator.state = loaded.rng_state
+    assert rng.random() == np.random.default_rng(0).random()
+
+
+def test_load_checkpoint_version(tmp_path, monkeypatch):
+    """Should refuse a checkpoint of another format version."""
+    path = str(tmp_path / "checkpoint.npz")
+    monkeypatch.setattr(checkpoint_module, "CHECKPOINT_VERSION", 0)
+    save_checkpoint(checkpoint=_checkpoint(), path=path)
+    monkeypatch.undo()
+
+    with pytest.raises(ValueError):
+        load_checkpoint(path=path)
+
+
+def test_data_fingerprint():
+    """Should change with the arrays or the options only."""
+    arrays = [np.arange(4), np.ones(2)]
+    fingerprint = data_fingerprint(arrays=arrays, options=dict(a=1, b=None))
+
+    assert data_fingerprint(arrays=arrays, options=dict(b=None, a=1)) == fingerprint
+    assert data_fingerprint(arrays=arrays[:1], options=dict(a=1, b=None)) != fingerprint
+    assert data_fingerprint(arrays=arrays, options=dict(a=2, b=None)) != fingerprint
+    assert (
+        data_fingerprint(arrays=[np.arange(3), np.ones(2)], options=dict(a=1, b=None))
+        != fingerprint
+    )
+
+
+def test_checkpoint_writer(tmp_path):
+    """Should write the last checkpoint submitted, then stop."""
+    path = str(tmp_path / "checkpoint.npz")
+
+    with CheckpointWriter(path=path) as writer:
+        writer.submit(_checkpoint(epoch=0, batch=1))
+        writer.submit(_checkpoint(epoch=2, batch=0))
+
+    assert not writer._thread.is_alive()
+    loaded = load_checkpoint(path=path)
+    assert (loaded.epoch, loaded.batch) == (2, 0)
+    with np.load(path) as checkpoint_file:
+        assert (
+            json.loads(str(checkpoint_file["metadata"]))["version"]
+            == CHECKPOINT_VERSION
+        )
+
+
+def test_checkpoint_writer_error(tmp_path):
+    """Should raise the error of a failed write."""
+    writer = CheckpointWriter(path=str(tmp_path / "missing" / "checkpoint.npz"))
+    writer.submit(_checkpoint())
+
+    with pytest.raises(FileNotFoundError):
+        writer.close()
@@ -0,0 +1,142 @@
+"""Tests for the integer-encoded corpus."""
+import numpy as np
+
+from nlp_negative_sampling.utils.corpus import (
+    EncodedCorpus,
+    build_vocabulary,
+    encode_corpus,
+    preprocess_corpus,
+    preprocess_sentences_stream,
+    select_vocabulary,
+    subsample_corpus,
+)
+from nlp_negative_sampling.utils.process_text_data import rare_word_pruning
+
+SENTENCES = [["the", "cat", "cat", "red"], ["the", "red", "cat", "cat"], ["the", "red"]]
+
+
+def test_build_vocabulary():
+    """Should index words in order of first appearance."""
+    answer = build_vocabulary(sentences=SENTENCES)
+
+    assert answer == {"the": 0, "cat": 1, "red": 2}
+
+
+def test_encode_corpus():
+    """Should encode sentences as a flat array of indexes and sentence offsets."""
+    answer = encode_corpus(
+        sentences=SENTENCES + [["dog"]], vocabulary={"the": 0, "cat": 1, "red": 2}
+    )
+
+    assert answer.tokens.dtype == np.int32
+    assert answer.tokens.tolist() == [0, 1, 1, 2, 0, 2, 1, 1, 0, 2]
+    assert answer.offsets.tolist() == [0, 4, 8, 10, 10]
+    assert answer.count_sentences == 4
+
+
+def test_encoded_corpus_select():
+    """Should return the selected sentences with offsets starting at 0."""
+    corpus = EncodedCorpus(
+        tokens=np.array([0, 1, 1, 2, 0, 2, 1, 1, 0, 2]),
+        offsets=np.array([0, 4, 8, 10]),
+    )
+
+    answer = corpus.select(begin=1, end=3)
+
+    assert answer.tokens.tolist() == [0, 2, 1, 1, 0, 2]
+    assert answer.offsets.tolist() == [0, 4, 6]
+
+
+def test_subsample_corpus():
+    """Should drop tokens according to their keep probability."""
+    corpus = EncodedCorpus(
+        tokens=np.array([0, 1, 1, 2, 0, 2, 1, 1, 0, 2]),
+        offsets=np.array([0, 4, 8, 8, 10]),
+    )
+
+    answer = subsample_corpus(
+        corpus=corpus,
+        keep_probabilities=np.array([1.0, 0.0, 1.0]),
+        rng=np.random.default_rng(0),
+    )
+
+    assert answer.tokens.tolist() == [0, 2, 0, 2, 0, 2]
+    assert answer.offsets.tolist() == [0, 2, 4, 4, 6]
+
+
+def test_preprocess_corpus():
+    """Should return the vocabulary sorted by frequency and the encoded corpus."""
+    answer = preprocess_corpus(processed_sentences=SENTENCES)
+
+    assert answer.vocabulary == {"cat": 0, "the": 1, "red": 2}
+    assert answer.vocabulary.counts.tolist() == [4, 3, 3]
+    assert answer.corpus.tokens.tolist() == [1, 0, 0, 2, 1, 2, 0, 0, 1, 2]
+    assert answer.corpus.offsets.tolist() == [0, 4, 8, 10]
+
+
+def test_preprocess_sentences_stream():
+    """Should match the encoding of the sentences pruned from rare words."""
+    sentences = SENTENCES + [["a", "dog"], ["dog", "dog", "the"], ["dog"]]
+    expected = preprocess_corpus(
+        processed_sentences=rare_word_pruning(list_tokens=sentences, min_count=2)
+    )
+
+    answer = preprocess_sentences_stream(
+        iter_sentences=lambda: iter(sentences), min_count=2
+    )
+
+    assert (
+        answer.vocabulary
+        == expected.vocabulary
+        == {"the": 0, "cat": 1, "dog": 2, "red": 3}
+    )
+    assert answer.vocabulary.counts.tolist() == expected.vocabulary.counts.tolist()
+    assert answer.corpus.tokens.tolist() == expected.corpus.tokens.tolist()
+    assert answer.corpus.offsets.tolist() == expected.corpus.offsets.tolist()
+
+
+def test_select_vocabulary():
+    """Should keep the most frequent words above the minimum count."""
+    counts = np.array([3, 1, 5, 3, 2, 4])
+
+    assert select_vocabulary(counts=counts, min_count=1).tolist() == [
+        True,
+        False,
+        True,
+        True,
+        True,
+        True,
+    ]
+    assert select_vocabulary(counts=counts, min_count=1, max_words=3).tolist() == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert select_vocabulary(counts=counts, min_count=3, max_words=3).tolist() == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_preprocess_sentences_stream_bounded():
+    """Should bound the counted words and keep the most frequent ones."""
+    sentences = SENTENCES + [["a", "dog"], ["dog", "dog", "the"]]
+
+    answer = preprocess_sentences_stream(
+        iter_sentences=lambda: iter(sentences),
+        min_count=0,
+        max_vocab_size=4,
+        max_words=2,
+    )
+
+    assert answer.vocabulary == {"the": 0, "cat": 1}
+    assert answer.vocabulary.counts.tolist() == [4, 4]
+    assert answer.corpus.tokens.tolist() == [0, 1, 1, 0, 1, 1, 0, 0]
+    assert answer.corpus.offsets.tolist() == [0, 3, 6, 7, 7, 8]
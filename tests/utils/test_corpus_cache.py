@@ -0,0 +1,63 @@
+"""Tests for the cache of preprocessed corpora."""
+import os
+
+import numpy as np
+
+from nlp_negative_sampling.utils import corpus_cache
+from nlp_negative_sampling.utils.corpus_cache import (
+    corpus_cache_key,
+    load_or_preprocess_corpus,
+)
+
+TEXT = "The cat, the cat.\nThe red cat!\n\nA red dog\n"
+
+
+def _write_text(tmp_path, text=TEXT):
+    """Write a training text and return its path."""
+    path = tmp_path / "text.txt"
+    path.write_text(text, encoding="utf8")
+    return str(path)
+
+
+def test_corpus_cache_key(tmp_path):
+    """Should depend on the content of the file and on the pruning threshold."""
+    text_path = _write_text(tmp_path)
+    key = corpus_cache_key(text_path=text_path, min_count=1)
+
+    assert corpus_cache_key(text_path=text_path, min_count=1) == key
+    assert corpus_cache_key(text_path=text_path, min_count=2) != key
+    assert corpus_cache_key(text_path=f"{text_path},{text_path}", min_count=1) != key
+    _write_text(tmp_path, text=TEXT + "cat\n")
+    assert corpus_cache_key(text_path=text_path, min_count=1) != key
+
+
+def test_load_or_preprocess_corpus(tmp_path):
+    """Should prune rare words and encode the sentences."""
+    answer = load_or_preprocess_corpus(text_path=_write_text(tmp_path), min_count=1)
+
+    assert answer.vocabulary == {"the": 0, "cat": 1, "red": 2}
+    assert answer.vocabulary.counts.tolist() == [3, 3, 2]
+    assert answer.corpus.tokens.tolist() == [0, 1, 0, 1, 0, 2, 1, 2]
+    assert answer.corpus.offsets.tolist() == [0, 4, 7, 7, 8]
+
+
+def test_load_or_preprocess_corpus_cached(tmp_path, mocker):
+    """Should write the corpus on the first call and memory-map it afterwards."""
+    text_path = _write_text(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    expected = load_or_preprocess_corpus(
+        text_path=text_path, min_count=1, cache_dir=cache_dir
+    )
+    assert os.listdir(cache_dir) == [corpus_cache_key(text_path, min_count=1)]
+
+    mocker.patch.object(corpus_cache, "iter_tokenized_file", side_effect=AssertionError)
+    answer = load_or_preprocess_corpus(
+        text_path=text_path, min_count=1, cache_dir=cache_dir
+    )
+
+    assert answer.vocabulary == expected.vocabulary
+    np.testing.assert_array_equal(answer.vocabulary.counts, expected.vocabulary.counts)
+    assert isinstance(answer.corpus.tokens, np.memmap)
+    assert answer.corpus.tokens.dtype == np.int32
+    np.testing.assert_array_equal(answer.corpus.tokens, expected.corpus.tokens)
+    np.testing.assert_array_equal(answer.corpus.offsets, expected.corpus.offsets)
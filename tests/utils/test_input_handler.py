@@ -1,7 +1,20 @@
 """Tests for input handlers."""
+import bz2
+import gzip
+import lzma
+import threading
+
 import pandas as pd
+import pytest
 
-from nlp_negative_sampling.utils.input_handler import load_pairs
+from nlp_negative_sampling.utils.input_handler import (
+    is_compressed,
+    iter_pairs_chunks,
+    load_pairs,
+    open_text_file,
+    prefetch,
+    resolve_text_paths,
+)
 
 
 def test_load_pairs(tmp_path):
@@ -14,3 +27,110 @@ def test_load_pairs(tmp_path):
     answer = load_pairs(path=str(tmp_path / "pairs.csv"))
 
     assert answer == [["woman", "man", 0.9], ["yellow", "red", 0.8]]
+
+
+def test_iter_pairs_chunks(tmp_path):
+    """Should read the word pairs by chunks, keeping every word a string."""
+    pd.DataFrame(
+        columns=["word_1", "word_2", "similarity"],
+        data=[["woman", "man", 0.9], ["yellow", "red", 0.8], ["nan", "null", 0.1]],
+    ).to_csv(tmp_path / "pairs.csv", index=False)
+
+    answer = list(iter_pairs_chunks(path=str(tmp_path / "pairs.csv"), chunk_size=2))
+
+    assert [chunk.values.tolist() for chunk in answer] == [
+        [["woman", "man"], ["yellow", "red"]],
+        [["nan", "null"]],
+    ]
+
+
+def test_resolve_text_paths(tmp_path):
+    """Should list files, directories and glob patterns in order."""
+    (tmp_path / "shards").mkdir()
+    (tmp_path / "shards" / "sub").mkdir()
+    for name in ["news-00002-of-00003", "news-00001-of-00003.gz", "readme"]:
+        (tmp_path / "shards" / name).write_text("")
+    (tmp_path / "text.txt").write_text("")
+
+    assert resolve_text_paths(text_path=str(tmp_path / "text.txt")) == [
+        str(tmp_path / "text.txt")
+    ]
+    assert resolve_text_paths(text_path=str(tmp_path / "shards")) == [
+        str(tmp_path / "shards" / "news-00001-of-00003.gz"),
+        str(tmp_path / "shards" / "news-00002-of-00003"),
+        str(tmp_path / "shards" / "readme"),
+    ]
+    assert resolve_text_paths(
+        text_path=f"{tmp_path / 'shards' / 'news-*'},{tmp_path / 'text.txt'}"
+    ) == [
+        str(tmp_path / "shards" / "news-00001-of-00003.gz"),
+        str(tmp_path / "shards" / "news-00002-of-00003"),
+        str(tmp_path / "text.txt"),
+    ]
+
+
+@pytest.mark.parametrize("text_path", ["missing.txt", "missing-*.gz"])
+def test_resolve_text_paths_missing(tmp_path, text_path):
+    """Should raise an error when a path matches no file."""
+    with pytest.raises(FileNotFoundError):
+        resolve_text_paths(text_path=str(tmp_path / text_path))
+
+
+@pytest.mark.parametrize(
+    "name, compress",
+    [
+        ("text.txt", lambda text: text),
+        ("text.gz", gzip.compress),
+        ("text.xz", lzma.compress),
+        ("text.bz2", bz2.compress),
+    ],
+)
+def test_open_text_file(tmp_path, name, compress):
+    """Should read the decompressed text of a file."""
+    (tmp_path / name).write_bytes(compress("The café\nsat".encode("utf8")))
+
+    with open_text_file(path=str(tmp_path / name)) as text_file:
+        answer = text_file.read()
+
+    assert answer == "The café\nsat"
+    assert is_compressed(path=name) == (name != "text.txt")
+
+
+def test_prefetch():
+    """Should yield the items in order."""
+    answer = prefetch(range(100), size=2)
+
+    assert list(answer) == list(range(100))
+
+
+def test_prefetch_none():
+    """Should yield None items instead of stopping at them."""
+    answer = prefetch([None, 1, None], size=2)
+
+    assert list(answer) == [None, 1, None]
+
+
+def test_prefetch_error():
+    """Should raise the error of the producer after the items produced before it."""
+
+    def _items():
+        """Yield an item then fail."""
+        yield 1
+        raise ValueError("corrupted")
+
+    answer = prefetch(_items())
+
+    assert next(answer) == 1
+    with pytest.raises(ValueError, match="corrupted"):
+        next(answer)
+
+
+def test_prefetch_stop():
+    """Should stop the producer thread when the consumer stops early."""
+    count_threads = threading.active_count()
+    answer = prefetch(iter(range(1000)), size=2)
+
+    assert next(answer) == 0
+    answer.close()
+
+    assert threading.active_count() == count_threads
@@ -0,0 +1,74 @@
+"""Tests for the on-disk format of trained models."""
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.utils.model_files import (
+    is_model,
+    load_model_files,
+    load_pickle_model,
+    migrate_pickle_model,
+    save_model_files,
+)
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+
+def _vocabulary():
+    """Return a small vocabulary."""
+    return Vocabulary(words=["the", "cat", "red"], counts=np.array([5, 3, 1]))
+
+
+def test_save_and_load_model_files(tmp_path):
+    """Should read the model written, memory-mapping its embedding matrix."""
+    model_path = f"{tmp_path}/"
+    embed_matrix = np.arange(6, dtype=float).reshape(3, 2)
+
+    assert not is_model(model_path=model_path)
+    save_model_files(
+        embed_matrix=embed_matrix, vocabulary=_vocabulary(), model_path=model_path
+    )
+    loaded_matrix, vocabulary = load_model_files(model_path=model_path)
+
+    assert is_model(model_path=model_path)
+    assert isinstance(loaded_matrix, np.memmap)
+    assert np.array_equal(loaded_matrix, embed_matrix)
+    assert vocabulary.words.tolist() == ["the", "cat", "red"]
+    assert vocabulary.counts.tolist() == [5, 3, 1]
+    loaded_matrix, _ = load_model_files(model_path=model_path, mmap_mode=None)
+    assert not isinstance(loaded_matrix, np.memmap)
+
+
+def test_load_model_files_errors(tmp_path):
+    """Should refuse models of another version, or whose files do not match."""
+    model_path = f"{tmp_path}/"
+    save_model_files(
+        embed_matrix=np.ones((3, 2)), vocabulary=_vocabulary(), model_path=model_path
+    )
+    np.save(f"{model_path}embed_matrix.npy", np.ones((2, 2)))
+    with pytest.raises(ValueError):
+        load_model_files(model_path=model_path)
+
+    with open(f"{model_path}model.json", "w") as file:
+        json.dump(dict(version=0), file)
+    with pytest.raises(ValueError):
+        load_model_files(model_path=model_path)
+
+
+def test_migrate_pickle_model(tmp_path):
+    """Should convert a pickle model, keeping its embeddings and vocabulary."""
+    model_path = f"{tmp_path}/model_"
+    with open(f"{model_path}embed_matrix", "wb") as file:
+        pickle.dump(np.eye(3), file)
+    with open(f"{model_path}words_voc", "wb") as file:
+        pickle.dump(_vocabulary(), file)
+
+    migrate_pickle_model(model_path=model_path, remove_pickles=True)
+    embed_matrix, vocabulary = load_model_files(model_path=model_path)
+
+    assert np.array_equal(embed_matrix, np.eye(3))
+    assert vocabulary.counts.tolist() == [5, 3, 1]
+    assert not (tmp_path / "model_embed_matrix").exists()
+    with pytest.raises(FileNotFoundError):
+        load_pickle_model(model_path=model_path)
@@ -0,0 +1,93 @@
+"""Tests for the parallel preprocessing of text files."""
+import gzip
+
+import pytest
+
+from nlp_negative_sampling.utils.corpus import preprocess_sentences_stream
+from nlp_negative_sampling.utils.parallel_preprocessing import (
+    _merge_ranges,
+    _preprocess_range,
+    preprocess_file_parallel,
+)
+from nlp_negative_sampling.utils.process_text_data import iter_tokenized_file
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_preprocess_file_parallel(workers):
+    """Should match the sequential preprocessing of the file."""
+    file = "data/test_worker/text.txt"
+    expected = preprocess_sentences_stream(
+        iter_sentences=lambda: iter_tokenized_file(file=file), min_count=5
+    )
+
+    answer = preprocess_file_parallel(text_path=file, min_count=5, workers=workers)
+
+    assert answer.vocabulary == expected.vocabulary
+    assert answer.vocabulary.counts.tolist() == expected.vocabulary.counts.tolist()
+    assert answer.corpus.tokens.dtype == expected.corpus.tokens.dtype
+    assert answer.corpus.tokens.tolist() == expected.corpus.tokens.tolist()
+    assert answer.corpus.offsets.tolist() == expected.corpus.offsets.tolist()
+
+
+def test_preprocess_file_parallel_small_file(tmp_path):
+    """Should handle more ranges than lines, and empty lines."""
+    (tmp_path / "text.txt").write_text("the cat\n\nthe dog\nthe cat")
+
+    answer = preprocess_file_parallel(
+        text_path=str(tmp_path / "text.txt"), min_count=1, workers=3
+    )
+
+    assert answer.vocabulary == {"the": 0, "cat": 1}
+    assert answer.vocabulary.counts.tolist() == [3, 2]
+    assert answer.corpus.tokens.tolist() == [0, 1, 0, 0, 1]
+    assert answer.corpus.offsets.tolist() == [0, 2, 2, 3, 5]
+
+
+def test_preprocess_file_parallel_shards(tmp_path):
+    """Should match the sequential preprocessing of compressed and plain shards."""
+    with open("data/test_worker/text.txt", "rb") as text_file:
+        lines = text_file.read().split(b"\n")
+    (tmp_path / "news-00001.gz").write_bytes(gzip.compress(b"\n".join(lines[:10])))
+    (tmp_path / "news-00002").write_bytes(b"\n".join(lines[10:]))
+    expected = preprocess_sentences_stream(
+        iter_sentences=lambda: iter_tokenized_file(file=str(tmp_path)), min_count=5
+    )
+
+    answer = preprocess_file_parallel(text_path=str(tmp_path), min_count=5, workers=2)
+
+    assert answer.vocabulary == expected.vocabulary
+    assert answer.vocabulary.counts.tolist() == expected.vocabulary.counts.tolist()
+    assert answer.corpus.tokens.tolist() == expected.corpus.tokens.tolist()
+    assert answer.corpus.offsets.tolist() == expected.corpus.offsets.tolist()
+
+
+def test_preprocess_file_parallel_max_words():
+    """Should keep the most frequent words, as the sequential preprocessing."""
+    file = "data/test_worker/text.txt"
+    expected = preprocess_sentences_stream(
+        iter_sentences=lambda: iter_tokenized_file(file=file), min_count=1, max_words=20
+    )
+
+    answer = preprocess_file_parallel(
+        text_path=file, min_count=1, workers=2, max_words=20
+    )
+
+    assert len(answer.vocabulary) == 20
+    assert answer.vocabulary == expected.vocabulary
+    assert answer.vocabulary.counts.tolist() == expected.vocabulary.counts.tolist()
+    assert answer.corpus.tokens.tolist() == expected.corpus.tokens.tolist()
+
+
+def test_preprocess_range_max_vocab_size(tmp_path):
+    """Should remove the rarest local words whenever there are too many of them."""
+    (tmp_path / "text.txt").write_text("a b a\nc a d\nb e\nf a\n")
+
+    encoded_range = _preprocess_range((str(tmp_path / "text.txt"), 0, None, 3))
+    answer = _merge_ranges(ranges=[encoded_range], min_count=0)
+
+    # b, c and d are removed after the second line, b, e and f after the last one
+    assert encoded_range.words == ["a"] + [None] * 6
+    assert answer.vocabulary == {"a": 0}
+    assert answer.vocabulary.counts.tolist() == [4]
+    assert answer.corpus.tokens.tolist() == [0, 0, 0, 0]
+    assert answer.corpus.offsets.tolist() == [0, 2, 3, 3, 4]
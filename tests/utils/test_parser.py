@@ -1,7 +1,10 @@
 """Tests for parser."""
 import unittest
 
-from nlp_negative_sampling.utils.parser import get_command_line_parser
+from nlp_negative_sampling.utils.parser import (
+    get_command_line_parser,
+    get_server_parser,
+)
 
 
 class ParserTest(unittest.TestCase):
@@ -18,3 +21,34 @@ class ParserTest(unittest.TestCase):
         )
         self.assertEqual(parsed.text_path, "text.txt")
         self.assertEqual(parsed.model_path, "train")
+        self.assertEqual(parsed.workers, 1)
+        self.assertFalse(parsed.streaming)
+        self.assertFalse(parsed.dynamic_window)
+        self.assertFalse(parsed.aggregate_pairs)
+        self.assertEqual(parsed.max_pair_weight, 20)
+        self.assertIsNone(parsed.cache_dir)
+        self.assertEqual(parsed.preprocessing_workers, 1)
+        self.assertIsNone(parsed.max_vocab_size)
+        self.assertIsNone(parsed.max_words)
+        self.assertIsNone(parsed.seed)
+        self.assertEqual(parsed.pairs_chunk_size, 100000)
+        self.assertIsNone(parsed.ann_clusters)
+        self.assertIsNone(parsed.checkpoint_path)
+        self.assertIsNone(parsed.checkpoint_every)
+        self.assertIsNone(parsed.resume_from)
+
+    def test_get_command_line_parser_workers(self):
+        """Should parse the number of training processes."""
+        parsed = self.parser.parse_args(
+            ["--text_path", "text.txt", "--model_path", "train", "--workers", "4"]
+        )
+        self.assertEqual(parsed.workers, 4)
+
+    def test_get_server_parser(self):
+        """Should parse the arguments of the server, with local defaults."""
+        parsed = get_server_parser().parse_args(["--model_path", "train"])
+        self.assertEqual(parsed.model_path, "train")
+        self.assertEqual(parsed.host, "127.0.0.1")
+        self.assertEqual(parsed.port, 8765)
+        self.assertEqual(parsed.max_batch_size, 256)
+        self.assertEqual(parsed.max_delay_ms, 2.0)
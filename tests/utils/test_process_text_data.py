@@ -1,14 +1,32 @@
 """Tests for text processing."""
 from collections import Counter
+import gzip
+import lzma
+import string
 
+import numpy as np
+import pytest
+
+from nlp_negative_sampling.utils.func_tools import compose
 from nlp_negative_sampling.utils.process_text_data import (
     count_words,
+    count_words_bounded,
     flatten_list,
+    get_keep_probabilities,
+    get_line_aligned_ranges,
     get_list_lower_words,
+    iter_corpus_lines,
+    iter_file_lines,
+    iter_file_range_lines,
+    iter_tokenized_file,
+    iter_tokenized_file_range,
     keep_alphabetical_words,
     rare_word_pruning,
+    reduce_vocabulary,
     remove_punctuation,
+    subsample_frequent_words,
     tokenize_file,
+    tokenize_line,
 )
 
 
@@ -178,6 +196,125 @@ def test_tokenize_file(tmp_path):
     ]
 
 
+def _composed_pipeline(line):
+    """Tokenize a line with the three tokenization steps chained."""
+    pipeline = compose(
+        keep_alphabetical_words, remove_punctuation, get_list_lower_words,
+    )
+    return pipeline(line)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "",
+        "   \t ",
+        "The U.S. Centers for Disease Control , then reversed itself .",
+        "bio-identical hormone in 2009 ' Crazy Talk : Oprah , Wacky Cures & You .",
+        "()  [] ... -- !? don't o'clock e-mail",
+        "Café naïve ÉCOLE straße İstanbul ΣΟΦΙΑ",
+        "tabs\tand\x0bvertical\x0cfeeds\u00a0nbsp\u2003em space",
+        "abc123 123 a1b x² ½ «quoted» “curly” — dash",
+        "under_score back\\slash at@sign hash#tag",
+    ],
+)
+def test_tokenize_line(line):
+    """Should produce the same tokens as the composed tokenization steps."""
+    assert tokenize_line(line) == _composed_pipeline(line)
+
+
+def test_tokenize_line_random():
+    """Should produce the same tokens as the composed steps on random lines."""
+    rng = np.random.default_rng(0)
+    alphabet = list(string.printable + "éÉßİıΣς²½«»“”—\u00a0\u2003\u3000")
+
+    for _ in range(2000):
+        line = "".join(rng.choice(alphabet, size=rng.integers(0, 40)))
+
+        assert tokenize_line(line) == _composed_pipeline(line)
+
+
+def test_tokenize_line_test_corpus():
+    """Should produce the same tokens as the composed steps on the test corpus."""
+    with open("data/test_worker/text.txt", encoding="utf8") as text_file:
+        for line in text_file:
+            assert tokenize_line(line) == _composed_pipeline(line)
+
+
+def test_iter_file_lines(tmp_path):
+    """Should yield the same lines whatever the size of the chunks read."""
+    (tmp_path / "text_file.txt").write_text("The cat\n\nsat on\r\nthe mat\nend")
+
+    for chunk_size in [1, 3, 7, 1000]:
+        answer = iter_file_lines(
+            file=str(tmp_path / "text_file.txt"), chunk_size=chunk_size
+        )
+
+        assert list(answer) == ["The cat", "", "sat on", "the mat", "end"]
+
+
+def test_iter_corpus_lines(tmp_path):
+    """Should yield the lines of all the shards, decompressing them."""
+    (tmp_path / "news-00001.gz").write_bytes(gzip.compress(b"The cat\nsat"))
+    (tmp_path / "news-00002.xz").write_bytes(lzma.compress(b"on the\nmat\n"))
+    (tmp_path / "news-00003").write_text("end")
+
+    answer = iter_corpus_lines(text_path=str(tmp_path), chunk_size=2)
+
+    assert list(answer) == ["The cat", "sat", "on the", "mat", "end"]
+
+
+def test_iter_tokenized_file(tmp_path):
+    """Should yield the tokens of each line, reading the file by chunks."""
+    (tmp_path / "text_file.txt").write_text("The U.S. cat ,\nsat on 2 mats .\n")
+
+    answer = iter_tokenized_file(file=str(tmp_path / "text_file.txt"), chunk_size=4)
+
+    assert next(answer) == ["the", "us", "cat"]
+    assert list(answer) == [["sat", "on", "mats"]]
+
+
+def test_get_line_aligned_ranges(tmp_path):
+    """Should split the file in contiguous ranges starting at line starts."""
+    text = b"The cat\nsat\non the mat\n\nend"
+    (tmp_path / "text_file.txt").write_bytes(text)
+
+    answer = get_line_aligned_ranges(
+        file=str(tmp_path / "text_file.txt"), count_ranges=3
+    )
+
+    assert answer == [(0, 12), (12, 23), (23, len(text))]
+    assert all(text[begin - 1 : begin] == b"\n" for begin, _ in answer[1:])
+
+
+@pytest.mark.parametrize("count_ranges", [1, 2, 5, 50])
+def test_iter_file_range_lines(tmp_path, count_ranges):
+    """Should yield the lines of the file, over all ranges."""
+    (tmp_path / "text_file.txt").write_bytes(
+        "The café\n\nsat on\r\nthe\rmat\r\r\nend".encode("utf8")
+    )
+    file = str(tmp_path / "text_file.txt")
+
+    answer = [
+        line
+        for begin, end in get_line_aligned_ranges(file=file, count_ranges=count_ranges)
+        for line in iter_file_range_lines(file=file, begin=begin, end=end)
+    ]
+
+    assert answer == list(iter_file_lines(file=file))
+
+
+def test_iter_tokenized_file_range(tmp_path):
+    """Should yield the tokens of the lines starting in the range."""
+    (tmp_path / "text_file.txt").write_text("The U.S. cat ,\nsat on 2 mats .\n")
+
+    answer = iter_tokenized_file_range(
+        file=str(tmp_path / "text_file.txt"), begin=0, end=3
+    )
+
+    assert list(answer) == [["the", "us", "cat"]]
+
+
 def test_flatten_list():
     """Should return a list made of a list of lists."""
     answer = flatten_list(list_of_lists=[["A", "B", "C"], ["D"], ["E", "F", "G"]])
@@ -192,6 +329,36 @@ def test_count_words():
     assert answer == Counter({"A": 4, "B": 2, "C": 1})
 
 
+def test_reduce_vocabulary():
+    """Should remove words counted at most min_reduce times."""
+    answer = reduce_vocabulary(
+        count_tokens=Counter({"a": 1, "b": 3, "c": 2, "d": 4}), min_reduce=2
+    )
+
+    assert list(answer.items()) == [("b", 3), ("d", 4)]
+
+
+def test_count_words_bounded():
+    """Should reduce the vocabulary whenever it exceeds its maximum size."""
+    answer = count_words_bounded(
+        words=[["a", "b", "a"], ["c", "a", "d"], ["b", "e"], ["f", "a"]],
+        max_vocab_size=3,
+    )
+
+    # {a: 3, b: 1, c: 1, d: 1} is reduced to {a: 3}, then {a: 3, b: 1, e: 1}
+    # is kept and {a: 4, b: 1, e: 1, f: 1} is reduced with min_reduce=2
+    assert answer == Counter({"a": 4})
+
+
+def test_count_words_bounded_large():
+    """Should count every word when the vocabulary stays under the maximum."""
+    words = [["a", "b", "a"], ["c", "a", "d"]]
+
+    answer = count_words_bounded(words=words, max_vocab_size=4)
+
+    assert answer == count_words(words)
+
+
 def test_rare_word_pruning():
     """Should remove words that appears less than 3 times."""
     answer = rare_word_pruning(
@@ -207,3 +374,29 @@ def test_rare_word_pruning():
         ["the", "red", "cat", "cat"],
         ["the", "red"],
     ]
+
+
+def test_get_keep_probabilities():
+    """Should only subsample words more frequent than the threshold."""
+    answer = get_keep_probabilities(
+        counts=np.array([600, 300, 99, 1, 0]), threshold=0.1
+    )
+
+    assert np.allclose(
+        answer[:2], [(np.sqrt(6) + 1) / 6, (np.sqrt(3) + 1) / 3], rtol=1e-12
+    )
+    assert answer[2:].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_subsample_frequent_words():
+    """Should remove occurrences of frequent words and keep rare ones."""
+    list_tokens = [["the"] * 50 + ["cat", "red"], ["the"] * 50 + ["dog"]]
+
+    answer = subsample_frequent_words(
+        list_tokens=list_tokens, threshold=0.01, rng=np.random.default_rng(0)
+    )
+
+    assert len(answer) == 2
+    assert answer[0][-2:] == ["cat", "red"]
+    assert answer[1][-1] == "dog"
+    assert 0 < count_words(answer)["the"] < 50
@@ -0,0 +1,49 @@
+"""Tests for the vocabulary."""
+import pickle
+
+import numpy as np
+
+from nlp_negative_sampling.utils.vocabulary import Vocabulary
+
+
+def test_vocabulary_from_counts():
+    """Should index words by descending counts, ties keeping the given order."""
+    answer = Vocabulary.from_counts(
+        words=["the", "cat", "red", "dog"], counts=np.array([3, 4, 1, 3])
+    )
+
+    assert dict(answer) == {"cat": 0, "the": 1, "dog": 2, "red": 3}
+    assert answer.words.tolist() == ["cat", "the", "dog", "red"]
+    assert answer.counts.tolist() == [4, 3, 3, 1]
+
+
+def test_vocabulary_mapping():
+    """Should behave as a dictionary of word indexes."""
+    vocabulary = Vocabulary(words=["cat", "the"], counts=np.array([4, 3]))
+
+    assert vocabulary["the"] == 1
+    assert "cat" in vocabulary
+    assert "dog" not in vocabulary
+    assert vocabulary.get("dog") is None
+    assert len(vocabulary) == 2
+    assert list(vocabulary) == ["cat", "the"]
+    assert vocabulary == {"cat": 0, "the": 1}
+    assert vocabulary.words[1] == "the"
+
+
+def test_vocabulary_from_mapping():
+    """Should keep the indexes of a dictionary, with zero counts."""
+    answer = Vocabulary.from_mapping(words_voc={"the": 1, "cat": 0})
+
+    assert answer.words.tolist() == ["cat", "the"]
+    assert answer.counts.tolist() == [0, 0]
+
+
+def test_vocabulary_pickle():
+    """Should be restored with its words, counts and indexes."""
+    vocabulary = Vocabulary(words=["cat", "the"], counts=np.array([4, 3]))
+
+    answer = pickle.loads(pickle.dumps(vocabulary))
+
+    assert answer == vocabulary
+    assert answer.counts.tolist() == [4, 3]